@@ -0,0 +1,158 @@
+import os
+import time
+import threading
+import argparse
+
+import requests
+
+import file_manager
+
+
+_metadata_lock: threading.Lock = threading.Lock()
+
+
+def conditional_headers(entry: dict | None, path: str) -> dict[str, str]:
+    """
+    Get the headers asking the server to only send an asset if it changed.
+
+    :param entry: The asset's metadata entry, if any.
+    :param path: Path the asset is saved to, nothing is conditional if it's missing.
+    :return: The If-None-Match and If-Modified-Since headers.
+    """
+
+    headers: dict[str, str] = {}
+
+    if entry is None or not os.path.exists(path):
+        return headers
+
+    if entry.get('etag') is not None:
+        headers['If-None-Match'] = entry['etag']
+
+    if entry.get('last-modified') is not None:
+        headers['If-Modified-Since'] = entry['last-modified']
+
+    return headers
+
+
+def update_metadata(metadata_path: str | None, url: str, entry: dict) -> None:
+    """
+    Record an asset's validators and when it was last checked.
+
+    :param metadata_path: Path to the metadata file, nothing is recorded if None.
+    :param url: The asset's URL.
+    :param entry: The asset's metadata.
+    :return: None
+    """
+
+    if metadata_path is None:
+        return None
+
+    with _metadata_lock:
+        metadata: dict = file_manager.read_json(metadata_path) or {}
+        metadata[url] = entry
+        file_manager.save_json(metadata_path, metadata)
+
+
+def fetch(url: str, path: str, metadata_path: str | None = None, connect_timeout: float = 3, read_timeout: float = 10, check_interval: float = 0, session: requests.Session | None = None) -> bool:
+    """
+    Fetch a static asset, only downloading it if it changed since the last fetch.
+
+    The asset's ETag and Last-Modified are kept in the metadata file and sent back as a conditional request, so an
+    unchanged asset costs a 304 and is never rewritten. Assets checked within the check interval aren't requested at all.
+
+    :param url: The asset's URL.
+    :param path: Path to save the asset to.
+    :param metadata_path: Path to the metadata file, every request is unconditional if None.
+    :param connect_timeout: Seconds to wait for the connection.
+    :param read_timeout: Seconds to wait for the response.
+    :param check_interval: Seconds after a check before the asset is checked again.
+    :param session: The session to request with, a plain request if None.
+    :return: True if the asset is saved and up to date, otherwise False.
+    """
+
+    metadata: dict = (file_manager.read_json(metadata_path) or {}) if metadata_path is not None else {}
+    entry: dict | None = metadata.get(url)
+
+    if entry is not None and os.path.exists(path) and time.time() - entry.get('checked', 0) < check_interval:
+        return True
+
+    try:
+        response: requests.Response = (session or requests).get(url, headers=conditional_headers(entry, path), timeout=(connect_timeout, read_timeout))
+    except requests.exceptions.RequestException as error:
+        print(f'Unable to fetch {url}: {error.__class__.__name__}')
+        return False
+
+    match response.status_code:
+        case 304 if entry is not None:
+            entry['checked'] = time.time()
+            update_metadata(metadata_path, url, entry)
+            print(f'{os.path.basename(path)} is up to date')
+
+        case 200:
+            file_manager.write_atomic(path, response.content)
+            update_metadata(metadata_path, url, {
+                'path': path,
+                'etag': response.headers.get('ETag'),
+                'last-modified': response.headers.get('Last-Modified'),
+                'size': len(response.content),
+                'checked': time.time()
+            })
+            print(f'Downloaded {os.path.basename(path)} ({len(response.content)} bytes)')
+
+        case _:
+            print(f'Unable to fetch {url}: HTTP {response.status_code}')
+            return False
+
+    return True
+
+
+def refresh(url: str, path: str, *args, **kwargs) -> threading.Thread:
+    """
+    Fetch an asset on a background thread, the saved copy stays in use until the new one is swapped in.
+
+    :param url: The asset's URL.
+    :param path: Path to save the asset to.
+    :param args: The rest of fetch's arguments.
+    :param kwargs: The rest of fetch's keyword arguments.
+    :return: The thread fetching the asset.
+    """
+
+    thread: threading.Thread = threading.Thread(target=fetch, args=(url, path, *args), kwargs=kwargs, name=f'asset-{os.path.basename(path)}', daemon=True)
+    thread.start()
+
+    return thread
+
+
+def fetch_options(config: dict, data_path: str) -> dict:
+    """
+    Get fetch's keyword arguments from the config.
+
+    :param config: Dictionary containing the configuration settings.
+    :param data_path: Path to the data folder.
+    :return: The metadata path, timeouts and check interval.
+    """
+
+    cache_config: dict = config.get('asset-cache', {})
+
+    return {
+        'metadata_path': file_manager.clean_path(cache_config.get('metadata-path', '[MINERVA-FOLDER]assets.json'), data_path),
+        'connect_timeout': float(cache_config.get('connect-timeout', 3)),
+        'read_timeout': float(cache_config.get('read-timeout', 10)),
+        'check_interval': float(cache_config.get('check-interval', 3600))
+    }
+
+
+if __name__ == '__main__':
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description='Fetches a static asset through the asset cache')
+
+    parser.add_argument('url', help='The asset\'s URL', type=str)
+    parser.add_argument('path', help='Path to save the asset to', type=str)
+    parser.add_argument('-m', '--metadata', help='Path to the metadata file', type=str)
+    parser.add_argument('-i', '--interval', help='Seconds after a check before the asset is checked again', type=float, default=0)
+
+    args: argparse.Namespace = parser.parse_args()
+
+    start_time: float = time.perf_counter()
+    saved: bool = fetch(args.url, args.path, args.metadata, check_interval=args.interval)
+
+    print(f'{"Saved" if saved else "Failed"} in {(time.perf_counter() - start_time) * 1000:.0f} ms')
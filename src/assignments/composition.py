@@ -1,17 +1,28 @@
 import os
 import time
-import json
-import nltk
 import hashlib
-import inflect
-import pyinflect
+import threading
 import unicodedata
 import selenium.webdriver
-from nltk.corpus import wordnet
-from googletrans import Translator
+from typing import Callable, Iterator, TYPE_CHECKING
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 
+import lazy
+import steps
+import readiness
+import file_manager
+from assignments.lexicon import Lexicon, LexiconView
+
+if TYPE_CHECKING:
+    from translation_health import TranslationMonitor
+
+
+nltk: lazy.LazyModule = lazy.lazy_import('nltk')
+inflect: lazy.LazyModule = lazy.lazy_import('inflect')
+pyinflect: lazy.LazyModule = lazy.lazy_import('pyinflect')
+wordnet: lazy.LazyModule = lazy.lazy_import('nltk.corpus', 'wordnet')
+
 
 def encode_file_name(file_name: str) -> str:
     """
@@ -24,18 +35,17 @@ def encode_file_name(file_name: str) -> str:
     return hashlib.md5(file_name.encode()).hexdigest()
 
 
-def save_file(file: bytes, data: dict) -> None:
+def save_file(file_path: str, data: dict, family: str = 'cache') -> None:
     """
-    Save data to a file.
+    Save data to a file through the storage, repeated saves within its coalescing window are written once.
 
-    :param file: The file object.
+    :param file_path: Path to the file.
     :param data: The data to save as a dictionary.
+    :param family: The data family, which decides the serializer (see file_manager.configure_serializers).
     :return: None
     """
 
-    file.seek(0)
-    json.dump(data, file, indent=4)
-    file.truncate()
+    file_manager.storage.write_json(file_path, data, family)
 
 
 def strip_accents(text: str) -> str:
@@ -66,34 +76,51 @@ def synonym_extractor(phrase: str) -> list[str]:
     return synonyms
 
 
-def generate_dictionary(file_list: list[str]) -> dict:
+def read_entries(file_list: list[str]) -> Iterator[tuple[str, list[str] | None]]:
+    """
+    Read each Latin word and its English definitions from the dictionary files.
+
+    :param file_list: The dictionary files.
+    :return: Iterator of (Latin word, English definitions or None).
+    """
+
+    for file in file_list:
+        temp_data = file_manager.read_json(file)
+        
+        latin_word: str | None = temp_data.get('word', None)
+
+        if latin_word is None:
+            continue
+
+        yield latin_word.encode('utf-8').decode('unicode_escape'), temp_data.get('definitions', None)
+
+
+def generate_dictionary(file_list: list[str], compact: bool = True) -> dict | Lexicon:
     """
     Get the Latin-English dictionary.
 
     This function retrieves and constructs a Latin-English dictionary from JSON files located in the specified directory.
 
+    :param file_list: The dictionary files.
+    :param compact: Whether to build a compact lexicon (see assignments.lexicon) instead of nested dictionaries, both
+        are read the same way.
     :return: A dictionary containing Latin and English word mappings with morphology information.
     """
 
-    dictionary: dict = {}
-    latin_dictionary: dict = {}
-    english_dictionary: dict = {}
-
     print(f'Generating dictionary... {len(file_list)} files found')
     start_time = time.time()
 
-    for file in file_list:
-        with open(file, mode='r', encoding='utf-8') as f:
-            temp_data = json.load(f)
-        
-        latin_word: str | None = temp_data.get('word', None)
+    if compact:
+        dictionary: dict | Lexicon = Lexicon(read_entries(file_list))
+        print(f'Dictionary generated in {time.time() - start_time} seconds')
 
-        if latin_word is None:
-            continue
+        return dictionary
 
-        latin_word = latin_word.encode('utf-8').decode('unicode_escape')
+    dictionary = {}
+    latin_dictionary: dict = {}
+    english_dictionary: dict = {}
 
-        english_words: list[str] | None = temp_data.get('definitions', None)
+    for latin_word, english_words in read_entries(file_list):
         latin_dictionary[latin_word] = {"english" : english_words}
 
         if english_words is None:
@@ -147,7 +174,7 @@ def convert_to_base(word: str) -> str:
     return ' '.join(base_words)
 
 
-def translate(word: str, language: str, dictionary: dict | None, use_base: bool = False) -> list:
+def translate(word: str, language: str, dictionary: dict | Lexicon | None, use_base: bool = False) -> list:
     """
     Translate a word between Latin and English.
 
@@ -164,7 +191,7 @@ def translate(word: str, language: str, dictionary: dict | None, use_base: bool
     if dictionary is None:
         raise ValueError('Dictionary not found')
 
-    language_dict: dict | None = dictionary.get(language.lower(), None)
+    language_dict: dict | LexiconView | None = dictionary.get(language.lower(), None)
     
     if language_dict is None:
         raise ValueError(f'Unsupported language: {language}')
@@ -200,60 +227,56 @@ def learn(driver: selenium.webdriver) -> None:
 
     path = f'.{os.sep}data{os.sep}temp_dictionary{os.sep}'
 
-    for a in range(0, len(english_vocab)):
-        term_element = english_vocab[a]
-        latin_words = []
+    # Every Latin word's file is committed together once the page is read.
+    with file_manager.storage.transaction():
+        for a in range(0, len(english_vocab)):
+            term_element = english_vocab[a]
+            latin_words = []
         
-        latin_words_elements = latin_vocab[a].find_elements(By.TAG_NAME, "span")
+            latin_words_elements = latin_vocab[a].find_elements(By.TAG_NAME, "span")
 
-        for latin_word_element in latin_words_elements:
-            latin_words.append(str(latin_word_element.text))        
+            for latin_word_element in latin_words_elements:
+                latin_words.append(str(latin_word_element.text))        
         
-        if len(latin_words) == 0:
-            latin_words = str(latin_vocab[a].text).split(', ')
+            if len(latin_words) == 0:
+                latin_words = str(latin_vocab[a].text).split(', ')
         
-        for b in range(0, len(latin_words)):
-            latin_words[b] = latin_words[b].replace(',', '')
-            if '(' in latin_words[b]:
-                latin_words[b] = latin_words[b].split(' (')[0]
-
-        english_word = ''
-        term = str(term_element.text).replace('\n',' ')
-
-        if ')' in term and ':' not in term and term.startswith('('):
-            english_word = term.split(') ')[1]
-        elif ')' in term and ': ' in term and term.startswith('('):
-            english_word = term.split(': ')[1]
-            english_word = english_word.split(')')[0]
-        elif not term.startswith('(') and ')' in term:
-            english_word = term.split(' (')[0]
-        elif ')' not in term and 'note:' not in term:
-            english_word = term
-        elif ')' not in term and 'note:' in term:
-            english_word = term.split('\n')[0]
+            for b in range(0, len(latin_words)):
+                latin_words[b] = latin_words[b].replace(',', '')
+                if '(' in latin_words[b]:
+                    latin_words[b] = latin_words[b].split(' (')[0]
+
+            english_word = ''
+            term = str(term_element.text).replace('\n',' ')
+
+            if ')' in term and ':' not in term and term.startswith('('):
+                english_word = term.split(') ')[1]
+            elif ')' in term and ': ' in term and term.startswith('('):
+                english_word = term.split(': ')[1]
+                english_word = english_word.split(')')[0]
+            elif not term.startswith('(') and ')' in term:
+                english_word = term.split(' (')[0]
+            elif ')' not in term and 'note:' not in term:
+                english_word = term
+            elif ')' not in term and 'note:' in term:
+                english_word = term.split('\n')[0]
         
-        english_word = english_word.replace(':', '')
-        english_word = strip_accents(english_word)
+            english_word = english_word.replace(':', '')
+            english_word = strip_accents(english_word)
 
-        if '...' in english_word:
-            english_word = english_word.split('... ')
-        elif ',' in english_word:
-            english_word = english_word.split(', ')
+            if '...' in english_word:
+                english_word = english_word.split('... ')
+            elif ',' in english_word:
+                english_word = english_word.split(', ')
 
-        print(latin_words)
+            print(latin_words)
 
-        for latin_word in latin_words:
-            if '-' in latin_word or latin_word == 'f.' or latin_word == 'm.' or latin_word == 'n.':
-                pass
+            for latin_word in latin_words:
+                if '-' in latin_word or latin_word == 'f.' or latin_word == 'm.' or latin_word == 'n.':
+                    pass
 
-            filename = encode_file_name(latin_word)
-
-            if not os.path.exists(f'{path}{filename}.json'):
-                with open(f'{path}{filename}.json', mode='w') as file:
-                    file.write('{\n}')
-            
-            with open(f'{path}{filename}.json', mode='r+') as file:
-                data = json.load(file)
+                filename = encode_file_name(latin_word)
+                data = file_manager.storage.read_json(f'{path}{filename}.json') or {}
 
                 if isinstance(english_word, list):
                     for word in english_word:
@@ -266,19 +289,18 @@ def learn(driver: selenium.webdriver) -> None:
                     english_word = english_word.replace(':', '')
 
                     data[english_word] = True
-                
-                save_file(file, data)
+            
+                save_file(f'{path}{filename}.json', data, 'dictionary')
 
 
-def solve(driver: selenium.webdriver, compositions_fallback: bool, translator: Translator | None, dictionary: dict, compositions_synonyms_enabled: bool, cache_path: str | None) -> None:
+def solve_steps(driver: selenium.webdriver, compositions_fallback: bool, translator: 'TranslationMonitor | None', dictionary: dict | Lexicon, compositions_synonyms_enabled: bool, cache_path: str | None, cancel_token: threading.Event | None = None, progress: Callable[[str], None] | None = None) -> steps.Steps:
     """
-    Solve Latin-English composition assignments.
-
-    This function solves Latin-English composition assignments by extracting English text, translating it to Latin, and
-    entering the Latin translations into text input fields on a web page. It also handles translation fallback using
-    Google Translate if enabled.
+    Solve Latin-English composition assignments as resumable steps, yielding while each probe is graded. See solve.
 
-    :return: None
+    :param cancel_token: Event checked between probes, the solve saves its cache and stops once it's set. Closing the
+        steps while a probe is graded saves the cache as well.
+    :param progress: Callback receiving progress messages.
+    :return: Steps returning None.
     """
 
     parentElement = driver.find_element(By.CLASS_NAME, 'ui-block-a')
@@ -298,7 +320,10 @@ def solve(driver: selenium.webdriver, compositions_fallback: bool, translator: T
         english_texts[a] = (english_texts[a].text).lower().replace(',', '').replace('.', '')
 
     for english_text in english_texts:
-        if compositions_fallback == True and translator is not None:
+        # The monitor's circuit breaker skips Google Translate while it's down or too slow.
+        use_translation: bool = compositions_fallback == True and translator is not None and translator.available()
+
+        if use_translation:
             trans_words = str(translator.translate(english_text, dest='la', src='en').text)
             trans_words = trans_words.replace('.', '')
             trans_words = trans_words.replace(',', '')
@@ -350,7 +375,7 @@ def solve(driver: selenium.webdriver, compositions_fallback: bool, translator: T
                 if output is not None:
                     inputs.append(output)
         
-        if compositions_fallback == True and translator is not None:
+        if use_translation:
             inputs.append(trans_words)
         
         all_inputs.append(inputs)
@@ -361,10 +386,6 @@ def solve(driver: selenium.webdriver, compositions_fallback: bool, translator: T
     assignment_name = assignment_name.replace(f"{user}'s ", "")
     assignment_name = encode_file_name(assignment_name)
 
-    if not os.path.exists(f'{cache_path}{assignment_name}.json'):
-        with open(f'{cache_path}{assignment_name}.json', mode='w', encoding='utf-8') as file:
-            file.write('{\n}')
-
     for latin_input in latin_inputs:
         driver.execute_script("arguments[0].scrollIntoView();", latin_input)
         default_color = 'green'
@@ -395,8 +416,8 @@ def solve(driver: selenium.webdriver, compositions_fallback: bool, translator: T
 
         all_answers.append(answers)
 
-    cache_file = open(f'{cache_path}{assignment_name}.json', mode='r+', encoding='utf-8')
-    data = json.load(cache_file)
+    cache_file = f'{cache_path}{assignment_name}.json'
+    data = file_manager.storage.read_json(cache_file) or {}
 
     for english_text in english_texts:
         if data.get(english_text) is not None:
@@ -429,6 +450,13 @@ def solve(driver: selenium.webdriver, compositions_fallback: bool, translator: T
             same_inputs: list[str] = []
 
             for c in range(0, len(all_inputs[a][b])):
+                if cancel_token is not None and cancel_token.is_set():
+                    data[english_texts[a]]['correct'] = all_answers[a]
+                    save_file(cache_file, data)
+
+                    print(f'Cancelled after {input_number} inputs out of {total_inputs}')
+                    return None
+
                 input_number += 1
                 latin_word = strip_accents(all_inputs[a][b][c])
 
@@ -450,10 +478,12 @@ def solve(driver: selenium.webdriver, compositions_fallback: bool, translator: T
                 latin_inputs[a].send_keys(latin_word)
                 latin_inputs[a].send_keys(Keys.ENTER + ' a')
 
-                while len(str(latin_inputs[a].text).split('\n')) != 1:
-                    time.sleep(.05)
-
-                time.sleep(.05)
+                try:
+                    yield readiness.input_regraded(latin_inputs[a])
+                except GeneratorExit:
+                    data[english_texts[a]]['correct'] = all_answers[a]
+                    save_file(cache_file, data)
+                    raise
 
                 default_color: str = 'green'
                 if 'color:red' in str(latin_inputs[a].get_attribute('style')).replace(' ', ''):
@@ -480,11 +510,14 @@ def solve(driver: selenium.webdriver, compositions_fallback: bool, translator: T
 
                     print(f'Completed {input_number} inputs out of {total_inputs}')
 
+                    if progress is not None:
+                        progress(f'Completed {input_number} inputs out of {total_inputs}')
+
         data[english_texts[a]]['correct'] = all_answers[a]
         save_file(cache_file, data)
 
         (latin_inputs[a]).clear()
-        time.sleep(.5)
+        yield readiness.input_regraded(latin_inputs[a], 5)
 
         used_words = [] #backup repitition check
         driver.execute_script("arguments[0].scrollIntoView();", latin_inputs[a])
@@ -501,4 +534,20 @@ def solve(driver: selenium.webdriver, compositions_fallback: bool, translator: T
 
         latin_inputs[a].send_keys(Keys.ENTER)
 
-    cache_file.close()
\ No newline at end of file
+    readiness.report('input re-graded')
+
+
+def solve(driver: selenium.webdriver, compositions_fallback: bool, translator: 'TranslationMonitor | None', dictionary: dict | Lexicon, compositions_synonyms_enabled: bool, cache_path: str | None, cancel_token: threading.Event | None = None, progress: Callable[[str], None] | None = None) -> None:
+    """
+    Solve Latin-English composition assignments.
+
+    This function solves Latin-English composition assignments by extracting English text, translating it to Latin, and
+    entering the Latin translations into text input fields on a web page. It also handles translation fallback using
+    Google Translate if enabled.
+
+    :param cancel_token: Event checked between probes, the solve saves its cache and stops once it's set.
+    :param progress: Callback receiving progress messages.
+    :return: None
+    """
+
+    steps.run(driver, solve_steps(driver, compositions_fallback, translator, dictionary, compositions_synonyms_enabled, cache_path, cancel_token, progress), cancel_token=cancel_token)
@@ -0,0 +1,229 @@
+import sys
+from array import array
+from typing import Iterable, Iterator
+
+
+class LatinEntry:
+    """
+    A Latin word's entry, read like the {'english': [...]} dictionaries generate_dictionary used to return.
+    """
+
+    __slots__ = ('lexicon', 'row')
+
+    def __init__(self, lexicon: 'Lexicon', row: int) -> None:
+        self.lexicon: Lexicon = lexicon
+        self.row: int = row
+
+    def get(self, key: str, default: object = None) -> object:
+        if key != 'english':
+            return default
+
+        return self.lexicon.latin_definitions(self.row)
+
+    def __getitem__(self, key: str) -> object:
+        if key != 'english':
+            raise KeyError(key)
+
+        return self.lexicon.latin_definitions(self.row)
+
+    def __contains__(self, key: str) -> bool:
+        return key == 'english'
+
+    def keys(self) -> list[str]:
+        return ['english']
+
+    def __repr__(self) -> str:
+        return repr({'english': self.lexicon.latin_definitions(self.row)})
+
+
+class LexiconView:
+    """
+    One language's side of a lexicon, read like a dictionary: Latin words map to their entries, English words to the
+    Latin words they translate to.
+    """
+
+    __slots__ = ('lexicon', 'language')
+
+    def __init__(self, lexicon: 'Lexicon', language: str) -> None:
+        self.lexicon: Lexicon = lexicon
+        self.language: str = language
+
+    def row(self, word: str) -> int:
+        """
+        Get a word's row on this side of the lexicon.
+
+        :param word: The word.
+        :return: The row, -1 if the word isn't there.
+        """
+
+        string_id: int | None = self.lexicon.string_ids.get(word)
+
+        if string_id is None:
+            return -1
+
+        rows: array = self.lexicon.latin_rows if self.language == 'latin' else self.lexicon.english_rows
+
+        return rows[string_id]
+
+    def get(self, word: str, default: object = None) -> object:
+        row: int = self.row(word)
+
+        if row < 0:
+            return default
+
+        if self.language == 'latin':
+            return LatinEntry(self.lexicon, row)
+
+        return self.lexicon.english_translations(row)
+
+    def __getitem__(self, word: str) -> object:
+        row: int = self.row(word)
+
+        if row < 0:
+            raise KeyError(word)
+
+        return self.get(word)
+
+    def __contains__(self, word: str) -> bool:
+        return self.row(word) >= 0
+
+    def __len__(self) -> int:
+        offsets: array = self.lexicon.latin_offsets if self.language == 'latin' else self.lexicon.english_offsets
+
+        return len(offsets) - 1
+
+    def __iter__(self) -> Iterator[str]:
+        for string_id in (self.lexicon.latin_ids if self.language == 'latin' else self.lexicon.english_ids):
+            yield self.lexicon.strings[string_id]
+
+    def keys(self) -> Iterator[str]:
+        return iter(self)
+
+    def items(self) -> Iterator[tuple[str, object]]:
+        for word in self:
+            yield word, self.get(word)
+
+
+class Lexicon:
+    """
+    Compact Latin-English dictionary.
+
+    Every word is interned once in a string table and referred to by its id. Latin to English and English to Latin
+    links are kept as integer arrays (each row's links run from offsets[row] to offsets[row + 1]), instead of a list
+    and a dictionary per word. lexicon['latin'] and lexicon['english'] read like generate_dictionary's nested
+    dictionaries did, so translate and its callers don't change.
+    """
+
+    __slots__ = ('strings', 'string_ids', 'latin_ids', 'latin_rows', 'latin_offsets', 'latin_links', 'latin_missing', 'english_ids', 'english_rows', 'english_offsets', 'english_links')
+
+    def __init__(self, entries: Iterable[tuple[str, list[str] | None]]) -> None:
+        """
+        Build a lexicon.
+
+        :param entries: Each Latin word with its English definitions (None if it has none), later duplicates win.
+        """
+
+        self.strings: list[str] = []
+        self.string_ids: dict[str, int] = {}
+
+        latin: dict[int, list[int] | None] = {}
+        english: dict[int, list[int]] = {}
+
+        for latin_word, english_words in entries:
+            latin_id: int = self.intern(latin_word)
+
+            if english_words is None:
+                latin[latin_id] = None
+                continue
+
+            latin[latin_id] = [self.intern(english_word) for english_word in english_words]
+
+            for english_word in english_words:
+                translations: list[int] = english.setdefault(self.intern(english_word.lower()), [])
+
+                if latin_id not in translations:
+                    translations.append(latin_id)
+
+        self.latin_missing: set[int] = {row for row, latin_id in enumerate(latin) if latin[latin_id] is None}
+        self.latin_ids, self.latin_rows, self.latin_offsets, self.latin_links = self.pack({latin_id: links or [] for latin_id, links in latin.items()})
+        self.english_ids, self.english_rows, self.english_offsets, self.english_links = self.pack(english)
+
+    def intern(self, word: str) -> int:
+        """
+        Get a word's id, adding it to the string table if it's new.
+
+        :param word: The word.
+        :return: The word's id.
+        """
+
+        string_id: int | None = self.string_ids.get(word)
+
+        if string_id is None:
+            string_id = len(self.strings)
+            word = sys.intern(word)
+            self.strings.append(word)
+            self.string_ids[word] = string_id
+
+        return string_id
+
+    def pack(self, links: dict[int, list[int]]) -> tuple[array, array, array, array]:
+        """
+        Pack each word's links into flat arrays.
+
+        :param links: Dictionary mapping each word's id to the ids it links to, in row order.
+        :return: The string id of each row, the row of each string id (-1 if it has none), the offsets of each row's
+            links and the links.
+        """
+
+        ids: array = array('I', links)
+        rows: array = array('i', [-1]) * len(self.strings)
+        offsets: array = array('I', [0])
+        flat: array = array('I')
+
+        for row, (string_id, linked_ids) in enumerate(links.items()):
+            rows[string_id] = row
+            flat.extend(linked_ids)
+            offsets.append(len(flat))
+
+        return ids, rows, offsets, flat
+
+    def latin_definitions(self, row: int) -> list[str] | None:
+        """
+        Get a Latin word's English definitions.
+
+        :param row: The Latin word's row.
+        :return: The definitions, None if it has none.
+        """
+
+        if row in self.latin_missing:
+            return None
+
+        return [self.strings[string_id] for string_id in self.latin_links[self.latin_offsets[row]:self.latin_offsets[row + 1]]]
+
+    def english_translations(self, row: int) -> list[str]:
+        """
+        Get the Latin words an English word translates to.
+
+        :param row: The English word's row.
+        :return: The Latin words.
+        """
+
+        return [self.strings[string_id] for string_id in self.english_links[self.english_offsets[row]:self.english_offsets[row + 1]]]
+
+    def get(self, language: str, default: object = None) -> LexiconView | object:
+        if language not in ('latin', 'english'):
+            return default
+
+        return LexiconView(self, language)
+
+    def __getitem__(self, language: str) -> LexiconView:
+        if language not in ('latin', 'english'):
+            raise KeyError(language)
+
+        return LexiconView(self, language)
+
+    def __contains__(self, language: str) -> bool:
+        return language in ('latin', 'english')
+
+    def keys(self) -> list[str]:
+        return ['english', 'latin']
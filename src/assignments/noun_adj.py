@@ -1,55 +1,197 @@
-import time
+import threading
 import selenium.webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 
+import steps
+import readiness
+import assignments.noun_adj_learning
+from assignments.noun_adj_engine import AgreementChart, compile_chart
 
-def prediction(noun_adj_chart: dict, words: list = None) -> bool:
+
+PHRASE_COUNT: int = 10
+
+READ_PHRASES_SCRIPT: str = """
+const phrases = [];
+
+for (let n = 1; n <= arguments[0]; n++) {
+    const element = document.getElementsByName('input' + n)[0];
+    phrases.push(element ? element.innerText.split('\\n')[0].trim() : '');
+}
+
+return phrases;
+"""
+
+SUBMIT_ANSWERS_SCRIPT: str = """
+const missing = [];
+
+arguments[0].forEach((choice, index) => {
+    const label = document.querySelector('label[for="' + choice + (index + 1) + '"]');
+
+    if (label) {
+        label.click();
+    } else {
+        missing.push(choice + (index + 1));
+    }
+});
+
+const submit = document.getElementById('agreeSubmit');
+
+if (submit) {
+    submit.click();
+}
+
+return {missing: missing, submitted: submit !== null};
+"""
+
+SCORE_SELECTOR: str = 'h3.showScore'
+
+# The last dictionary chart prediction compiled, kept with the chart itself so the identity check stays valid.
+_prediction_chart: tuple[dict, AgreementChart] | None = None
+
+
+def prediction(noun_adj_chart: dict | AgreementChart, words: list = None) -> bool:
     """
     Predict if a given list of words forms a valid combination based on available endings.
 
-    :param noun_adj_chart: A dictionary containing noun and adjective endings.
+    A dictionary chart is compiled once and reused for as long as the same chart is passed in.
+
+    :param noun_adj_chart: A dictionary containing noun and adjective endings, or a compiled chart.
     :param words: A list of words to predict.
     :return: True if a valid combination is predicted, otherwise False.
     """
 
-    if len(words) != 2 or words is None:
-        return False
-    
-    endings: list[str] = []
+    global _prediction_chart
 
-    for word in words:
-        all_endings: list[str] = []
+    if isinstance(noun_adj_chart, AgreementChart):
+        return noun_adj_chart.agrees(words)
 
-        for end in noun_adj_chart:
-            if word.endswith(end):
-                all_endings.append(end)
+    if _prediction_chart is None or _prediction_chart[0] is not noun_adj_chart:
+        _prediction_chart = (noun_adj_chart, compile_chart(noun_adj_chart))
 
-        if len(all_endings) >= 1:
-            endings.append(max(all_endings, key=len))
-    
-    if len(endings) <= 1:
-        return False
+    return _prediction_chart[1].agrees(words)
 
-    if endings[0] in noun_adj_chart.get(endings[1]) or endings[1] in noun_adj_chart.get(endings[0]):
-        return True
-    
-    return False
 
+def read_phrases(driver: selenium.webdriver, count: int = PHRASE_COUNT) -> list[str]:
+    """
+    Read every phrase of a noun-adj page in one call.
 
-def solver(driver: selenium.webdriver, noun_adj_chart: dict) -> None:
-    """`
-    Perform a series of actions, including solving word combinations and managing responses.
+    :param driver: The Selenium WebDriver object.
+    :param count: The number of phrases on the page.
+    :return: A list of phrases, empty strings for missing inputs.
+    """
+
+    return [str(phrase) for phrase in driver.execute_script(READ_PHRASES_SCRIPT, count)]
+
+
+def read_score(driver: selenium.webdriver) -> str:
+    """
+    Read the score line of a noun-adj page.
 
     :param driver: The Selenium WebDriver object.
-    :param noun_adj_chart: A dictionary containing noun and adjective endings.
-    :return: None
+    :return: The score line, or an empty string if it isn't shown.
     """
-    
+
+    return str(driver.execute_script(readiness.TEXT_SCRIPT, SCORE_SELECTOR) or '')
+
+
+def submit_answers(driver: selenium.webdriver, outputs: list[bool]) -> bool:
+    """
+    Select every yes/no answer and submit the page in one script.
+
+    :param driver: The Selenium WebDriver object.
+    :param outputs: The predictions for each phrase, True for yes.
+    :return: True if the page was submitted, otherwise False.
+    """
+
+    choices: list[str] = ['yes' if output == True else 'no' for output in outputs]
+    result: dict = driver.execute_script(SUBMIT_ANSWERS_SCRIPT, choices)
+
+    for missing in result.get('missing', []):
+        print(f'unable to press {missing}')
+
+    return bool(result.get('submitted', False))
+
+
+def parse_score(response_text: str) -> int | None:
+    """
+    Parse the number of correct answers from a score line.
+
+    :param response_text: The score line (e.g. "You answered 8 out of 10").
+    :return: The number of correct answers, or None if it can't be parsed.
+    """
+
+    try:
+        return int(str(response_text.split(' out of ')[0]).replace('You answered ', ''))
+    except ValueError:
+        return None
+
+
+def batch_steps(driver: selenium.webdriver, chart: AgreementChart) -> steps.Steps:
+    """
+    Solve a noun-adj page with one read, one submit script and condition based waits, as resumable steps.
+
+    :param driver: The Selenium WebDriver object.
+    :param chart: The compiled noun-adj chart.
+    :return: Steps returning a tuple of (phrases, answers, score line), or None if the page couldn't be solved.
+    """
+
+    if 'noun' not in str(driver.title).lower():
+        return None
+
+    nouns: list[str] = read_phrases(driver)
+    outputs: list[bool] = chart.score_page(nouns)
+    previous_score: str = read_score(driver)
+
+    if not submit_answers(driver, outputs):
+        print('unable to press get agreeSubmit')
+        return None
+
+    more_button = yield readiness.element_clickable(By.ID, 'agreeMore')
+
+    if more_button:
+        more_button.click()
+    else:
+        print('unable to press get agreeMore')
+
+    response_text: str | None = yield readiness.score_rendered(SCORE_SELECTOR, previous_score, (' out of ',))
+
+    if response_text is None:
+        print('unable to get score')
+        return None
+
+    return nouns, outputs, response_text
+
+
+def batch_solver(driver: selenium.webdriver, chart: AgreementChart, timeout: float = 30) -> tuple[list[str], list[bool], str] | None:
+    """
+    Solve a noun-adj page with one read, one submit script and condition based waits.
+
+    :param driver: The Selenium WebDriver object.
+    :param chart: The compiled noun-adj chart.
+    :param timeout: Seconds to wait for the page to respond.
+    :return: Tuple of (phrases, answers, score line), or None if the page couldn't be solved.
+    """
+
+    return steps.run(driver, batch_steps(driver, chart), timeout, poll_frequency=0.1)
+
+
+def legacy_solver(driver: selenium.webdriver, chart: AgreementChart) -> tuple[list[str], list[bool], str] | None:
+    """
+    Solve a noun-adj page by clicking each answer and polling the submit buttons.
+
+    :param driver: The Selenium WebDriver object.
+    :param chart: The compiled noun-adj chart.
+    :return: Tuple of (phrases, answers, score line), or None if the score couldn't be read.
+    """
+
     nouns: list[str] = []
+    previous_score: str = read_score(driver)
 
     for a in range(10):
         nouns.append((driver.find_element(By.NAME, f'input{str(a+1)}').text).split('\n')[0])
+
+    outputs: list[bool] = chart.score_page(nouns)
     
     for a in range(len(nouns)):
         if 'noun' not in str(driver.title).lower():
@@ -67,12 +209,9 @@ def solver(driver: selenium.webdriver, noun_adj_chart: dict) -> None:
         if 'noun' not in str(driver.title).lower():
             break
 
-        words: list[str] = nouns[a].split(' ')
-        output: bool = prediction(words, noun_adj_chart)
-
         choice: str = 'no'
 
-        if output == True:
+        if outputs[a] == True:
             choice = 'yes'
         
         for b in range(2):
@@ -88,23 +227,74 @@ def solver(driver: selenium.webdriver, noun_adj_chart: dict) -> None:
     selections: tuple[str] = ('agreeSubmit', 'agreeMore')
 
     for selection in selections:
-        while True:
-            if 'noun' not in str(driver.title).lower():
-                break
+        if 'noun' not in str(driver.title).lower():
+            break
 
-            try:    
-                driver.find_element(By.ID, selection).click()
-                break
-            except:
-                print(f'unable to press get {selection}')
-                time.sleep(2)
+        button = readiness.wait(driver, readiness.element_clickable(By.ID, selection))
 
-    time.sleep(5)
+        if button is None:
+            print(f'unable to press get {selection}')
+            continue
 
-    response_text: str = str(driver.find_element(By.XPATH, f"// h3[@class='showScore ui-bar ui-bar-c ui-title']").text).split('\n')[0]
-    correct_amount: int = int(str(response_text.split(' out of ')[0]).replace('You answered ', ''))
+        button.click()
 
-    try:
-        print(f'{response_text}')
-    except:
-        print('unable to get score')
\ No newline at end of file
+    response_text: str | None = readiness.wait(driver, readiness.score_rendered(SCORE_SELECTOR, previous_score, (' out of ',)))
+
+    if response_text is None:
+        print('unable to get score')
+        return None
+
+    return nouns, outputs, response_text
+
+
+def solver_steps(driver: selenium.webdriver, noun_adj_chart: dict | AgreementChart, batch: bool = True, history_path: str | None = None, overlay_path: str | None = None, cancel_token: threading.Event | None = None) -> steps.Steps:
+    """
+    Solve a noun-adj page as resumable steps, see solver.
+
+    :param driver: The Selenium WebDriver object.
+    :param noun_adj_chart: A dictionary containing noun and adjective endings, or a compiled chart.
+    :param batch: Whether to use the one-shot page actions instead of clicking each answer.
+    :param history_path: Path to store scored pages in, learned from on the learning thread, learning is disabled if None.
+    :param overlay_path: Path to save the learned chart overlay to.
+    :param cancel_token: Event checked before answering, the page is skipped once it's set.
+    :return: Steps returning the number of correct answers, or None if the score couldn't be read.
+    """
+    
+    if cancel_token is not None and cancel_token.is_set():
+        return None
+
+    chart: AgreementChart = compile_chart(noun_adj_chart)
+
+    if batch == True:
+        result: tuple | None = yield from batch_steps(driver, chart)
+    else:
+        result: tuple | None = legacy_solver(driver, chart)
+
+    if result is None:
+        return None
+
+    nouns, outputs, response_text = result
+    correct_amount: int | None = parse_score(response_text)
+
+    print(f'{response_text}')
+
+    if history_path is not None and correct_amount is not None:
+        assignments.noun_adj_learning.learn_later(chart, history_path, overlay_path, nouns, outputs, correct_amount)
+
+    return correct_amount
+
+
+def solver(driver: selenium.webdriver, noun_adj_chart: dict | AgreementChart, batch: bool = True, history_path: str | None = None, overlay_path: str | None = None, cancel_token: threading.Event | None = None) -> int | None:
+    """`
+    Perform a series of actions, including solving word combinations and managing responses.
+
+    :param driver: The Selenium WebDriver object.
+    :param noun_adj_chart: A dictionary containing noun and adjective endings, or a compiled chart.
+    :param batch: Whether to use the one-shot page actions instead of clicking each answer.
+    :param history_path: Path to store scored pages in, learning is disabled if None.
+    :param overlay_path: Path to save the learned chart overlay to.
+    :param cancel_token: Event checked before answering, the page is skipped once it's set.
+    :return: The number of correct answers, or None if the score couldn't be read.
+    """
+
+    return steps.run(driver, solver_steps(driver, noun_adj_chart, batch, history_path, overlay_path, cancel_token), poll_frequency=0.1)
\ No newline at end of file
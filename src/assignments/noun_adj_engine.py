@@ -0,0 +1,347 @@
+import os
+import time
+import argparse
+import unicodedata
+
+import file_manager
+
+
+def strip_accents(text: str) -> str:
+    """
+    Remove accents (macrons) from a given text.
+
+    :param text: The text to remove accents from.
+    :return: The text without accents as a string.
+    """
+
+    return str(''.join(char for char in unicodedata.normalize('NFKD', text) if unicodedata.category(char) != 'Mn')).lower()
+
+
+class AgreementChart:
+    """
+    A noun-adj chart compiled for constant time agreement checks.
+
+    Every compatible pair of endings (including an ending with itself) is given its own bit, and each ending's mask
+    holds the bits of every pair it's part of. Two endings share a bit only if they were paired in the chart, so two
+    words agree when the AND of their masks is non-zero. Endings are stored in reversed-suffix tries, one keeping the
+    chart's macrons and one folded, so the longest matching ending is found in a single walk over the word. Folding
+    merges the masks of macron variants (is and īs), so it's only used where the chart has no ending of that length
+    as written.
+    """
+
+    __slots__ = ('endings', 'masks', 'exact_trie', 'folded_trie', 'overrides')
+
+    def __init__(self, noun_adj_chart: dict, overlay: dict | None = None) -> None:
+        """
+        Compile a noun-adj chart.
+
+        :param noun_adj_chart: A dictionary mapping each ending to the endings it agrees with.
+        :param overlay: Learned corrections from noun_adj_learning, see apply_overlay.
+        """
+
+        self.masks: dict = {}
+        self.overrides: dict = {}
+        self.exact_trie: dict = {}
+        self.folded_trie: dict = {}
+
+        pairs: dict = {}
+
+        for ending, compatible_endings in noun_adj_chart.items():
+            ending = unicodedata.normalize('NFC', ending).lower()
+
+            for compatible_ending in [ending, *compatible_endings]:
+                compatible_ending = unicodedata.normalize('NFC', compatible_ending).lower()
+                pair: tuple[str, str] = tuple(sorted((ending, compatible_ending)))
+
+                if pair not in pairs:
+                    pairs[pair] = 1 << len(pairs)
+
+                for part in pair:
+                    self.masks[part] = self.masks.get(part, 0) | pairs[pair]
+
+        self.endings: list[str] = list(self.masks.keys())
+
+        for ending, mask in self.masks.items():
+            self._insert(self.exact_trie, ending, mask)
+            self._insert(self.folded_trie, strip_accents(ending), mask)
+
+        if overlay is not None:
+            self.apply_overlay(overlay)
+
+    @staticmethod
+    def _insert(trie: dict, ending: str, mask: int) -> None:
+        """
+        Insert an ending into a reversed-suffix trie, OR-ing masks of endings that collide.
+
+        :param trie: The trie to insert into.
+        :param ending: The ending to insert.
+        :param mask: The ending's agreement mask.
+        :return: None
+        """
+
+        node: dict = trie
+
+        for char in reversed(ending):
+            node = node.setdefault(char, {})
+
+        node[''] = node.get('', 0) | mask
+        node[None] = ending
+
+    @staticmethod
+    def _walk(trie: dict, word: str) -> tuple[int, str | None, int]:
+        """
+        Find the longest ending of a word in a trie.
+
+        :param trie: The trie to search.
+        :param word: The word to search for.
+        :return: Tuple of the ending's mask (0 if none match), the ending as it's in the trie and its length.
+        """
+
+        node: dict = trie
+        match: tuple[int, str | None, int] = (0, None, 0)
+
+        for length, char in enumerate(reversed(word), 1):
+            node = node.get(char)
+
+            if node is None:
+                break
+
+            if '' in node:
+                match = (node[''], node[None], length)
+
+        return match
+
+    def lookup(self, word: str) -> tuple[int, str | None]:
+        """
+        Find the longest ending of a word.
+
+        Words are matched against the chart as written first. Words with macrons only fall back to the folded trie
+        when nothing matches; words without macrons use it when it finds a longer ending, so "puellis" reads as the
+        chart's is rather than is and īs merged, but "puellarum" still finds ārum.
+
+        :param word: The word to look up.
+        :return: Tuple of the agreement mask (0 if no ending matches) and the matched ending, folded if it was
+            matched in the folded trie.
+        """
+
+        word = unicodedata.normalize('NFC', word.strip()).lower()
+        folded_word: str = strip_accents(word)
+        exact_match: tuple[int, str | None, int] = self._walk(self.exact_trie, word)
+
+        if exact_match[0] != 0 and folded_word != word:
+            return exact_match[:2]
+
+        folded_match: tuple[int, str | None, int] = self._walk(self.folded_trie, folded_word)
+
+        if exact_match[0] != 0 and exact_match[2] >= folded_match[2]:
+            return exact_match[:2]
+
+        return folded_match[:2]
+
+    def mask(self, word: str) -> int:
+        """
+        Get the agreement mask of a word.
+
+        :param word: The word to look up.
+        :return: The agreement mask, 0 if no ending matches.
+        """
+
+        return self.lookup(word)[0]
+
+    def ending_pair(self, words: list[str] | None) -> tuple[str, str] | None:
+        """
+        Get the matched endings of a noun and adjective, in a stable order.
+
+        :param words: The noun and adjective.
+        :return: The sorted pair of endings, or None if either word has no known ending.
+        """
+
+        if words is None or len(words) != 2:
+            return None
+
+        endings: list[str | None] = [self.lookup(word)[1] for word in words]
+
+        if None in endings:
+            return None
+
+        return tuple(sorted(endings))
+
+    def apply_overlay(self, overlay: dict) -> None:
+        """
+        Apply learned corrections on top of the chart.
+
+        :param overlay: A dictionary with "agree" and "disagree" lists of ending pairs.
+        :return: None
+        """
+
+        self.overrides.update(self._overrides(overlay))
+
+    def set_overlay(self, overlay: dict) -> None:
+        """
+        Replace the learned corrections, swapping them in at once so a solve reading the chart never sees half of them.
+
+        :param overlay: A dictionary with "agree" and "disagree" lists of ending pairs.
+        :return: None
+        """
+
+        self.overrides = self._overrides(overlay)
+
+    @staticmethod
+    def _overrides(overlay: dict) -> dict:
+        """
+        Key an overlay's corrections by ending pair.
+
+        Pairs are kept as matched, with their macrons, so a correction to a and ā doesn't change a and a.
+
+        :param overlay: A dictionary with "agree" and "disagree" lists of ending pairs.
+        :return: Dictionary mapping each sorted ending pair to whether it agrees.
+        """
+
+        overrides: dict = {}
+
+        for key, value in (('agree', True), ('disagree', False)):
+            for pair in overlay.get(key, []):
+                overrides[tuple(sorted(unicodedata.normalize('NFC', ending).lower() for ending in pair))] = value
+
+        return overrides
+
+    def agrees(self, words: list[str] | None, use_overrides: bool = True) -> bool:
+        """
+        Predict if a pair of words agrees.
+
+        :param words: The noun and adjective.
+        :param use_overrides: Whether learned corrections apply, the chart's own answer otherwise.
+        :return: True if the words agree, otherwise False.
+        """
+
+        if words is None or len(words) != 2:
+            return False
+
+        noun_mask, noun_ending = self.lookup(words[0])
+        adjective_mask, adjective_ending = self.lookup(words[1])
+
+        if use_overrides and len(self.overrides) != 0 and noun_ending is not None and adjective_ending is not None:
+            override: bool | None = self.overrides.get(tuple(sorted((noun_ending, adjective_ending))))
+
+            if override is not None:
+                return override
+
+        return (noun_mask & adjective_mask) != 0
+
+    def score_page(self, phrases: list[str]) -> list[bool]:
+        """
+        Predict agreement for every phrase of a page at once.
+
+        :param phrases: The phrases, each a noun and an adjective separated by a space.
+        :return: A list of predictions in the same order as phrases.
+        """
+
+        return [self.agrees(phrase.split()) for phrase in phrases]
+
+
+def compile_chart(noun_adj_chart: dict | AgreementChart, overlay: dict | None = None) -> AgreementChart:
+    """
+    Compile a noun-adj chart, passing already compiled charts through.
+
+    :param noun_adj_chart: A dictionary containing noun and adjective endings, or a compiled chart.
+    :param overlay: Learned corrections to apply on top of the chart.
+    :return: The compiled chart.
+    """
+
+    if isinstance(noun_adj_chart, AgreementChart):
+        if overlay is not None:
+            noun_adj_chart.apply_overlay(overlay)
+
+        return noun_adj_chart
+
+    return AgreementChart(noun_adj_chart, overlay)
+
+
+def load_chart(chart_path: str, overlay_path: str | None = None) -> AgreementChart:
+    """
+    Load and compile a noun-adj chart file with its learned overlay.
+
+    :param chart_path: Path to the noun-adj chart JSON file.
+    :param overlay_path: Path to the learned overlay JSON file, skipped if None or missing.
+    :return: The compiled chart.
+    """
+
+    noun_adj_chart: dict = file_manager.read_json(chart_path)
+    overlay: dict | None = file_manager.read_json(overlay_path) if overlay_path is not None else None
+
+    return AgreementChart(noun_adj_chart, overlay)
+
+
+def parse_phrase(line: str) -> tuple[str, bool | None] | None:
+    """
+    Parse a phrase line of the form "puella bona" or "puella bona | yes".
+
+    :param line: The line to parse.
+    :return: Tuple of (phrase, expected answer or None), or None for blank and comment lines.
+    """
+
+    line = line.strip()
+
+    if line == '' or line.startswith('#'):
+        return None
+
+    fields: list[str] = [field.strip() for field in line.split('|')]
+    expected: bool | None = None
+
+    if len(fields) > 1 and fields[1] != '':
+        expected = fields[1].lower() in ('yes', 'y', 'true', '1')
+
+    return fields[0], expected
+
+
+if __name__ == '__main__':
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description="Your favorite Latin Client's noun-adj agreement engine")
+
+    parser.add_argument('-f', '--file', help='File of phrases, one "noun adjective | yes/no" per line', type=str, required=True)
+    parser.add_argument('-c', '--chart', help='Path to the noun-adj chart', type=str, default=f'.{os.sep}default{os.sep}data{os.sep}noun_adj_charts{os.sep}default.json')
+    parser.add_argument('-l', '--learned', help='Path to a learned overlay to apply on top of the chart', type=str)
+    parser.add_argument('-q', '--quiet', help='Only print the summary', action='store_true')
+
+    args: argparse.Namespace = parser.parse_args()
+
+    chart_data: dict = file_manager.read_json(args.chart)
+
+    start_time: float = time.perf_counter()
+    overlay: dict | None = None
+
+    if args.learned is not None:
+        overlay = file_manager.read_json(args.learned)
+
+    chart: AgreementChart = AgreementChart(chart_data, overlay)
+    compile_time: float = time.perf_counter() - start_time
+
+    phrases: list[tuple[str, bool | None]] = []
+
+    with open(args.file, 'r', encoding='utf-8') as file:
+        for line in file:
+            phrase: tuple | None = parse_phrase(line)
+
+            if phrase is not None:
+                phrases.append(phrase)
+
+    start_time = time.perf_counter()
+    predictions: list[bool] = chart.score_page([phrase for phrase, expected in phrases])
+    score_time: float = time.perf_counter() - start_time
+
+    correct: int = 0
+    graded: int = 0
+
+    for (phrase, expected), predicted in zip(phrases, predictions):
+        if expected is not None:
+            graded += 1
+            correct += int(predicted == expected)
+
+        if not args.quiet:
+            marker: str = '' if expected is None else (' (correct)' if predicted == expected else ' (incorrect)')
+            print(f'{phrase}: {"yes" if predicted else "no"}{marker}')
+
+    print(f'Compiled {len(chart.endings)} endings in {compile_time * 1000:.2f} ms')
+    print(f'Scored {len(phrases)} phrases in {score_time * 1000:.2f} ms ({len(phrases) / max(score_time, 1e-9):.0f} phrases/sec)')
+
+    if graded > 0:
+        print(f'Accuracy: {correct}/{graded} ({correct / graded * 100:.1f}%)')
@@ -0,0 +1,182 @@
+import os
+import time
+import concurrent.futures
+
+import file_manager
+from assignments.noun_adj_engine import AgreementChart
+
+
+MAX_HISTORY: int = 1000
+MIN_SUPPORT: int = 3
+CHART_CONFIDENCE: float = 0.8
+STEP: float = 0.5
+MARGIN: float = 0.1
+
+_learner: concurrent.futures.ThreadPoolExecutor = concurrent.futures.ThreadPoolExecutor(1, thread_name_prefix='noun-adj-learning')
+
+
+def phrase_key(chart: AgreementChart, phrase: str) -> str:
+    """
+    Get the variable a phrase's correct answer depends on.
+
+    Phrases are grouped by their ending pair so one scored page teaches every phrase sharing those endings. Phrases
+    without a known ending pair only stand for themselves.
+
+    :param chart: The compiled noun-adj chart.
+    :param phrase: The noun and adjective separated by a space.
+    :return: The variable name.
+    """
+
+    pair: tuple[str, str] | None = chart.ending_pair(phrase.split())
+
+    if pair is None:
+        return f'phrase:{phrase}'
+
+    return ' '.join(pair)
+
+
+def load_history(history_path: str) -> dict:
+    """
+    Load the scored submissions and the estimates learned from them.
+
+    :param history_path: Path to the history file.
+    :return: Dictionary with the submissions (oldest first) and the estimates, None if there are no estimates yet.
+    """
+
+    history: dict = file_manager.read_json(history_path) or {}
+
+    return {'submissions': history.get('submissions', []), 'estimates': history.get('estimates', None)}
+
+
+def record_page(estimates: dict, chart: AgreementChart, submission: dict) -> None:
+    """
+    Update the estimates from a scored page.
+
+    Every variable holds an estimate of how likely its phrases are to agree, starting from the chart's own answer
+    (without learned corrections) held with CHART_CONFIDENCE. The page's score is one soft constraint on the
+    variables it shows: the difference between the score and the score the estimates expect is spread over the page's
+    phrases, moving each estimate towards the answers that would explain it. Only the page's own variables move, so a
+    page that disagrees with the rest (e.g. a phrase that disagrees with its ending pair) can't throw away what other
+    pages taught, and one noisy page can only move an estimate by STEP of the difference.
+
+    :param estimates: Dictionary mapping each variable to its estimate, page count and chart answer, updated in place.
+    :param chart: The compiled noun-adj chart.
+    :param submission: The scored page.
+    :return: None
+    """
+
+    phrases: list[str] = submission.get('phrases', [])
+    choices: list[bool] = submission.get('choices', [])
+    variables: list[str] = [phrase_key(chart, phrase) for phrase in phrases[:len(choices)]]
+
+    if len(variables) == 0:
+        return None
+
+    for variable, phrase in zip(variables, phrases):
+        if variable not in estimates:
+            chart_value: bool = chart.agrees(phrase.split(), False)
+            estimates[variable] = {'value': CHART_CONFIDENCE if chart_value else 1 - CHART_CONFIDENCE, 'pages': 0, 'chart': chart_value}
+
+    expected: float = sum(estimates[variable]['value'] if choice == True else 1 - estimates[variable]['value'] for variable, choice in zip(variables, choices))
+    difference: float = int(submission.get('score', 0)) - expected
+
+    for variable, choice in zip(variables, choices):
+        entry: dict = estimates[variable]
+        entry['value'] = min(max(entry['value'] + STEP * difference * (1 if choice == True else -1) / len(variables), 0), 1)
+
+    for variable in set(variables):
+        estimates[variable]['pages'] += 1
+
+
+def build_overlay(estimates: dict) -> dict:
+    """
+    Get the chart corrections the estimates support.
+
+    A correction is written once MIN_SUPPORT pages have shown the ending pair and its estimate has moved at least
+    MARGIN past 0.5, away from the chart's answer.
+
+    :param estimates: Dictionary mapping each variable to its estimate, page count and chart answer.
+    :return: The overlay with "agree" and "disagree" lists of ending pairs.
+    """
+
+    overlay: dict = {'agree': [], 'disagree': []}
+
+    for variable, entry in sorted(estimates.items()):
+        if variable.startswith('phrase:') or entry['pages'] < MIN_SUPPORT or abs(entry['value'] - 0.5) < MARGIN:
+            continue
+
+        value: bool = entry['value'] > 0.5
+
+        if value != entry['chart']:
+            overlay['agree' if value else 'disagree'].append(variable.split(' '))
+
+    return overlay
+
+
+def learn(chart: AgreementChart, history_path: str, overlay_path: str | None, phrases: list[str], outputs: list[bool], correct_amount: int) -> dict:
+    """
+    Record a scored page, update the estimates from it and apply the corrections they support to the chart.
+
+    Only the new page is solved, starting from the estimates the earlier pages left. History files from before the
+    estimates were kept are replayed once.
+
+    :param chart: The compiled noun-adj chart.
+    :param history_path: Path to the history file.
+    :param overlay_path: Path to save the overlay to, if any.
+    :param phrases: The phrases on the page.
+    :param outputs: The answers given, True for yes.
+    :param correct_amount: The number of correct answers reported by the site.
+    :return: The updated overlay.
+    """
+
+    history: dict = load_history(history_path)
+    submission: dict = {'time': int(time.time()), 'phrases': phrases, 'choices': outputs, 'score': correct_amount}
+    estimates: dict | None = history['estimates']
+
+    if estimates is None:
+        estimates = {}
+
+        for previous in history['submissions']:
+            record_page(estimates, chart, previous)
+
+    record_page(estimates, chart, submission)
+    submissions: list[dict] = (history['submissions'] + [submission])[-MAX_HISTORY:]
+
+    if not os.path.exists(os.path.dirname(history_path)):
+        os.makedirs(os.path.dirname(history_path))
+
+    file_manager.save_json(history_path, {'submissions': submissions, 'estimates': estimates}, 'cache')
+
+    overlay: dict = build_overlay(estimates)
+    chart.set_overlay(overlay)
+
+    if overlay_path is not None:
+        file_manager.save_json(overlay_path, overlay, 'chart')
+
+    print(f'Learned from {len(submissions)} pages, {len(overlay["agree"]) + len(overlay["disagree"])} chart corrections')
+
+    return overlay
+
+
+def learn_later(chart: AgreementChart, history_path: str, overlay_path: str | None, phrases: list[str], outputs: list[bool], correct_amount: int) -> concurrent.futures.Future:
+    """
+    Learn from a scored page on the learning thread, so the solver doesn't hold the WebDriver meanwhile. Pages are
+    learned one at a time, in the order they were scored.
+
+    :param chart: The compiled noun-adj chart.
+    :param history_path: Path to the history file.
+    :param overlay_path: Path to save the overlay to, if any.
+    :param phrases: The phrases on the page.
+    :param outputs: The answers given, True for yes.
+    :param correct_amount: The number of correct answers reported by the site.
+    :return: The future of the updated overlay.
+    """
+
+    def run() -> dict | None:
+        try:
+            return learn(chart, history_path, overlay_path, phrases, outputs, correct_amount)
+        except Exception as error:
+            print(f'Unable to learn from the page: {error}')
+            return None
+
+    return _learner.submit(run)
@@ -1,69 +1,9 @@
-import re
-import os
-import glob
-import json
-import pyinflect
-import unicodedata
+import threading
 import selenium.webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 
-
-def generate_charts(conjugation_charts_path : str | None) -> dict:
-    """
-    Generate the Latin and English conjugation charts from the JSON files.
-
-    :param conjugation_charts_path: Path to the directory containing the JSON files.
-    :return: A dictionary containing the Latin and English conjugation charts.
-    """
-
-    if conjugation_charts_path is None:
-        raise ValueError("The path to the conjugation charts is required.")
-    
-    print('generating synposis charts')
-
-    if not conjugation_charts_path.endswith(os.sep):
-        conjugation_charts_path += os.sep
-
-    folders : dict = {
-        "english-conjugation-charts" : "english",
-        "latin-conjugation-charts" : "latin"
-    }
-
-    conjugation_charts: dict = {
-        'latin': {},
-        'english': {}
-    }
-
-    for folder in folders:
-        file_names: list[str] = []
-        files: list = glob.glob(f"{conjugation_charts_path}{folder}{os.sep}*.json")
-        
-        for file in files:
-            file_name: str = os.path.basename(file).replace('.json', '')
-            file_names.append(file_name)
-
-            with open(file, 'r') as f:
-                data: dict = json.load(f)
-
-                conjugation_charts[folders.get(folder)][file_name] = data
-        
-        print(f'{folders.get(folder)} charts: {file_names}')
-
-    print('synopsis charts generated')
-
-    return conjugation_charts
-
-
-def strip_accents(text: str) -> str:
-    """
-    Remove accents from a given text.
-
-    :param text: The text to remove accents from.
-    :return: The text without accents as a string.
-    """
-
-    return str(''.join(char for char in unicodedata.normalize('NFKD', text) if unicodedata.category(char) != 'Mn')).lower()
+from assignments.synopsis_engine import generate_charts, find_chart, english_inflections, conjugate, fill_english
 
 
 def showHiddenDropdowns(driver: selenium.webdriver) -> None:
@@ -125,14 +65,6 @@ def find_details(driver: selenium.webdriver, blocks: tuple, conjugation_types: d
     :return: A dictionary containing details about Latin and English words, conjugation chart, and tense.
     """
 
-    conjugation_keys: list[str] = list(conjugation_types.keys())
-    conjugation_values: list[list[str]] = list(conjugation_types.values())
-
-    #Finds latin conjugation type
-    chart: str = 'first' # temp
-    chart_backup: list[int] = []
-    chart_found: bool = False
-
     latin_words: list[str] = []
 
     for block in blocks:
@@ -141,24 +73,7 @@ def find_details(driver: selenium.webdriver, blocks: tuple, conjugation_types: d
         except:
             latin_words.append(f'unable to get word {block}')
 
-    for a in range(len(conjugation_values)):
-        temp_chart_found: bool = True
-        count: int = 0
-
-        for b in range(len(conjugation_values[a])):
-            if latin_words[b].endswith(conjugation_values[a][b]):
-                count += 1
-            elif not latin_words[b].endswith(conjugation_values[a][b]):
-                temp_chart_found = False
-
-        if temp_chart_found == True:
-            chart = conjugation_keys[a]
-            chart_found = True
-
-        chart_backup.append(count)
-    
-    if not chart_found:
-        chart = conjugation_keys[chart_backup.index(max(chart_backup))] #this is a fallback in case it cant find the chart regularly
+    chart: str = find_chart(latin_words, conjugation_types)
 
     english_info: list[str] = find_word(driver.find_elements(By.XPATH, f"// li[@class='ui-block-e']")).split(' |')
 
@@ -172,13 +87,7 @@ def find_details(driver: selenium.webdriver, blocks: tuple, conjugation_types: d
     if tense is not None and tense.startswith(' '):
         tense = tense[1:]
 
-    english_words: dict = {
-                    "VB": english_word,                                         #VB - Verb, Base Form
-                    "VBG" : pyinflect.getInflection(english_word, 'VBG')[0],    #VBD - Verb, Past Tense
-                    "VBN" : pyinflect.getInflection(english_word, 'VBN')[0],    #VBG - Verb, Gerund or Present Participle
-                    "VBZ" : pyinflect.getInflection(english_word, 'VBZ')[0],    #VBN - Verb, Past Participle
-                    "VBD" : pyinflect.getInflection(english_word, 'VBD')[0]     #VBZ - Verb, 3rd Person Singular Present
-                }
+    english_words: dict = english_inflections(english_word)
 
     output: dict = {
             "chart" : chart,
@@ -190,13 +99,14 @@ def find_details(driver: selenium.webdriver, blocks: tuple, conjugation_types: d
     return output
 
 
-def solve(driver: selenium.webdriver, blocks: tuple, charts: dict, conjugation_types: dict) -> None:
+def solve(driver: selenium.webdriver, blocks: tuple, charts: dict, conjugation_types: dict, cancel_token: threading.Event | None = None) -> None:
     """
     Solve the Latin conjugation problem.
 
     :param driver: The Selenium WebDriver object.
     :param blocks: Tuple containing the block names.
     :param charts: Dictionary containing the Latin and English conjugation charts.
+    :param cancel_token: Event checked between inputs, the solve stops once it's set.
     :return: None
     """
 
@@ -291,6 +201,9 @@ def solve(driver: selenium.webdriver, blocks: tuple, charts: dict, conjugation_t
     showHiddenDropdowns(driver)
 
     for item in latin_inputs:
+        if cancel_token is not None and cancel_token.is_set():
+            return None
+
         latin_input = driver.find_element(By.XPATH, f"// input[@id='{latin_inputs[item]}']")
         driver.execute_script("arguments[0].scrollIntoView();", latin_input)
 
@@ -307,13 +220,7 @@ def solve(driver: selenium.webdriver, blocks: tuple, charts: dict, conjugation_t
         if current_mode in ['INDICATIVES', 'SUBJUNCTIVES']:
             new_ending = new_ending[details.get('tense')]
 
-        ignore_words: tuple = ('dic', 'dac', 'fic', 'fuc') #little rhyme lol
-        endless_word: str = re.sub(f'{strip_accents(word_ending)}$', '', strip_accents(word))
-
-        if new_ending == "" and endless_word not in ignore_words:
-            new_ending = word_ending[0]
-
-        answer: str = re.sub(f'{strip_accents(word_ending)}$', new_ending, strip_accents(word))
+        answer: str = conjugate(word, word_ending, new_ending)
 
         if 'rgb(255, 0, 0)' in str(latin_input.get_attribute('style')):
             latin_input.clear()
@@ -326,6 +233,9 @@ def solve(driver: selenium.webdriver, blocks: tuple, charts: dict, conjugation_t
     showHiddenDropdowns(driver)
 
     for item in english_inputs:
+        if cancel_token is not None and cancel_token.is_set():
+            return None
+
         english_input = driver.find_element(By.XPATH, f"// input[@id='{english_inputs[item]}']")
         driver.execute_script("arguments[0].scrollIntoView();", english_input)
 
@@ -337,11 +247,7 @@ def solve(driver: selenium.webdriver, blocks: tuple, charts: dict, conjugation_t
             tense = str(item).split(' ')[1]
             answer = answer[tense]
         
-        verbs: dict = details.get('english words')
-        replacement_verb: tuple = ('*VB*', '*VBG*', '*VBN*', '*VBZ*', '*VBD*')
-
-        for verb in replacement_verb:
-            answer = answer.replace(verb, verbs.get(verb.replace('*', '')))
+        answer = fill_english(answer, details.get('english words'))
 
         if 'rgb(255, 0, 0)' in str(english_input.get_attribute('style')):
             english_input.clear()
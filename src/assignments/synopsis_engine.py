@@ -0,0 +1,426 @@
+import os
+import re
+import sys
+import glob
+import json
+import time
+import argparse
+import functools
+import unicodedata
+import concurrent.futures
+
+import lazy
+import file_manager
+
+
+pyinflect: lazy.LazyModule = lazy.lazy_import('pyinflect')
+
+PERFECT_TENSES: tuple[str] = ('PERFECT', 'PLUPERFECT', 'FUTURE-PERFECT')
+IGNORE_WORDS: tuple[str] = ('dic', 'dac', 'fic', 'fuc') #little rhyme lol
+REPLACEMENT_VERBS: tuple[str] = ('*VB*', '*VBG*', '*VBN*', '*VBZ*', '*VBD*')
+
+_worker_charts: dict | None = None
+_worker_conjugation_types: dict | None = None
+
+
+def generate_charts(conjugation_charts_path : str | None) -> dict:
+    """
+    Generate the Latin and English conjugation charts from the JSON files.
+
+    :param conjugation_charts_path: Path to the directory containing the JSON files.
+    :return: A dictionary containing the Latin and English conjugation charts.
+    """
+
+    if conjugation_charts_path is None:
+        raise ValueError("The path to the conjugation charts is required.")
+
+    print('generating synposis charts')
+
+    if not conjugation_charts_path.endswith(os.sep):
+        conjugation_charts_path += os.sep
+
+    folders : dict = {
+        "english-conjugation-charts" : "english",
+        "latin-conjugation-charts" : "latin"
+    }
+
+    conjugation_charts: dict = {
+        'latin': {},
+        'english': {}
+    }
+
+    for folder in folders:
+        file_names: list[str] = []
+        files: list = glob.glob(f"{conjugation_charts_path}{folder}{os.sep}*.json")
+
+        for file in files:
+            file_name: str = os.path.basename(file).replace('.json', '')
+            file_names.append(file_name)
+
+            conjugation_charts[folders.get(folder)][file_name] = file_manager.read_json(file)
+
+        print(f'{folders.get(folder)} charts: {file_names}')
+
+    print('synopsis charts generated')
+
+    return conjugation_charts
+
+
+def strip_accents(text: str) -> str:
+    """
+    Remove accents from a given text.
+
+    :param text: The text to remove accents from.
+    :return: The text without accents as a string.
+    """
+
+    return str(''.join(char for char in unicodedata.normalize('NFKD', text) if unicodedata.category(char) != 'Mn')).lower()
+
+
+def find_chart(principal_parts: list[str], conjugation_types: dict) -> str:
+    """
+    Find the conjugation chart matching a verb's principal parts.
+
+    When several charts match every principal part the one with the longest endings wins, so "capiō, capere" resolves
+    to thirdI rather than third. If no chart matches fully, the chart matching the most principal parts is used.
+
+    :param principal_parts: The four principal parts of the verb.
+    :param conjugation_types: Dictionary mapping chart names to their principal part endings.
+    :return: The name of the matching chart.
+    """
+
+    stripped_parts: list[str] = [strip_accents(part) for part in principal_parts]
+
+    chart: str | None = None
+    chart_length: int = -1
+    chart_backup: dict = {}
+
+    for name, endings in conjugation_types.items():
+        count: int = 0
+
+        for a in range(min(len(endings), len(stripped_parts))):
+            if stripped_parts[a].endswith(strip_accents(endings[a])):
+                count += 1
+
+        chart_backup[name] = count
+
+        if count == len(endings) and sum(len(ending) for ending in endings) > chart_length:
+            chart = name
+            chart_length = sum(len(ending) for ending in endings)
+
+    if chart is None:
+        chart = max(chart_backup, key=chart_backup.get) #this is a fallback in case it cant find the chart regularly
+
+    return chart
+
+
+def principal_part_index(mood: str, voice: str, tense: str) -> int:
+    """
+    Find which principal part a form is built from.
+
+    :param mood: The mood (e.g. INDICATIVE).
+    :param voice: The voice (ACTIVE or PASSIVE).
+    :param tense: The tense (e.g. PERFECT).
+    :return: Index of the principal part to conjugate.
+    """
+
+    match mood:
+        case 'INDICATIVE' | 'SUBJUNCTIVE':
+            if tense in PERFECT_TENSES:
+                return 2 if voice == 'ACTIVE' else 3
+        case 'INFINITIVE':
+            if voice == 'ACTIVE' and tense == 'PERFECT':
+                return 2
+            if tense in ('PERFECT', 'FUTURE'):
+                return 3
+        case 'PARTICIPLE':
+            if (voice, tense) in (('ACTIVE', 'FUTURE'), ('PASSIVE', 'PERFECT')):
+                return 3
+
+    return 1
+
+
+def english_chart_name(person: str) -> str:
+    """
+    Convert a person and number such as "1st singular" into an English chart name.
+
+    :param person: The person and number.
+    :return: The English chart name (e.g. first-singular).
+    """
+
+    return str(person).replace('1st ', 'first-').replace('2nd ', 'second-').replace('3rd ', 'third-')
+
+
+@functools.lru_cache(maxsize=4096)
+def english_inflections(english_word: str) -> dict:
+    """
+    Generate the inflections of an English verb used by the English charts.
+
+    Only the first word of a gloss is inflected, so "carry on" becomes "carrying on".
+
+    :param english_word: The English verb in its base form.
+    :return: A dictionary mapping Penn Treebank tags to inflected forms.
+    """
+
+    words: list[str] = english_word.split(' ', 1)
+    rest: str = f' {words[1]}' if len(words) > 1 else ''
+
+    english_words: dict = {"VB": english_word}  #VB - Verb, Base Form
+
+    #VBG - Gerund or Present Participle, VBN - Past Participle, VBZ - 3rd Person Singular Present, VBD - Past Tense
+    for tag in ('VBG', 'VBN', 'VBZ', 'VBD'):
+        inflection: tuple | None = pyinflect.getInflection(words[0], tag)
+
+        if inflection is None:
+            english_words[tag] = english_word
+        else:
+            english_words[tag] = f'{inflection[0]}{rest}'
+
+    return english_words
+
+
+def conjugate(word: str, word_ending: str, new_ending: str) -> str:
+    """
+    Swap the ending of a principal part for a chart ending.
+
+    :param word: The principal part.
+    :param word_ending: The principal part's ending in the conjugation type.
+    :param new_ending: The ending from the Latin chart.
+    :return: The conjugated Latin form without accents.
+    """
+
+    stripped_ending: str = re.escape(strip_accents(word_ending))
+    endless_word: str = re.sub(f'{stripped_ending}$', '', strip_accents(word))
+
+    if new_ending == "" and endless_word not in IGNORE_WORDS:
+        new_ending = word_ending[0]
+
+    return re.sub(f'{stripped_ending}$', lambda match: new_ending, strip_accents(word))
+
+
+def fill_english(template: str, english_words: dict) -> str:
+    """
+    Replace the verb placeholders of an English chart entry.
+
+    :param template: The chart entry (e.g. "I was *VBG*").
+    :param english_words: Dictionary of inflections from english_inflections.
+    :return: The English translation.
+    """
+
+    for verb in REPLACEMENT_VERBS:
+        template = template.replace(verb, english_words.get(verb.replace('*', '')))
+
+    return template
+
+
+def synopsis(charts: dict, conjugation_types: dict, principal_parts: list[str], english_word: str, person: str, chart: str | None = None) -> dict:
+    """
+    Generate a full synopsis for a verb.
+
+    :param charts: Dictionary containing the Latin and English conjugation charts.
+    :param conjugation_types: Dictionary mapping chart names to their principal part endings.
+    :param principal_parts: The four principal parts of the verb.
+    :param english_word: The English gloss in its base form.
+    :param person: The person and number (e.g. "1st singular").
+    :param chart: The conjugation chart to use, detected from the principal parts if None.
+    :return: A dictionary of mood -> voice -> tense -> {'latin', 'english'}.
+    """
+
+    if len(principal_parts) != 4:
+        raise ValueError(f'Expected 4 principal parts, got {len(principal_parts)}')
+
+    if chart is None:
+        chart = find_chart(principal_parts, conjugation_types)
+
+    latin_chart: dict = charts.get('latin').get(chart)
+    english_chart: dict = charts.get('english').get(english_chart_name(person), {})
+    word_endings: list[str] = conjugation_types.get(chart)
+    english_words: dict = english_inflections(english_word)
+
+    output: dict = {}
+
+    for mood, voices in latin_chart.items():
+        for voice, tenses in voices.items():
+            for tense, new_ending in tenses.items():
+                if isinstance(new_ending, dict):
+                    new_ending = new_ending.get(person)
+
+                if new_ending is None:
+                    continue
+
+                index: int = principal_part_index(mood, voice, tense)
+                latin: str = conjugate(principal_parts[index], word_endings[index], new_ending)
+
+                english: str | dict | None = english_chart.get(mood, {}).get(voice)
+
+                if isinstance(english, dict):
+                    english = english.get(tense)
+
+                if english is not None:
+                    english = fill_english(english, english_words)
+
+                output.setdefault(mood, {}).setdefault(voice, {})[tense] = {'latin': latin, 'english': english}
+
+    return output
+
+
+def parse_verb(line: str, default_person: str) -> tuple[list[str], str, str] | None:
+    """
+    Parse a verb line of the form "amō, amāre, amāvī, amātus | love | 1st singular".
+
+    :param line: The line to parse. The person is optional.
+    :param default_person: The person used when the line doesn't give one.
+    :return: Tuple of (principal parts, english word, person) or None for blank and comment lines.
+    """
+
+    line = unicodedata.normalize('NFC', line.strip())
+
+    if line == '' or line.startswith('#'):
+        return None
+
+    fields: list[str] = [field.strip() for field in line.split('|')]
+
+    if len(fields) < 2:
+        raise ValueError(f'Invalid verb line: {line}')
+
+    principal_parts: list[str] = [part.strip() for part in fields[0].split(',')]
+    person: str = fields[2] if len(fields) > 2 and fields[2] != '' else default_person
+
+    return principal_parts, fields[1], person
+
+
+def _init_worker(charts: dict, conjugation_types: dict) -> None:
+    """
+    Store the charts in a pool worker so they're only sent once per process.
+
+    :param charts: Dictionary containing the Latin and English conjugation charts.
+    :param conjugation_types: Dictionary mapping chart names to their principal part endings.
+    :return: None
+    """
+
+    global _worker_charts, _worker_conjugation_types
+
+    _worker_charts = charts
+    _worker_conjugation_types = conjugation_types
+
+
+def _worker_synopsis(verb: tuple[list[str], str, str]) -> dict:
+    """
+    Generate a synopsis inside a pool worker.
+
+    :param verb: Tuple of (principal parts, english word, person).
+    :return: The synopsis.
+    """
+
+    return synopsis(_worker_charts, _worker_conjugation_types, verb[0], verb[1], verb[2])
+
+
+def batch_synopsis(charts: dict, conjugation_types: dict, verbs: list[tuple[list[str], str, str]], workers: int = 1, chunk_size: int = 64) -> list[dict]:
+    """
+    Generate synopses for many verbs, optionally across a process pool.
+
+    :param charts: Dictionary containing the Latin and English conjugation charts.
+    :param conjugation_types: Dictionary mapping chart names to their principal part endings.
+    :param verbs: List of (principal parts, english word, person) tuples.
+    :param workers: Number of worker processes, 1 runs in this process.
+    :param chunk_size: Number of verbs sent to a worker at a time.
+    :return: List of synopses in the same order as verbs.
+    """
+
+    if workers <= 1:
+        return [synopsis(charts, conjugation_types, *verb) for verb in verbs]
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(charts, conjugation_types)) as executor:
+        return list(executor.map(_worker_synopsis, verbs, chunksize=chunk_size))
+
+
+def print_synopsis(output: dict) -> None:
+    """
+    Print a synopsis one form per line.
+
+    :param output: The synopsis from synopsis().
+    :return: None
+    """
+
+    for mood, voices in output.items():
+        for voice, tenses in voices.items():
+            for tense, forms in tenses.items():
+                if forms.get('english') is None:
+                    print(f'{mood} {voice} {tense}: {forms.get("latin")}')
+                else:
+                    print(f'{mood} {voice} {tense}: {forms.get("latin")} - {forms.get("english")}')
+
+
+def default_data_path() -> str:
+    """
+    Find the data folder, preferring the user's minerva folder over the bundled defaults.
+
+    :return: Path to the data folder.
+    """
+
+    data_path: str = f'{file_manager.get_documents_folder()}{os.sep}minerva{os.sep}data{os.sep}'
+
+    if not os.path.exists(data_path):
+        data_path = f'.{os.sep}default{os.sep}data{os.sep}'
+
+    return data_path
+
+
+if __name__ == '__main__':
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description="Your favorite Latin Client's synopsis engine")
+
+    parser.add_argument('-p', '--parts', help='Principal parts, comma separated (e.g. "amō, amāre, amāvī, amātus")', type=str)
+    parser.add_argument('-e', '--english', help='English gloss in its base form (e.g. love)', type=str)
+    parser.add_argument('-n', '--person', help='Person and number', type=str, default='1st singular')
+    parser.add_argument('-c', '--chart', help='Force a conjugation chart instead of detecting it', type=str)
+    parser.add_argument('-f', '--file', help='File of verbs, one "parts | english | person" per line', type=str)
+    parser.add_argument('-o', '--output', help='Write batch synopses to this file as JSON lines', type=str)
+    parser.add_argument('-w', '--workers', help='Number of worker processes for batches', type=int, default=1)
+    parser.add_argument('-d', '--data', help='Path to the data folder', type=str)
+    parser.add_argument('-b', '--benchmark', help='Report synopses per second', action='store_true')
+
+    args: argparse.Namespace = parser.parse_args()
+
+    data_path: str = args.data if args.data is not None else default_data_path()
+
+    if not data_path.endswith(os.sep):
+        data_path += os.sep
+
+    conjugation_types: dict = file_manager.read_json(f'{data_path}conjugation_chart_types.json')
+    charts: dict = generate_charts(data_path)
+
+    if args.file is None:
+        if args.parts is None or args.english is None:
+            print('Principal parts and an English gloss are required without a verb file.')
+            sys.exit(1)
+
+        principal_parts: list[str] = [part.strip() for part in unicodedata.normalize('NFC', args.parts).split(',')]
+        print_synopsis(synopsis(charts, conjugation_types, principal_parts, args.english, args.person, args.chart))
+        sys.exit(0)
+
+    verbs: list[tuple[list[str], str, str]] = []
+
+    with open(args.file, 'r', encoding='utf-8') as file:
+        for line in file:
+            verb: tuple | None = parse_verb(line, args.person)
+
+            if verb is not None:
+                verbs.append(verb)
+
+    print(f'Generating {len(verbs)} synopses with {max(args.workers, 1)} worker(s)...')
+
+    start_time: float = time.perf_counter()
+    outputs: list[dict] = batch_synopsis(charts, conjugation_types, verbs, args.workers)
+    elapsed: float = time.perf_counter() - start_time
+
+    if args.output is not None:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            for verb, output in zip(verbs, outputs):
+                file.write(json.dumps({'parts': verb[0], 'english': verb[1], 'person': verb[2], 'synopsis': output}, ensure_ascii=False) + '\n')
+    elif not args.benchmark:
+        for verb, output in zip(verbs, outputs):
+            print(f'{", ".join(verb[0])} ({verb[1]}, {verb[2]})')
+            print_synopsis(output)
+
+    if args.benchmark:
+        print(f'{len(verbs)} synopses in {elapsed:.3f} seconds ({len(verbs) / max(elapsed, 1e-9):.1f} synopses/sec)')
@@ -1,13 +1,24 @@
 import os
-import time
-import json
-import nltk
 import hashlib
+import threading
 import selenium.webdriver
-from nltk.corpus import wordnet
-from googletrans import Translator
+from typing import TYPE_CHECKING
 from selenium.webdriver.common.by import By
 
+import lazy
+import steps
+import readiness
+import file_manager
+
+if TYPE_CHECKING:
+    from translation_health import TranslationMonitor
+
+
+wordnet: lazy.LazyModule = lazy.lazy_import('nltk.corpus', 'wordnet')
+
+
+SCORE_SELECTOR: str = 'h3.showScore.ui-title'
+
 
 def encode_file_name(file_name: str) -> str:
     """
@@ -20,18 +31,16 @@ def encode_file_name(file_name: str) -> str:
     return hashlib.md5(file_name.encode()).hexdigest()
 
 
-def save_file(file: bytes, data: dict) -> None:
+def save_file(file_path: str, data: dict) -> None:
     """
-    Save data to a file.
+    Save a dictionary entry through the storage, repeated saves within its coalescing window are written once.
 
-    :param file: The file object.
+    :param file_path: Path to the file.
     :param data: The data to save as a dictionary.
     :return: None
     """
 
-    file.seek(0)
-    json.dump(data, file, indent=4)
-    file.truncate()
+    file_manager.storage.write_json(file_path, data, 'dictionary')
 
 
 def antonym_extractor(phrase: str) -> list[str]:
@@ -119,36 +128,38 @@ def check_timout(driver: selenium.webdriver, word: str, definition: str, data: d
         return True
 
 
-def wait_reload(driver: selenium.webdriver, word1: str, word2: str, vocab_element: str, definition_element: str) -> None:
+def page_reloaded(word1: str, word2: str, vocab_element: str, definition_element: str) -> readiness.Condition:
     """
-    Wait for the page to reload with new words.
+    Get a condition that is met once the page reloads with new words.
 
-    :param word1: The first word to wait for.
-    :param word2: The second word to wait for.
+    :param word1: The word shown before reloading.
+    :param word2: The definition shown before reloading.
     :param vocab_element: The ID of the vocabulary element.
     :param definition_element: The ID of the definition element.
-    :return: None
+    :return: The condition.
     """
 
-    while True:
-        if word1 == str(driver.find_element(By.ID, vocab_element).text).split('\n')[0] and word2 == str(driver.find_element(By.ID, definition_element).text):
-            time.sleep(.5)
-        else:
-            time.sleep(1)
-            break
+    def condition(driver: selenium.webdriver) -> bool:
+        return word1 != str(driver.find_element(By.ID, vocab_element).text).split('\n')[0] or word2 != str(driver.find_element(By.ID, definition_element).text)
+
+    return readiness.Condition('question reloaded', condition, 30, 0.1, False)
 
 
-def solver(driver: selenium.webdriver, data_path: str, run_prediction: bool, translator: Translator | None) -> None:
+def solver_steps(driver: selenium.webdriver, data_path: str, run_prediction: bool, translator: 'TranslationMonitor | None', cancel_token: threading.Event | None = None) -> steps.Steps:
     """
-    Automatically solve timed morphology questions on a web page.
+    Solve a timed vocabulary question as resumable steps, yielding while the page reloads. See solver.
 
     :param driver: The Selenium WebDriver object.
     :param data_path: The path to the data folder.
     :param run_prediction: Whether to run prediction.
-    :param translator: The Google Translate API object.
-    :return: None
+    :param translator: The translation monitor, consulted before every Google Translate call.
+    :param cancel_token: Event checked before answering, the question is skipped once it's set.
+    :return: Steps returning None.
     """
 
+    if cancel_token is not None and cancel_token.is_set():
+        return None
+
     vocab_element: str = 'timedVocab_lemma'
     definition_element: str = 'timedVocab_def'
     false_element: str = 'timed_vocab_answer_false'
@@ -166,86 +177,102 @@ def solver(driver: selenium.webdriver, data_path: str, run_prediction: bool, tra
     
     file_path: str = f'{data_path}{file_name}.json'
 
-    if not os.path.exists(file_path):
+    data: dict | None = file_manager.storage.read_json(file_path)
+
+    if data is None:
         print(f'{word} not found, creating entry.', end='\r')
-        with open(file_path, 'w') as temp_file:
-            temp_file.write('{\n}')
+        data = {}
     
     if translator is None:
         run_prediction = False
     
-    with open(file_path, encoding='utf-8', mode='r+') as file:
-        data = json.load(file)
-        definitions: list[str] = data.get('definitions', [])
-
-        if definition in definitions:
-            print('Found in dictionary: ...', end='\r')
-
-            if data[definition] == True:
-                driver.find_element(By.XPATH, f"// label[@for='{true_element}']").click()
-            elif data[definition] == False:
-                driver.find_element(By.XPATH, f"// label[@for='{false_element}']").click()
-            wait_reload(driver, word, definition, vocab_element, definition_element)
-
-            if check_true(driver) == True:
-                print(f'Found in dictionary: {word} - {definition} - {data[definition]}: Correct')
-            elif check_true(driver) == False and check_timout(driver, word, definition, data) == True:
-                print(f'Assuming timeout on word {word}')
-            elif check_true(driver) == False and check_timout(driver, word, definition, data) == False:
-                print(f'Found in dictionary: {word} - {definition} - {data[definition]}: Incorrect, switching now...')
-                data['definitions'].remove(definition)
-                save_file(file, data)
-            elif check_true(driver) == None:
-                print('Inactivity or invalid security label')
+    definitions: list[str] = data.get('definitions', [])
+
+    if definition in definitions:
+        print('Found in dictionary: ...', end='\r')
+
+        if data[definition] == True:
+            driver.find_element(By.XPATH, f"// label[@for='{true_element}']").click()
+        elif data[definition] == False:
+            driver.find_element(By.XPATH, f"// label[@for='{false_element}']").click()
+        yield page_reloaded(word, definition, vocab_element, definition_element)
+        yield readiness.score_rendered(SCORE_SELECTOR, None, (word, definition), 1, False)
+
+        if check_true(driver) == True:
+            print(f'Found in dictionary: {word} - {definition} - {data[definition]}: Correct')
+        elif check_true(driver) == False and check_timout(driver, word, definition, data) == True:
+            print(f'Assuming timeout on word {word}')
+        elif check_true(driver) == False and check_timout(driver, word, definition, data) == False:
+            print(f'Found in dictionary: {word} - {definition} - {data[definition]}: Incorrect, switching now...')
+            data['definitions'].remove(definition)
+            save_file(file_path, data)
+        elif check_true(driver) == None:
+            print('Inactivity or invalid security label')
+    else:
+        print(f'no entry for {definition} within {word}', end='\r')
+
+        if run_prediction == True and translator.available():
+            translated_word: str = (translator.translate(word, src='la', dest='en').text)
+            translated_word_synonyms: list[str] = synonym_extractor(translated_word)
+            #just to make sure it's added
+            translated_word_synonyms.append(translated_word)
+            translated_word_antonyms = antonym_extractor(translated_word)
+
+            data_antonyms: list[list[str]] = []
+            data_synonyms: list[list[str]] = []
+
+            for item in data:
+                if data[item] == False:
+                    data_antonyms = antonym_extractor(item)
+                    data_antonyms.append(item)
+                elif data[item] == True:
+                    data_synonyms = synonym_extractor(item)
+                    data_synonyms.append(item)
+                
+            if definition in translated_word_synonyms or definition in data_synonyms:
+                predicted_guess = True
+            elif definition in translated_word_antonyms or definition in data_antonyms:
+                predicted_guess = False
+        
+        if predicted_guess == True:
+            driver.find_element(By.XPATH, f"// label[@for='{true_element}']").click()
         else:
-            print(f'no entry for {definition} within {word}', end='\r')
-
-            if run_prediction == True:
-                translated_word: str = (translator.translate(word, src='la', dest='en').text)
-                translated_word_synonyms: list[str] = synonym_extractor(translated_word)
-                #just to make sure it's added
-                translated_word_synonyms.append(translated_word)
-                translated_word_antonyms = antonym_extractor(translated_word)
-
-                data_antonyms: list[list[str]] = []
-                data_synonyms: list[list[str]] = []
-
-                for item in data:
-                    if data[item] == False:
-                        data_antonyms = antonym_extractor(item)
-                        data_antonyms.append(item)
-                    elif data[item] == True:
-                        data_synonyms = synonym_extractor(item)
-                        data_synonyms.append(item)
-                    
-                if definition in translated_word_synonyms or definition in data_synonyms:
-                    predicted_guess = True
-                elif definition in translated_word_antonyms or definition in data_antonyms:
-                    predicted_guess = False
-            
-            if predicted_guess == True:
-                driver.find_element(By.XPATH, f"// label[@for='{true_element}']").click()
-            else:
-                driver.find_element(By.XPATH, f"// label[@for='{false_element}']").click()
+            driver.find_element(By.XPATH, f"// label[@for='{false_element}']").click()
 
-            wait_reload(driver, word, definition, vocab_element, definition_element)
+        yield page_reloaded(word, definition, vocab_element, definition_element)
+        yield readiness.score_rendered(SCORE_SELECTOR, None, (word, definition), 1, False)
 
-            if check_true(driver) == True and predicted_guess != None:
-                if predicted_guess == True:
-                    data['definitions'].append(definition)
-                
-                print(f'Predicted Guess - {predicted_guess}: {word} - {definition}: Correct')
-            elif check_true(driver) == True and predicted_guess == None:
-                print(f'Guess - False: {word} - {definition}: Correct')
-            elif check_true(driver) == False and predicted_guess != None:
-                if predicted_guess == False:
-                    data['definitions'].append(definition)
-
-                print(f'Predicted Guess - {predicted_guess}: {word} - {definition}: Incorrect')
-            elif check_true(driver) == False and predicted_guess == None:
+        if check_true(driver) == True and predicted_guess != None:
+            if predicted_guess == True:
+                data['definitions'].append(definition)
+            
+            print(f'Predicted Guess - {predicted_guess}: {word} - {definition}: Correct')
+        elif check_true(driver) == True and predicted_guess == None:
+            print(f'Guess - False: {word} - {definition}: Correct')
+        elif check_true(driver) == False and predicted_guess != None:
+            if predicted_guess == False:
                 data['definitions'].append(definition)
-                print(f'Guess - False: {word} - {definition}: Inorrect')
-            elif check_true(driver) == None:
-                print('Inactivity or invalid security label')
 
-            save_file(file, data)
\ No newline at end of file
+            print(f'Predicted Guess - {predicted_guess}: {word} - {definition}: Incorrect')
+        elif check_true(driver) == False and predicted_guess == None:
+            data['definitions'].append(definition)
+            print(f'Guess - False: {word} - {definition}: Inorrect')
+        elif check_true(driver) == None:
+            print('Inactivity or invalid security label')
+
+        save_file(file_path, data)
+
+
+def solver(driver: selenium.webdriver, data_path: str, run_prediction: bool, translator: 'TranslationMonitor | None', cancel_token: threading.Event | None = None) -> None:
+    """
+    Automatically solve timed morphology questions on a web page.
+
+    :param driver: The Selenium WebDriver object.
+    :param data_path: The path to the data folder.
+    :param run_prediction: Whether to run prediction.
+    :param translator: The translation monitor, consulted before every Google Translate call.
+    :param cancel_token: Event checked before answering and while waiting for the page to reload.
+    :return: None
+    """
+
+    steps.run(driver, solver_steps(driver, data_path, run_prediction, translator, cancel_token), cancel_token=cancel_token)
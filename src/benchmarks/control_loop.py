@@ -0,0 +1,127 @@
+import os
+import sys
+import time
+import json
+import argparse
+import pathlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import driver
+import lthslatin_manager
+
+
+def count_commands(webdriver) -> dict:
+    """
+    Count every WebDriver command sent by a driver.
+
+    :param webdriver: The Selenium WebDriver object.
+    :return: Dictionary whose 'calls' entry is incremented per command.
+    """
+
+    counter: dict = {'calls': 0}
+    execute = webdriver.execute
+
+    def counted_execute(*args, **kwargs):
+        counter['calls'] += 1
+        return execute(*args, **kwargs)
+
+    webdriver.execute = counted_execute
+
+    return counter
+
+
+def run_polling(webdriver, modes: list[str], duration: float) -> tuple[float | None, int]:
+    """
+    Detect the mode the old way, calling find_mode every 100 ms.
+
+    :return: Tuple of the time the synopsis mode was seen and the number of loop iterations.
+    """
+
+    mode: str | None = None
+    seen: float | None = None
+    ticks: int = 0
+    end_time: float = time.time() + duration
+
+    while time.time() < end_time:
+        mode, assignment = lthslatin_manager.find_mode(webdriver, mode, modes, None)
+        ticks += 1
+
+        if mode == 'synopsis' and seen is None:
+            seen = time.time()
+
+        time.sleep(0.1)
+
+    return seen, ticks
+
+
+def run_push(webdriver, modes: list[str], duration: float, timeout: float) -> tuple[float | None, int]:
+    """
+    Detect the mode with the page agent and long-polls.
+
+    :return: Tuple of the time the synopsis mode was seen and the number of polls.
+    """
+
+    matcher: lthslatin_manager.ModeMatcher = lthslatin_manager.ModeMatcher(modes)
+    mode: str | None = None
+    seen: float | None = None
+    polls: int = 0
+    end_time: float = time.time() + duration
+
+    lthslatin_manager.install_agent(webdriver, timeout)
+
+    while time.time() < end_time:
+        events: list[dict] | None = lthslatin_manager.wait_for_page_events(webdriver, min(timeout, max(end_time - time.time(), 0.1)))
+        polls += 1
+
+        if events is None:
+            events = [lthslatin_manager.probe_page(webdriver)]
+
+        for event in events:
+            mode, assignment = lthslatin_manager.detect_mode(event, mode, matcher, None)
+
+            if mode == 'synopsis' and seen is None:
+                seen = time.time()
+
+    return seen, polls
+
+
+if __name__ == '__main__':
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description='Idle cost and page-change latency of the control loop')
+
+    parser.add_argument('-b', '--browser', help='Browser to benchmark with', type=str, default='Chrome')
+    parser.add_argument('-d', '--duration', help='Seconds to run each path for', type=float, default=30)
+    parser.add_argument('-s', '--switch', help='Milliseconds before the fixture page changes mode', type=int, default=10000)
+    parser.add_argument('-t', '--timeout', help='Long-poll timeout in seconds', type=float, default=2)
+
+    args: argparse.Namespace = parser.parse_args()
+
+    modes: list[str] = json.load(open(f'.{os.sep}default{os.sep}config.json', 'r')).get('modes', [])
+    fixture_url: str = f"{pathlib.Path(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'lthslatin_page.html').as_uri()}?switch={args.switch}"
+
+    webdriver = driver.get_driver(args.browser)
+    counter: dict = count_commands(webdriver)
+
+    try:
+        for name in ('polling', 'push'):
+            webdriver.get(fixture_url)
+
+            calls_before: int = counter['calls']
+            cpu_before: float = time.process_time()
+            start_time: float = time.time()
+
+            if name == 'polling':
+                seen, iterations = run_polling(webdriver, modes, args.duration)
+            else:
+                seen, iterations = run_push(webdriver, modes, args.duration, args.timeout)
+
+            elapsed: float = time.time() - start_time
+            cpu: float = time.process_time() - cpu_before
+            calls: int = counter['calls'] - calls_before
+
+            switch_time: float | None = webdriver.execute_script('return window.switchTime || null;')
+            delay: str = 'not seen' if seen is None or switch_time is None else f'{(seen - switch_time / 1000) * 1000:.0f} ms'
+
+            print(f'{name}: {cpu / elapsed * 100:.2f}% idle CPU, {calls / elapsed * 60:.0f} WebDriver calls/min, page-to-detection delay {delay} ({iterations} iterations)')
+    finally:
+        webdriver.quit()
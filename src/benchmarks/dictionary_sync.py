@@ -0,0 +1,210 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import tempfile
+import threading
+import http.server
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import file_manager
+import library_sync
+
+
+class LibraryRepo(http.server.ThreadingHTTPServer):
+    """
+    Local stand-in for the library repo release, serving a folder with ETags and byte ranges.
+    """
+
+    def __init__(self, repo_path: str) -> None:
+        self.repo_path: str = repo_path
+        self.requests: list[str] = []
+        self.ranges: dict[str, str] = {}
+        self.fail_after: dict[str, int] = {}
+
+        super().__init__(('127.0.0.1', 0), LibraryHandler)
+
+
+class LibraryHandler(http.server.BaseHTTPRequestHandler):
+    server: LibraryRepo
+
+    def do_GET(self) -> None:
+        name: str = self.path.lstrip('/')
+        path: str = os.path.join(self.server.repo_path, name)
+        self.server.requests.append(name)
+
+        if not os.path.isfile(path):
+            self.send_error(404)
+            return
+
+        with open(path, 'rb') as file:
+            content: bytes = file.read()
+
+        etag: str = f'"{hashlib.sha256(content).hexdigest()[:16]}"'
+
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        start: int = 0
+
+        if self.headers.get('Range') is not None:
+            self.server.ranges[name] = self.headers['Range']
+            start = int(self.headers['Range'].split('=')[1].rstrip('-'))
+
+            if start >= len(content):
+                self.send_response(416)
+                self.end_headers()
+                return
+
+        body: bytes = content[start:]
+
+        self.send_response(206 if start > 0 else 200)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+
+        # Drops the connection halfway through once, to check the next sync resumes.
+        if self.server.fail_after.pop(name, None) is not None:
+            self.wfile.write(body[:len(body) // 2])
+            self.wfile.flush()
+            self.connection.close()
+            return
+
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        return None
+
+
+def write_repo(repo_path: str, shards: dict[str, bytes]) -> None:
+    """
+    Write the shards and their checksum manifest.
+    """
+
+    for name, content in shards.items():
+        with open(os.path.join(repo_path, name), 'wb') as file:
+            file.write(content)
+
+    with open(os.path.join(repo_path, 'checksum.json'), 'w') as file:
+        json.dump({name: hashlib.sha256(content).hexdigest() for name, content in shards.items()}, file)
+
+
+def check(label: str, condition: bool) -> bool:
+    """
+    Print a check's outcome.
+    """
+
+    print(f'    {"ok  " if condition else "FAIL"} {label}')
+
+    return condition
+
+
+if __name__ == '__main__':
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description='Dictionary sync against a local library repo: full, incremental, no-op and resumed syncs, with timings and checks')
+
+    parser.add_argument('-s', '--shards', help='Shards in the library', type=int, default=2000)
+    parser.add_argument('-c', '--changed', help='Shards changed between releases', type=int, default=20)
+    parser.add_argument('-w', '--workers', help='Concurrent downloads', type=int, default=8)
+
+    args: argparse.Namespace = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temporary_path:
+        repo_path: str = os.path.join(temporary_path, 'repo')
+        data_path: str = os.path.join(temporary_path, 'data')
+        library_path: str = os.path.join(data_path, 'dictionary')
+        os.makedirs(repo_path)
+        os.makedirs(data_path)
+
+        shards: dict[str, bytes] = {f'word_{index}.json': json.dumps({'word': f'word{index}', 'definitions': [f'meaning {index}'] * 20}).encode() for index in range(args.shards)}
+        write_repo(repo_path, shards)
+
+        server: LibraryRepo = LibraryRepo(repo_path)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url: str = f'http://127.0.0.1:{server.server_port}/'
+
+        def timed_sync() -> tuple[list[str], float]:
+            server.requests.clear()
+            start_time: float = time.perf_counter()
+            updated: list[str] = library_sync.sync(base_url, library_path, 'checksum.json', data_path, args.workers, 1, 5)
+
+            return updated, time.perf_counter() - start_time
+
+        passed: bool = True
+
+        updated, elapsed = timed_sync()
+        print(f'Full sync: {len(updated)} shards in {elapsed * 1000:.0f} ms')
+        passed &= check('every shard downloaded', len(updated) == args.shards)
+        passed &= check('staging folder removed', not os.path.exists(f'{library_path}.partial'))
+
+        updated, elapsed = timed_sync()
+        print(f'No-op sync: {len(updated)} shards in {elapsed * 1000:.0f} ms')
+        passed &= check('nothing downloaded', len(updated) == 0 and server.requests == ['checksum.json'])
+
+        changed: list[str] = list(shards)[:args.changed]
+        previous: dict[str, bytes] = dict(shards)
+
+        for name in changed:
+            shards[name] += b' '
+
+        # A shard timed vocabulary learned into, which the repo also changed, has to survive the sync.
+        edited: str = list(shards)[args.changed]
+        learned: dict = {'word': 'learned', 'definitions': ['learned meaning']}
+        shards[edited] += b' '
+        file_manager.save_json(os.path.join(library_path, edited), learned)
+
+        # Big enough for the interrupted download to leave part of it on disk.
+        shards[changed[0]] += b' ' * (1 << 20)
+
+        write_repo(repo_path, shards)
+        server.fail_after[changed[0]] = 1
+
+        updated, elapsed = timed_sync()
+        print(f'Interrupted sync: {len(updated)} shards in {elapsed * 1000:.0f} ms')
+        passed &= check('library left untouched', len(updated) == 0 and file_manager.read_json(os.path.join(library_path, changed[1])) == json.loads(previous[changed[1]]))
+        passed &= check('partial shard kept', 0 < os.path.getsize(os.path.join(f'{library_path}.partial', changed[0])) < len(shards[changed[0]]))
+
+        updated, elapsed = timed_sync()
+        print(f'Incremental sync: {len(updated)} shards in {elapsed * 1000:.0f} ms')
+        passed &= check('partial shard resumed', changed[0] in server.ranges)
+        passed &= check('only changed shards downloaded', sorted(updated) == sorted(changed) and len(server.requests) == len(changed) + 1)
+        passed &= check('library matches the repo', all(file_manager.read_json(os.path.join(library_path, name)) == json.loads(content) for name, content in shards.items() if name != edited))
+        passed &= check('locally edited shard kept', edited not in updated and file_manager.read_json(os.path.join(library_path, edited)) == learned)
+
+        # Shards converted to a binary serializer by hand have to match the repo without the state, then keep syncing.
+        file_manager.configure_serializers({'dictionary': 'marshal'})
+        file_manager.migrate(library_path, 'marshal')
+        os.remove(os.path.join(data_path, 'library-hashes.json'))
+
+        updated, elapsed = timed_sync()
+        print(f'Sync after converting the library, without the state: {len(updated)} shards in {elapsed * 1000:.0f} ms')
+        passed &= check('converted shards match the repo', len(updated) == 0 and server.requests == ['checksum.json'])
+
+        converted: list[str] = [name for name in shards if name != edited][:args.changed]
+
+        for name in converted:
+            shards[name] += b' '
+
+        write_repo(repo_path, shards)
+
+        updated, elapsed = timed_sync()
+        print(f'Incremental sync of converted shards: {len(updated)} shards in {elapsed * 1000:.0f} ms')
+        passed &= check('converted shards updated', sorted(updated) == sorted(converted))
+        passed &= check('updated shards converted', all(file_manager.read_source(os.path.join(library_path, name)) is not None for name in converted))
+        passed &= check('locally edited shard still kept', file_manager.read_json(os.path.join(library_path, edited)) == learned)
+
+        # Shards the sync converted count as synced again once the state is lost.
+        os.remove(os.path.join(data_path, 'library-hashes.json'))
+
+        updated, elapsed = timed_sync()
+        synced: dict[str, str] = library_sync.synced_hashes(os.path.join(data_path, 'library-hashes.json'), 'sha256')
+        passed &= check('synced shards recognized without the state', len(updated) == 0 and all(name in synced for name in converted))
+
+        server.shutdown()
+
+    print('All checks passed' if passed else 'Some checks failed')
+    sys.exit(0 if passed else 1)
@@ -0,0 +1,89 @@
+import os
+import sys
+import time
+import argparse
+import tarfile
+import tempfile
+import subprocess
+import statistics
+
+
+SRC_PATH: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_times(src_path: str, module: str) -> dict[str, int]:
+    """
+    Import a module in a fresh interpreter with -X importtime.
+
+    :return: Dictionary mapping each imported module to its cumulative import time in microseconds.
+    """
+
+    result: subprocess.CompletedProcess = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], cwd=src_path, capture_output=True, text=True)
+
+    if result.returncode != 0:
+        raise Exception(result.stderr.strip().splitlines()[-1])
+
+    times: dict[str, int] = {}
+
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+
+        self_time, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+
+    return times
+
+
+def time_to_login_window(src_path: str, repeat: int) -> float:
+    """
+    Time a fresh interpreter importing main, everything the entry point runs before the login window on the main thread.
+
+    :return: The median in seconds.
+    """
+
+    times: list[float] = []
+
+    for _ in range(repeat):
+        start_time: float = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'import main'], cwd=src_path, capture_output=True, check=True)
+        times.append(time.perf_counter() - start_time)
+
+    return statistics.median(times)
+
+
+def report(label: str, src_path: str, repeat: int, top: int) -> None:
+    """
+    Print the time to the login window and the slowest imports of a source tree.
+    """
+
+    times: dict[str, int] = import_times(src_path, 'main')
+
+    print(f'{label}: {time_to_login_window(src_path, repeat) * 1000:.0f} ms to login window, main imports in {times.get("main", 0) / 1000:.0f} ms')
+
+    for name, cumulative in sorted(times.items(), key=lambda item: -item[1])[1:top + 1]:
+        print(f'    {name:<40} {cumulative / 1000:>7.0f} ms')
+
+
+if __name__ == '__main__':
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description='Start-up import cost (python -X importtime), optionally against an older revision')
+
+    parser.add_argument('-c', '--compare', help='Git revision to compare against (e.g. HEAD~1)', type=str)
+    parser.add_argument('-r', '--repeat', help='Interpreter starts to time', type=int, default=5)
+    parser.add_argument('-t', '--top', help='Slowest imports to list', type=int, default=10)
+
+    args: argparse.Namespace = parser.parse_args()
+
+    if args.compare is not None:
+        with tempfile.TemporaryDirectory() as tree_path:
+            archive_path: str = os.path.join(tree_path, 'src.tar')
+            repo_root: str = os.path.dirname(SRC_PATH)
+
+            subprocess.run(['git', 'archive', '-o', archive_path, args.compare, 'src'], cwd=repo_root, check=True)
+
+            with tarfile.open(archive_path) as archive:
+                archive.extractall(tree_path)
+
+            report(f'before ({args.compare})', os.path.join(tree_path, 'src'), args.repeat, args.top)
+
+    report('after' if args.compare is not None else 'current', SRC_PATH, args.repeat, args.top)
@@ -0,0 +1,114 @@
+import gc
+import os
+import sys
+import glob
+import json
+import time
+import pickle
+import tracemalloc
+import random
+import argparse
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import assignments.composition
+
+
+def rss() -> int:
+    """
+    Get the process's resident set size.
+
+    :return: The RSS in bytes, the peak RSS where the current one can't be read.
+    """
+
+    try:
+        with open('/proc/self/statm', 'r') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+
+
+def write_shards(folder_path: str, count: int, glosses: int) -> None:
+    """
+    Write dictionary shards shaped like the library's, with English glosses shared between Latin words.
+    """
+
+    rng: random.Random = random.Random(0)
+    vocabulary: list[str] = [f'gloss {index}' for index in range(count // 2)]
+
+    for index in range(count):
+        with open(os.path.join(folder_path, f'{index}.json'), 'w') as file:
+            json.dump({'word': f'verbum{index}', 'definitions': rng.sample(vocabulary, glosses)}, file)
+
+
+def measure(folder_path: str, compact: bool) -> dict:
+    """
+    Build one dictionary structure and report what keeping it alive costs. Runs in its own interpreter.
+
+    :return: Dictionary with the RSS growth, memory retained, build time and pickled size.
+    """
+
+    file_list: list[str] = glob.glob(os.path.join(folder_path, '*.json'))
+
+    # Read the files once first so the OS and allocator warm-up isn't counted against the structure.
+    list(assignments.composition.read_entries(file_list))
+    gc.collect()
+
+    before: int = rss()
+    start_time: float = time.perf_counter()
+    dictionary = assignments.composition.generate_dictionary(file_list, compact)
+    build_time: float = time.perf_counter() - start_time
+    gc.collect()
+
+    result: dict = {'rss': rss() - before, 'build': build_time, 'pickled': len(pickle.dumps(dictionary)), 'sample': {word: assignments.composition.translate(word, 'english', dictionary) for word in ('gloss 1', 'gloss 2', 'missing')}}
+
+    # RSS keeps pages the build freed, tracemalloc tells what the structure itself holds on to.
+    del dictionary
+    gc.collect()
+    tracemalloc.start()
+    dictionary = assignments.composition.generate_dictionary(file_list, compact)
+    gc.collect()
+    result['retained'] = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return result
+
+
+if __name__ == '__main__':
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description='Memory of the composition dictionary as nested dictionaries and as a compact lexicon')
+
+    parser.add_argument('-d', '--data', help='Folder of dictionary shards, generated ones by default', type=str)
+    parser.add_argument('-n', '--count', help='Shards to generate', type=int, default=50000)
+    parser.add_argument('-g', '--glosses', help='English glosses per generated shard', type=int, default=4)
+    parser.add_argument('--measure', help=argparse.SUPPRESS, choices=('nested', 'compact'))
+
+    args: argparse.Namespace = parser.parse_args()
+
+    if args.measure is not None:
+        print(json.dumps(measure(args.data, args.measure == 'compact')))
+        sys.exit(0)
+
+    with tempfile.TemporaryDirectory() as temporary_path:
+        folder_path: str = args.data
+
+        if folder_path is None:
+            folder_path = temporary_path
+            write_shards(folder_path, args.count, args.glosses)
+
+        results: dict[str, dict] = {}
+
+        for structure in ('nested', 'compact'):
+            output: str = subprocess.run([sys.executable, os.path.abspath(__file__), '--measure', structure, '-d', folder_path], capture_output=True, text=True, check=True).stdout
+            results[structure] = json.loads(output.strip().splitlines()[-1])
+
+    print(f'{len(glob.glob(os.path.join(folder_path, "*.json"))) if args.data else args.count} shards')
+    print(f'    {"structure":<10} {"RSS":>10} {"retained":>10} {"pickled":>10} {"build":>9}')
+
+    for structure, result in results.items():
+        print(f'    {structure:<10} {result["rss"] / 1048576:>7.1f} MB {result["retained"] / 1048576:>7.1f} MB {result["pickled"] / 1048576:>7.1f} MB {result["build"] * 1000:>6.0f} ms')
+
+    print(f'Compact lexicon uses {results["compact"]["rss"] / max(results["nested"]["rss"], 1):.0%} of the nested RSS ({results["compact"]["retained"] / max(results["nested"]["retained"], 1):.0%} retained), translations {"match" if results["compact"]["sample"] == results["nested"]["sample"] else "DIFFER"}')
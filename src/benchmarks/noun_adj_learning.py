@@ -0,0 +1,138 @@
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import file_manager
+import assignments.noun_adj_learning
+from assignments.noun_adj_engine import AgreementChart
+
+
+CONSONANTS: str = 'bcdfgklmnprt'
+
+
+def make_phrases(chart: AgreementChart, count: int, chart_errors: float, noise: float, rng: random.Random) -> tuple[list[str], list[bool]]:
+    """
+    Make phrases from the chart's endings with the answers the site would grade them by.
+
+    Half of the phrases pair endings the chart says agree. The site's answer for an ending pair is the chart's, except
+    for a share of pairs the chart gets wrong, and a share of phrases disagree with their ending pair either way.
+
+    :return: The phrases and their answers.
+    """
+
+    endings: list[str] = list(chart.masks)
+    flipped_pairs: dict[tuple[str, str], bool] = {}
+    phrases: list[str] = []
+    answers: list[bool] = []
+
+    for index in range(count):
+        noun_ending: str = rng.choice(endings)
+        agreeing: list[str] = [ending for ending in endings if chart.masks[ending] & chart.masks[noun_ending]]
+        adjective_ending: str = rng.choice(agreeing if rng.random() < 0.5 else endings)
+
+        stems: list[str] = [''.join(rng.choice(CONSONANTS) for letter in range(3)) for word in range(2)]
+        phrase: str = f'{stems[0]}{noun_ending} {stems[1]}{adjective_ending}'
+        pair: tuple[str, str] = tuple(sorted((noun_ending, adjective_ending)))
+
+        if pair not in flipped_pairs:
+            flipped_pairs[pair] = rng.random() < chart_errors
+
+        answers.append(chart.agrees(phrase.split()) ^ flipped_pairs[pair] ^ (rng.random() < noise))
+        phrases.append(phrase)
+
+    return phrases, answers
+
+
+def accuracy(chart: AgreementChart, phrases: list[str], answers: list[bool]) -> float:
+    """
+    Get the share of phrases the chart answers correctly.
+    """
+
+    return sum(prediction == answer for prediction, answer in zip(chart.score_page(phrases), answers)) / len(phrases)
+
+
+def simulate(chart_data: dict, pages: int, chart_errors: float, noise: float, seed: int) -> dict:
+    """
+    Solve and learn from honestly scored pages, measuring the chart's accuracy and the time spent learning.
+
+    :return: Dictionary with the accuracy before, at each quarter and at the end, and the slowest learning calls.
+    """
+
+    rng: random.Random = random.Random(seed)
+    chart: AgreementChart = AgreementChart(chart_data)
+    phrases, answers = make_phrases(chart, 3000, chart_errors, noise, rng)
+    result: dict = {'before': accuracy(chart, phrases, answers), 'checkpoints': [], 'learn-times': []}
+
+    with tempfile.TemporaryDirectory() as temporary_path:
+        history_path: str = os.path.join(temporary_path, 'history.json')
+        overlay_path: str = os.path.join(temporary_path, 'learned.json')
+
+        for page in range(1, pages + 1):
+            indexes: list[int] = rng.sample(range(len(phrases)), 10)
+            page_phrases: list[str] = [phrases[index] for index in indexes]
+            outputs: list[bool] = chart.score_page(page_phrases)
+            score: int = sum(output == answers[index] for output, index in zip(outputs, indexes))
+
+            start_time: float = time.perf_counter()
+            assignments.noun_adj_learning.learn(chart, history_path, overlay_path, page_phrases, outputs, score)
+            result['learn-times'].append(time.perf_counter() - start_time)
+
+            if page % max(pages // 4, 1) == 0:
+                result['checkpoints'].append((page, accuracy(chart, phrases, answers)))
+
+        # The saved overlay has to give the same chart as the one learned in memory.
+        result['reloaded'] = accuracy(AgreementChart(chart_data, file_manager.read_json(overlay_path)), phrases, answers)
+
+    result['after'] = accuracy(chart, phrases, answers)
+
+    return result
+
+
+def check(label: str, condition: bool) -> bool:
+    """
+    Print a check's outcome.
+    """
+
+    print(f'    {"ok  " if condition else "FAIL"} {label}')
+
+    return condition
+
+
+if __name__ == '__main__':
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description='Noun-adj learning against simulated honest scores: accuracy and time per page, with and without chart errors')
+
+    parser.add_argument('-c', '--chart', help='Path to the noun-adj chart', type=str, default=f'.{os.sep}default{os.sep}data{os.sep}noun_adj_charts{os.sep}default.json')
+    parser.add_argument('--config', help='Path to the configuration file, for its serializers', type=str, default=f'.{os.sep}default{os.sep}config.json')
+    parser.add_argument('-p', '--pages', help='Scored pages to learn from', type=int, default=400)
+    parser.add_argument('-n', '--noise', help='Share of phrases that disagree with their ending pair', type=float, default=0.08)
+    parser.add_argument('-e', '--chart-errors', help='Share of ending pairs the chart gets wrong in the second run', type=float, default=0.1)
+    parser.add_argument('-s', '--seed', help='Random seed', type=int, default=0)
+
+    args: argparse.Namespace = parser.parse_args()
+
+    file_manager.configure_serializers((file_manager.read_json(args.config) or {}).get('serializers', {}))
+
+    chart_data: dict = file_manager.read_json(args.chart)
+    passed: bool = True
+
+    for label, chart_errors in (('Correct chart', 0.0), ('Chart with errors', args.chart_errors)):
+        result: dict = simulate(chart_data, args.pages, chart_errors, args.noise, args.seed)
+        late_times: list[float] = result['learn-times'][-50:]
+
+        print(f'{label}: accuracy {result["before"]:.3f} -> {", ".join(f"{accuracy:.3f} (page {page})" for page, accuracy in result["checkpoints"])}')
+        print(f'    learning takes {sum(late_times) / len(late_times) * 1000:.1f} ms per page over the last 50 pages (slowest {max(result["learn-times"]) * 1000:.1f} ms)')
+
+        passed &= check('accuracy never goes down', all(accuracy >= result['before'] - 0.005 for page, accuracy in result['checkpoints']))
+        passed &= check('saved overlay matches the learned chart', abs(result['reloaded'] - result['after']) < 1e-9)
+        passed &= check('learning stays fast', max(late_times) < 0.05)
+
+        if chart_errors > 0:
+            passed &= check('chart errors corrected', result['after'] > result['before'] + 0.01)
+
+    print('All checks passed' if passed else 'Some checks failed')
+    sys.exit(0 if passed else 1)
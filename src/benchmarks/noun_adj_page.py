@@ -0,0 +1,40 @@
+import os
+import sys
+import time
+import json
+import argparse
+import pathlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import driver
+import assignments.noun_adj
+
+
+if __name__ == '__main__':
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description='Seconds per noun-adj page for the legacy and batch solvers')
+
+    parser.add_argument('-b', '--browser', help='Browser to benchmark with', type=str, default='Chrome')
+    parser.add_argument('-r', '--runs', help='Pages to solve per path', type=int, default=3)
+    parser.add_argument('-c', '--chart', help='Path to the noun-adj chart', type=str, default=f'.{os.sep}default{os.sep}data{os.sep}noun_adj_charts{os.sep}default.json')
+
+    args: argparse.Namespace = parser.parse_args()
+
+    fixture_url: str = pathlib.Path(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'noun_adj.html').as_uri()
+    chart: assignments.noun_adj.AgreementChart = assignments.noun_adj.compile_chart(json.load(open(args.chart, 'r', encoding='utf-8')))
+    webdriver = driver.get_driver(args.browser)
+
+    try:
+        for name, batch in (('legacy', False), ('batch', True)):
+            timings: list[float] = []
+
+            for run in range(args.runs):
+                webdriver.get(fixture_url)
+
+                start_time: float = time.perf_counter()
+                assignments.noun_adj.solver(webdriver, chart, batch=batch)
+                timings.append(time.perf_counter() - start_time)
+
+            print(f'{name}: {sum(timings) / len(timings):.3f} seconds per page (best {min(timings):.3f}, {args.runs} runs)')
+    finally:
+        webdriver.quit()
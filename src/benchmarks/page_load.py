@@ -0,0 +1,71 @@
+import os
+import sys
+import time
+import json
+import argparse
+import pathlib
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import driver
+import browser_profiles
+from selenium.webdriver.common.by import By
+
+
+def time_to_interactive(webdriver, url: str, timeout: float) -> tuple[float, float | None]:
+    """
+    Load a page and wait until a jQuery Mobile page is active.
+
+    :return: Tuple of the seconds until the page was usable and the browser's own domInteractive time in seconds.
+    """
+
+    start_time: float = time.perf_counter()
+    webdriver.get(url)
+
+    driver.loadWait(webdriver, timeout, By.CSS_SELECTOR, '.ui-page-active')
+    elapsed: float = time.perf_counter() - start_time
+
+    dom_interactive: float | None = webdriver.execute_script('const timing = performance.timing; return timing.domInteractive > 0 ? timing.domInteractive - timing.navigationStart : null;')
+
+    return elapsed, None if dom_interactive is None else dom_interactive / 1000
+
+
+if __name__ == '__main__':
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description='Time-to-interactive of lthslatin pages for each browser profile')
+
+    parser.add_argument('-b', '--browser', help='Browser to benchmark with', type=str, default='Chrome')
+    parser.add_argument('-p', '--profiles', help='Profiles to benchmark, all profiles in the config by default', type=str, nargs='*')
+    parser.add_argument('-u', '--url', help='Pages to load, the lthslatin fixture by default', type=str, nargs='*')
+    parser.add_argument('-r', '--repeat', help='Warm loads per page after the cold one', type=int, default=3)
+    parser.add_argument('-t', '--timeout', help='Seconds to wait for each page', type=float, default=30)
+
+    args: argparse.Namespace = parser.parse_args()
+
+    config: dict = json.load(open(f'.{os.sep}default{os.sep}config.json', 'r'))
+    profile_names: list[str] = args.profiles or list(config.get('browser-profiles', {}).keys())
+    urls: list[str] = args.url or [pathlib.Path(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'lthslatin_page.html').as_uri()]
+
+    with tempfile.TemporaryDirectory() as data_path:
+        for name in profile_names:
+            profile: dict = browser_profiles.get_profile(config, f'{data_path}{os.sep}', name)
+
+            start_time: float = time.perf_counter()
+            webdriver = driver.get_driver(args.browser, profile=profile)
+            launch_time: float = time.perf_counter() - start_time
+
+            try:
+                for url in urls:
+                    cold, cold_dom = time_to_interactive(webdriver, url, args.timeout)
+                    warm_times: list[float] = []
+
+                    for _ in range(args.repeat):
+                        webdriver.get('about:blank')
+                        warm_times.append(time_to_interactive(webdriver, url, args.timeout)[0])
+
+                    warm: str = 'n/a' if len(warm_times) == 0 else f'{sum(warm_times) / len(warm_times) * 1000:.0f} ms'
+                    dom: str = 'n/a' if cold_dom is None else f'{cold_dom * 1000:.0f} ms'
+
+                    print(f'{name}: launch {launch_time * 1000:.0f} ms, {url} cold {cold * 1000:.0f} ms (domInteractive {dom}), warm {warm}')
+            finally:
+                webdriver.quit()
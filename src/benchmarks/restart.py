@@ -0,0 +1,85 @@
+import os
+import sys
+import time
+import json
+import argparse
+import pathlib
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import driver
+import browser_daemon
+import browser_profiles
+import lthslatin_manager
+from selenium.webdriver.common.by import By
+
+
+def ready_to_solve(webdriver, modes: list[str], timeout: float) -> str | None:
+    """
+    Wait until the page is active and detect its mode, the point where the first solve can start.
+
+    :return: The detected mode.
+    """
+
+    driver.loadWait(webdriver, timeout, By.CSS_SELECTOR, '.ui-page-active')
+    mode, assignment = lthslatin_manager.detect_mode(lthslatin_manager.probe_page(webdriver), None, lthslatin_manager.ModeMatcher(modes), None)
+
+    return mode
+
+
+if __name__ == '__main__':
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description='Restart-to-first-solve time with a cold browser and when attaching to a warm one')
+
+    parser.add_argument('-b', '--browser', help='Chromium based browser to benchmark with', type=str, default='Chrome')
+    parser.add_argument('-u', '--url', help='Page to solve from, the lthslatin fixture by default', type=str)
+    parser.add_argument('-r', '--restarts', help='Restarts to time for each path', type=int, default=3)
+    parser.add_argument('-p', '--port', help='Remote-debugging port of the warm browser', type=int, default=9222)
+    parser.add_argument('-t', '--timeout', help='Seconds to wait for the page', type=float, default=30)
+
+    args: argparse.Namespace = parser.parse_args()
+
+    config: dict = json.load(open(f'.{os.sep}default{os.sep}config.json', 'r'))
+    modes: list[str] = config.get('modes', [])
+    url: str = args.url or f"{pathlib.Path(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'lthslatin_page.html').as_uri()}?switch=0"
+
+    with tempfile.TemporaryDirectory() as data_path:
+        profile: dict = browser_profiles.get_profile(config, f'{data_path}{os.sep}')
+        cold_times: list[float] = []
+
+        for _ in range(args.restarts):
+            start_time: float = time.perf_counter()
+            webdriver = driver.get_driver(args.browser, profile=profile)
+
+            try:
+                webdriver.get(url)
+                mode: str | None = ready_to_solve(webdriver, modes, args.timeout)
+                cold_times.append(time.perf_counter() - start_time)
+            finally:
+                webdriver.quit()
+
+        warm_profile: dict = dict(profile)
+        warm_profile['remote-debugging-port'] = args.port
+
+        warm_browser = driver.get_driver(args.browser, profile=warm_profile)
+        warm_browser.get(url)
+        warm_times: list[float] = []
+
+        try:
+            for _ in range(args.restarts):
+                start_time = time.perf_counter()
+
+                if not browser_daemon.debugger_alive(f'127.0.0.1:{args.port}'):
+                    raise Exception('Warm browser is not listening')
+
+                webdriver = driver.attach_driver(args.browser, f'127.0.0.1:{args.port}')
+                mode = ready_to_solve(webdriver, modes, args.timeout)
+                warm_times.append(time.perf_counter() - start_time)
+
+                # Stop the attached chromedriver without closing the warm browser.
+                webdriver.service.stop()
+        finally:
+            warm_browser.quit()
+
+    print(f'cold start: {sum(cold_times) / len(cold_times) * 1000:.0f} ms to first solve (mode: {mode})')
+    print(f'attach to warm browser: {sum(warm_times) / len(warm_times) * 1000:.0f} ms to first solve')
@@ -0,0 +1,82 @@
+import os
+import sys
+import glob
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import file_manager
+
+
+def sample_data(count: int) -> list[dict]:
+    """
+    Generate dictionary shards shaped like the library's.
+
+    :return: The shards.
+    """
+
+    return [{'word': f'verbum{index}', 'definitions': [f'meaning {index} {sense}' for sense in range(8)], 'morphology': {'pos': 'noun', 'gender': 'n', 'declension': index % 5 + 1}} for index in range(count)]
+
+
+def time_backend(name: str, shards: list[dict], folder_path: str, repeat: int) -> tuple[int, float, float]:
+    """
+    Save and load every shard with a serializer.
+
+    :return: The bytes on disk and the median save and load times in seconds.
+    """
+
+    os.makedirs(folder_path, exist_ok=True)
+    paths: list[str] = [os.path.join(folder_path, f'{index}.json') for index in range(len(shards))]
+    save_times: list[float] = []
+    load_times: list[float] = []
+
+    for _ in range(repeat):
+        start_time: float = time.perf_counter()
+
+        for path, shard in zip(paths, shards):
+            with open(path, 'wb') as file:
+                file.write(file_manager.dumps(shard, name=name))
+
+        save_times.append(time.perf_counter() - start_time)
+
+        start_time = time.perf_counter()
+
+        for path in paths:
+            file_manager.read_json(path)
+
+        load_times.append(time.perf_counter() - start_time)
+
+    return sum(os.path.getsize(path) for path in paths), statistics.median(save_times), statistics.median(load_times)
+
+
+if __name__ == '__main__':
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description='Load and save times of each serializer backend over dictionary shards')
+
+    parser.add_argument('-d', '--data', help='Folder of JSON shards to use, generated ones by default', type=str)
+    parser.add_argument('-n', '--count', help='Shards to generate', type=int, default=5000)
+    parser.add_argument('-r', '--repeat', help='Rounds to time', type=int, default=3)
+
+    args: argparse.Namespace = parser.parse_args()
+
+    shards: list[dict] = sample_data(args.count) if args.data is None else [file_manager.read_json(path) for path in glob.glob(os.path.join(args.data, '*.json'))]
+    temporary_path: str = tempfile.mkdtemp()
+
+    try:
+        # One file per shard like the dictionary, and everything in one file like a cache or chart.
+        for label, documents in ((f'{len(shards)} shard files', shards), ('one file', [{'shards': shards}])):
+            print(label)
+            print(f'    {"backend":<14} {"size":>10} {"save":>9} {"load":>9}')
+
+            for name, serializer in file_manager.SERIALIZERS.items():
+                if not serializer.available():
+                    print(f'    {name:<14} not installed ({serializer.module})')
+                    continue
+
+                size, save_time, load_time = time_backend(name, documents, os.path.join(temporary_path, label, name), args.repeat)
+                print(f'    {name:<14} {size / 1024:>7.0f} KB {save_time * 1000:>6.0f} ms {load_time * 1000:>6.0f} ms')
+    finally:
+        shutil.rmtree(temporary_path)
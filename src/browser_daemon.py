@@ -0,0 +1,186 @@
+import os
+import time
+import argparse
+import requests
+import selenium.webdriver
+
+import driver
+import file_manager
+import login_manager
+import browser_profiles
+import schoology_manager
+import lthslatin_manager
+
+
+def get_state_path(config: dict, data_path: str) -> str:
+    """
+    Get the path of the file the daemon advertises its browser in.
+
+    :param config: Dictionary containing the configuration settings.
+    :param data_path: Path to the data folder.
+    :return: The state file path.
+    """
+
+    return file_manager.clean_path(config.get('browser-daemon', {}).get('state', '[MINERVA-FOLDER]browser.json'), data_path)
+
+
+def debugger_alive(debugger_address: str, timeout: float = 0.5) -> bool:
+    """
+    Check if a browser is listening on a remote-debugging address.
+
+    :param debugger_address: The address to check (e.g. 127.0.0.1:9222).
+    :param timeout: Seconds to wait for the browser to answer.
+    :return: True if the browser answered, otherwise False.
+    """
+
+    try:
+        return requests.get(f'http://{debugger_address}/json/version', timeout=timeout).ok
+    except requests.exceptions.RequestException:
+        return False
+
+
+def find_debugger_address(config: dict, data_path: str) -> tuple[str, str] | None:
+    """
+    Find a running browser to attach to, either configured directly or started by the daemon.
+
+    :param config: Dictionary containing the configuration settings.
+    :param data_path: Path to the data folder.
+    :return: Tuple of the browser and its remote-debugging address, or None if no browser is running.
+    """
+
+    daemon_config: dict = config.get('browser-daemon', {})
+    browser: str = config.get('browser', 'Chrome').title()
+
+    if daemon_config.get('debugger-address') is not None and debugger_alive(daemon_config['debugger-address']):
+        return browser, daemon_config['debugger-address']
+
+    state: dict | None = file_manager.read_json(get_state_path(config, data_path))
+
+    if state is not None and debugger_alive(state.get('debugger-address', '')):
+        return state.get('browser', browser), state['debugger-address']
+
+    return None
+
+
+def attach(config: dict, data_path: str) -> selenium.webdriver.Remote | None:
+    """
+    Attach to a running browser if there is one.
+
+    :param config: Dictionary containing the configuration settings.
+    :param data_path: Path to the data folder.
+    :return: The driver controlling the running browser, or None if there is nothing to attach to.
+    """
+
+    found: tuple[str, str] | None = find_debugger_address(config, data_path)
+
+    if found is None:
+        return None
+
+    browser, debugger_address = found
+    driver_registry_config: dict = config.get('driver-registry', {})
+    driver_registry_path: str = file_manager.clean_path(driver_registry_config.get('path', '[MINERVA-FOLDER]drivers.json'), data_path)
+
+    try:
+        webdriver: selenium.webdriver = driver.attach_driver(browser, debugger_address, driver_registry_path, driver_registry_config)
+    except Exception as error:
+        print(f'Unable to attach to {browser} at {debugger_address}: {error}')
+        return None
+
+    print(f'Attached to {browser} at {debugger_address}')
+
+    return webdriver
+
+
+def run(config: dict, data_path: str, master_password: str) -> None:
+    """
+    Start a browser, log it in to the Latin site and keep it running for minerva to attach to.
+
+    :param config: Dictionary containing the configuration settings.
+    :param data_path: Path to the data folder.
+    :param master_password: The master password unlocking the saved credentials.
+    :return: None
+    """
+
+    daemon_config: dict = config.get('browser-daemon', {})
+    browser: str = config.get('browser', 'Chrome').title()
+    port: int = int(daemon_config.get('port', 9222))
+    keepalive: float = float(daemon_config.get('keepalive', 60))
+    state_path: str = get_state_path(config, data_path)
+
+    if find_debugger_address(config, data_path) is not None:
+        print('A browser is already running, exiting...')
+        return
+
+    key: bytes = login_manager.generate_key(master_password)
+    username, password = login_manager.load_credentials(key, f'{data_path}secrets.enc')
+
+    schoology_url: str = config.get('schoology-url', '')
+
+    if not schoology_url.endswith('/'):
+        config['schoology-url'] = f'{schoology_url}/'
+
+    profile: dict = browser_profiles.get_profile(config, data_path)
+    profile['remote-debugging-port'] = port
+
+    driver_registry_config: dict = config.get('driver-registry', {})
+    driver_registry_path: str = file_manager.clean_path(driver_registry_config.get('path', '[MINERVA-FOLDER]drivers.json'), data_path)
+    site_session_path: str = file_manager.clean_path(config.get('lthslatin-session', {}).get('path', '[MINERVA-FOLDER]lthslatin.enc'), data_path)
+
+    webdriver: selenium.webdriver = driver.get_driver(browser, driver_registry_path, driver_registry_config, profile)
+
+    if not lthslatin_manager.restore_site_session(webdriver, config, key, site_session_path):
+        session_path: str = file_manager.clean_path(config.get('schoology-session', {}).get('path', '[MINERVA-FOLDER]session.enc'), data_path)
+        session, sections = schoology_manager.open_session(config, key, username, password.strip(), session_path)
+
+        lthslatin_manager.open_site(webdriver, config, session)
+
+    username, password = None, None
+    lthslatin_manager.save_site_session(webdriver, key, site_session_path)
+
+    file_manager.save_json(state_path, {
+        'browser': browser,
+        'debugger-address': f'127.0.0.1:{port}',
+        'pid': os.getpid(),
+        'started': int(time.time())
+    })
+
+    print(f'Browser ready at 127.0.0.1:{port}, press Ctrl+C to stop')
+
+    try:
+        while True:
+            time.sleep(keepalive)
+
+            try:
+                webdriver.title
+            except Exception:
+                print('Browser closed, exiting...')
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if os.path.exists(state_path):
+            os.remove(state_path)
+
+        try:
+            webdriver.quit()
+        except Exception:
+            pass
+
+
+if __name__ == '__main__':
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description='Keeps a logged in browser running for minerva to attach to')
+
+    parser.add_argument('-d', '--data', help='Path to the data folder', type=str)
+    parser.add_argument('-mp', '--master-password', help='Master Password to unlock', type=str, required=True)
+
+    args: argparse.Namespace = parser.parse_args()
+
+    data_path: str = f'{file_manager.get_documents_folder()}{os.sep}minerva{os.sep}'
+
+    if args.data is not None:
+        data_path = args.data if args.data.endswith(os.sep) else f'{args.data}{os.sep}'
+
+    config: dict = file_manager.read_json(f'.{os.sep}default{os.sep}config.json') or {}
+    config.update(file_manager.read_json(f'{data_path}config.json') or {})
+
+    run(config, data_path, args.master_password)
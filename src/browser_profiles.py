@@ -0,0 +1,215 @@
+import os
+from selenium import webdriver
+
+import file_manager
+
+
+CHROMIUM_BROWSERS: tuple[str] = ('Chrome', 'Chromium', 'Brave', 'Edge', 'Opera')
+
+DEFAULT_PROFILE: dict = {
+    'headless': False,
+    'page-load-strategy': 'normal',
+    'block-images': False,
+    'block-fonts': False,
+    'block-media': False,
+    'disable-background': False,
+    'profile-dir': None,
+    'remote-debugging-port': None
+}
+
+FONT_PATTERNS: list[str] = ['*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot']
+MEDIA_PATTERNS: list[str] = ['*.mp3', '*.mp4', '*.m4a', '*.ogg', '*.oga', '*.wav', '*.webm']
+IMAGE_PATTERNS: list[str] = ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico']
+
+CHROMIUM_BACKGROUND_ARGUMENTS: list[str] = [
+    '--disable-background-networking',
+    '--disable-component-update',
+    '--disable-default-apps',
+    '--disable-extensions',
+    '--disable-sync',
+    '--disable-features=Translate,OptimizationHints,MediaRouter',
+    '--no-first-run',
+    '--no-default-browser-check',
+    '--mute-audio'
+]
+
+FIREFOX_BACKGROUND_PREFERENCES: dict = {
+    'app.update.auto': False,
+    'browser.shell.checkDefaultBrowser': False,
+    'browser.startup.page': 0,
+    'datareporting.healthreport.uploadEnabled': False,
+    'datareporting.policy.dataSubmissionEnabled': False,
+    'toolkit.telemetry.enabled': False,
+    'extensions.update.enabled': False,
+    'media.volume_scale': '0.0'
+}
+
+
+def get_profile(config: dict, data_path: str, name: str | None = None) -> dict:
+    """
+    Get a browser profile from the config, filling in defaults.
+
+    :param config: Dictionary containing the configuration settings.
+    :param data_path: Path to the data folder.
+    :param name: The profile to get, the config's "browser-profile" if None.
+    :return: The profile with every setting present and the profile directory cleaned.
+    """
+
+    if name is None:
+        name = config.get('browser-profile', 'default')
+
+    profile: dict = dict(DEFAULT_PROFILE)
+    profile.update(config.get('browser-profiles', {}).get(name, {}))
+    profile['name'] = name
+
+    if profile.get('profile-dir') is not None:
+        profile['profile-dir'] = os.path.abspath(file_manager.clean_path(profile['profile-dir'], data_path))
+
+        if not os.path.exists(profile['profile-dir']):
+            os.makedirs(profile['profile-dir'])
+
+    return profile
+
+
+def blocked_patterns(profile: dict) -> list[str]:
+    """
+    Get the URL patterns a profile blocks.
+
+    :param profile: The browser profile.
+    :return: A list of URL patterns.
+    """
+
+    patterns: list[str] = []
+
+    if profile.get('block-images'):
+        patterns.extend(IMAGE_PATTERNS)
+
+    if profile.get('block-fonts'):
+        patterns.extend(FONT_PATTERNS)
+
+    if profile.get('block-media'):
+        patterns.extend(MEDIA_PATTERNS)
+
+    return patterns
+
+
+def build_chromium_options(options: webdriver.ChromeOptions | webdriver.EdgeOptions, profile: dict) -> webdriver.ChromeOptions | webdriver.EdgeOptions:
+    """
+    Apply a profile to Chromium based browser options.
+
+    :param options: The options to apply the profile to.
+    :param profile: The browser profile.
+    :return: The options.
+    """
+
+    prefs: dict = {"credentials_enable_service": False, "profile.password_manager_enabled": False}
+
+    if profile.get('block-images'):
+        prefs['profile.managed_default_content_settings.images'] = 2
+
+    options.add_experimental_option('excludeSwitches', ['enable-logging', 'enable-automation'])
+    options.add_experimental_option('prefs', prefs)
+
+    if profile.get('headless'):
+        options.add_argument('--headless=new')
+        options.add_argument('--window-size=1280,1024')
+
+    if profile.get('disable-background'):
+        for argument in CHROMIUM_BACKGROUND_ARGUMENTS:
+            options.add_argument(argument)
+
+    if profile.get('profile-dir') is not None:
+        options.add_argument(f'--user-data-dir={profile["profile-dir"]}')
+
+    if profile.get('remote-debugging-port') is not None:
+        options.add_argument(f'--remote-debugging-port={profile["remote-debugging-port"]}')
+
+    return options
+
+
+def build_firefox_options(profile: dict) -> webdriver.FirefoxOptions:
+    """
+    Build Firefox options from a profile.
+
+    :param profile: The browser profile.
+    :return: The options.
+    """
+
+    options: webdriver.FirefoxOptions = webdriver.FirefoxOptions()
+
+    if profile.get('headless'):
+        options.add_argument('-headless')
+
+    if profile.get('block-images'):
+        options.set_preference('permissions.default.image', 2)
+
+    if profile.get('block-fonts'):
+        options.set_preference('browser.display.use_document_fonts', 0)
+
+    if profile.get('block-media'):
+        options.set_preference('media.autoplay.default', 5)
+        options.set_preference('media.autoplay.blocking_policy', 2)
+
+    if profile.get('disable-background'):
+        for key, value in FIREFOX_BACKGROUND_PREFERENCES.items():
+            options.set_preference(key, value)
+
+    if profile.get('profile-dir') is not None:
+        options.add_argument('-profile')
+        options.add_argument(profile['profile-dir'])
+
+    return options
+
+
+def build_options(browser: str, profile: dict | None = None) -> webdriver.ChromeOptions | webdriver.EdgeOptions | webdriver.FirefoxOptions | webdriver.IeOptions:
+    """
+    Build the options for a browser from a profile.
+
+    :param browser: The browser to build options for.
+    :param profile: The browser profile, see get_profile.
+    :return: The browser's options.
+    """
+
+    if profile is None:
+        profile = DEFAULT_PROFILE
+
+    match browser:
+        case 'Edge':
+            options = build_chromium_options(webdriver.EdgeOptions(), profile)
+        case 'Chrome' | 'Chromium' | 'Brave' | 'Opera':
+            options = build_chromium_options(webdriver.ChromeOptions(), profile)
+        case 'Firefox':
+            options = build_firefox_options(profile)
+        case 'Internet Explorer':
+            options = webdriver.IeOptions()
+        case _:
+            raise ValueError(f'Unsupported browser: {browser}')
+
+    options.page_load_strategy = profile.get('page-load-strategy', 'normal')
+
+    return options
+
+
+def apply_profile(driver: webdriver, browser: str, profile: dict | None) -> None:
+    """
+    Apply the parts of a profile that need a running browser (blocking requests through CDP).
+
+    :param driver: The Selenium WebDriver object.
+    :param browser: The browser the driver belongs to.
+    :param profile: The browser profile.
+    :return: None
+    """
+
+    if profile is None or browser not in CHROMIUM_BROWSERS or not hasattr(driver, 'execute_cdp_cmd'):
+        return None
+
+    patterns: list[str] = blocked_patterns(profile)
+
+    if len(patterns) == 0:
+        return None
+
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+    except Exception as error:
+        print(f'Unable to block assets: {error}')
@@ -3,7 +3,7 @@ from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
 from webdriver_manager.chrome import ChromeDriverManager
 
 from selenium.webdriver.firefox.service import Service as FirefoxService
@@ -18,55 +18,156 @@ from webdriver_manager.opera import OperaDriverManager
 
 from webdriver_manager.core.os_manager import ChromeType
 from selenium.webdriver.chrome.service import Service as ChromeService
+from webdriver_manager.core.manager import DriverManager
 
+import driver_registry
+import browser_profiles
 
-def get_driver(browser: str) -> webdriver:
+
+def get_driver_manager(browser: str, pinned_version: str | None = None) -> DriverManager:
     """
-    Get the driver for the specified browser.
+    Get the driver manager for the specified browser.
 
     :param browser: The browser to use.
-    :return: The driver for the specified browser.
+    :param pinned_version: The driver version to use instead of the latest one.
+    :return: The driver manager for the specified browser.
     """
 
-    options: webdriver.ChromeOptions = webdriver.ChromeOptions()
-    options.add_experimental_option('excludeSwitches', ['enable-logging', 'enable-automation'])
-    options.add_experimental_option('prefs', {"credentials_enable_service": False, "profile.password_manager_enabled": False})
-
     match browser:
         case 'Chrome':
-            return webdriver.Chrome(service=ChromeService(ChromeDriverManager().install()), options=options)
+            return ChromeDriverManager(driver_version=pinned_version)
         case 'Chromium':
-            return webdriver.Chrome(ChromeDriverManager(chrome_type=ChromeType.CHROMIUM).install(), options=options)
+            return ChromeDriverManager(driver_version=pinned_version, chrome_type=ChromeType.CHROMIUM)
         case 'Brave':
-            return webdriver.Chrome(ChromeDriverManager(chrome_type=ChromeType.BRAVE).install(), options=options)
+            return ChromeDriverManager(driver_version=pinned_version, chrome_type=ChromeType.BRAVE)
         case 'Firefox':
-            return webdriver.Firefox(service=FirefoxService(GeckoDriverManager().install()))
+            return GeckoDriverManager(version=pinned_version)
         case 'Internet Explorer':
-            return webdriver.Ie(service=IEService(IEDriverManager().install()))
+            return IEDriverManager(version=pinned_version)
         case 'Edge':
-            return webdriver.Edge(service=EdgeService(EdgeChromiumDriverManager().install()))
+            return EdgeChromiumDriverManager(version=pinned_version)
         case 'Opera':
-            webdriver_service = service.Service(OperaDriverManager().install())
+            return OperaDriverManager(version=pinned_version)
+        case _:
+            raise ValueError(f'Unsupported browser: {browser}')
+
+
+def get_driver_path(browser: str, registry_path: str | None = None, registry_config: dict | None = None) -> str:
+    """
+    Get the path to the driver binary for the specified browser.
+
+    :param browser: The browser to use.
+    :param registry_path: Path to the driver registry, drivers are resolved online on every launch if None.
+    :param registry_config: The "driver-registry" config with "offline", "background-refresh" and "pinned-versions".
+    :return: The path to the driver.
+    """
+
+    if registry_config is None:
+        registry_config = {}
+
+    pinned_version: str | None = registry_config.get('pinned-versions', {}).get(browser, None)
+    manager: DriverManager = get_driver_manager(browser, pinned_version)
+
+    if registry_path is None:
+        return manager.install()
+
+    return driver_registry.resolve(browser, manager, registry_path, registry_config.get('offline', False), pinned_version, registry_config.get('background-refresh', True))
+
+
+def get_driver(browser: str, registry_path: str | None = None, registry_config: dict | None = None, profile: dict | None = None) -> webdriver:
+    """
+    Get the driver for the specified browser.
+
+    :param browser: The browser to use.
+    :param registry_path: Path to the driver registry, drivers are resolved online on every launch if None.
+    :param registry_config: The "driver-registry" config with "offline", "background-refresh" and "pinned-versions".
+    :param profile: The browser profile from browser_profiles.get_profile, the default profile if None.
+    :return: The driver for the specified browser.
+    """
+
+    driver_path: str = get_driver_path(browser, registry_path, registry_config)
+    options = browser_profiles.build_options(browser, profile)
+
+    match browser:
+        case 'Chrome' | 'Chromium' | 'Brave':
+            new_driver: webdriver = webdriver.Chrome(service=ChromeService(driver_path), options=options)
+        case 'Firefox':
+            new_driver: webdriver = webdriver.Firefox(service=FirefoxService(driver_path), options=options)
+        case 'Internet Explorer':
+            new_driver: webdriver = webdriver.Ie(service=IEService(driver_path), options=options)
+        case 'Edge':
+            new_driver: webdriver = webdriver.Edge(service=EdgeService(driver_path), options=options)
+        case 'Opera':
+            webdriver_service = service.Service(driver_path)
             webdriver_service.start()
 
-            return webdriver.Remote(webdriver_service.service_url, options=options)
+            new_driver: webdriver = webdriver.Remote(webdriver_service.service_url, options=options)
+
+    browser_profiles.apply_profile(new_driver, browser, profile)
+
+    return new_driver
+
+
+def attach_driver(browser: str, debugger_address: str, registry_path: str | None = None, registry_config: dict | None = None) -> webdriver:
+    """
+    Attach to a running Chromium based browser through its remote-debugging address.
+
+    :param browser: The browser that is running.
+    :param debugger_address: The browser's remote-debugging address (e.g. 127.0.0.1:9222).
+    :param registry_path: Path to the driver registry, drivers are resolved online on every launch if None.
+    :param registry_config: The "driver-registry" config with "offline", "background-refresh" and "pinned-versions".
+    :return: The driver controlling the running browser.
+    """
+
+    driver_path: str = get_driver_path(browser, registry_path, registry_config)
+
+    match browser:
+        case 'Chrome' | 'Chromium' | 'Brave':
+            options: webdriver.ChromeOptions = webdriver.ChromeOptions()
+            options.debugger_address = debugger_address
+
+            return webdriver.Chrome(service=ChromeService(driver_path), options=options)
+        case 'Edge':
+            options: webdriver.EdgeOptions = webdriver.EdgeOptions()
+            options.debugger_address = debugger_address
+
+            return webdriver.Edge(service=EdgeService(driver_path), options=options)
         case _:
-            raise ValueError(f'Unsupported browser: {browser}')
+            raise ValueError(f'Attaching is not supported for: {browser}')
+
 
+def wait_until(driver: webdriver, condition, delay: float, poll_frequency: float = 0.5) -> object | None:
+    """
+    Wait for a condition to be met in the web page.
 
-def loadWait(driver: webdriver, delay: int, by: type, type: str) -> bool:
+    :param condition: Callable taking the driver, met once it returns something truthy.
+    :param delay: The timeout in seconds.
+    :param poll_frequency: Seconds between checks.
+    :return: The condition's result, or None if it wasn't met within the timeout.
+    """
+
+    try:
+        return WebDriverWait(driver, delay, poll_frequency=poll_frequency, ignored_exceptions=(NoSuchElementException, StaleElementReferenceException)).until(condition)
+    except TimeoutException:
+        return None
+
+
+def loadWait(driver: webdriver, delay: int, by: type, type: str, poll_frequency: float = 0.5) -> bool:
     """
     Wait for an element to be present in the web page.
 
     :param by: The type of locator (e.g., By.XPATH, By.ID).
     :param type: The value of the locator (e.g., "//div[@class='example']").
+    :param poll_frequency: Seconds between checks.
     :return: True if the element is found within the specified timeout, False otherwise.
     """
     
     try:
-        WebDriverWait(driver, delay).until(EC.presence_of_element_located((by, type)))
-        return True
+        if wait_until(driver, EC.presence_of_element_located((by, type)), delay, poll_frequency) is not None:
+            return True
     except:
-        print(f'unable to load element: {type}')
+        pass
+
+    print(f'unable to load element: {type}')
     
     return False
\ No newline at end of file
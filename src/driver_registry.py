@@ -0,0 +1,164 @@
+import os
+import time
+import threading
+from webdriver_manager.core.manager import DriverManager
+
+import file_manager
+
+
+_registry_lock: threading.Lock = threading.Lock()
+
+
+def load_registry(registry_path: str) -> dict:
+    """
+    Load the driver registry.
+
+    :param registry_path: Path to the registry file.
+    :return: A dictionary mapping each browser to its cached driver entry.
+    """
+
+    try:
+        registry: dict | None = file_manager.read_json(registry_path)
+    except ValueError:
+        print('Driver registry is corrupted, resolving drivers again...')
+        registry = None
+
+    return registry or {}
+
+
+def save_entry(registry_path: str, browser: str, entry: dict) -> None:
+    """
+    Store the driver entry of a browser.
+
+    :param registry_path: Path to the registry file.
+    :param browser: The browser the entry belongs to.
+    :param entry: The entry with the browser version, driver path and pinned version.
+    :return: None
+    """
+
+    with _registry_lock:
+        registry: dict = load_registry(registry_path)
+        registry[browser] = entry
+
+        if os.path.dirname(registry_path) != '' and not os.path.exists(os.path.dirname(registry_path)):
+            os.makedirs(os.path.dirname(registry_path))
+
+        file_manager.save_json(registry_path, registry)
+
+
+def get_browser_version(manager: DriverManager) -> str | None:
+    """
+    Detect the installed browser version without going online.
+
+    :param manager: The driver manager of the browser.
+    :return: The browser version, or None if it can't be detected.
+    """
+
+    try:
+        return manager.driver.get_browser_version_from_os()
+    except Exception:
+        return None
+
+
+def is_current(entry: dict | None, browser_version: str | None, pinned_version: str | None) -> bool:
+    """
+    Check if a cached entry can be used for the installed browser.
+
+    :param entry: The cached entry.
+    :param browser_version: The installed browser version.
+    :param pinned_version: The pinned driver version, if any.
+    :return: True if the entry's driver exists and matches the browser and pin, otherwise False.
+    """
+
+    if entry is None or not os.path.exists(str(entry.get('driver-path'))):
+        return False
+
+    return entry.get('browser-version') == browser_version and entry.get('pinned-version') == pinned_version
+
+
+def install(browser: str, manager: DriverManager, registry_path: str, browser_version: str | None, pinned_version: str | None) -> str:
+    """
+    Resolve the driver online and record it.
+
+    :param browser: The browser to resolve the driver for.
+    :param manager: The driver manager of the browser.
+    :param registry_path: Path to the registry file.
+    :param browser_version: The installed browser version.
+    :param pinned_version: The pinned driver version, if any.
+    :return: The path to the driver.
+    """
+
+    start_time: float = time.perf_counter()
+    driver_path: str = manager.install()
+
+    save_entry(registry_path, browser, {
+        'browser-version': browser_version,
+        'pinned-version': pinned_version,
+        'driver-path': driver_path,
+        'resolved': int(time.time())
+    })
+
+    print(f'Resolved {browser} driver in {time.perf_counter() - start_time:.2f} seconds')
+
+    return driver_path
+
+
+def refresh(browser: str, manager: DriverManager, registry_path: str, browser_version: str | None, pinned_version: str | None) -> threading.Thread:
+    """
+    Check for a newer driver in the background, the next launch picks it up from the registry.
+
+    :param browser: The browser to refresh the driver of.
+    :param manager: The driver manager of the browser.
+    :param registry_path: Path to the registry file.
+    :param browser_version: The installed browser version.
+    :param pinned_version: The pinned driver version, if any.
+    :return: The refresh thread.
+    """
+
+    def run() -> None:
+        try:
+            install(browser, manager, registry_path, browser_version, pinned_version)
+        except Exception as error:
+            print(f'Unable to refresh {browser} driver: {error}')
+
+    thread: threading.Thread = threading.Thread(target=run, name='minerva-driver-refresh', daemon=True)
+    thread.start()
+
+    return thread
+
+
+def resolve(browser: str, manager: DriverManager, registry_path: str, offline: bool = False, pinned_version: str | None = None, background_refresh: bool = True) -> str:
+    """
+    Get the driver for a browser, starting straight from the registry when it still matches the installed browser.
+
+    :param browser: The browser to get the driver for.
+    :param manager: The driver manager of the browser.
+    :param registry_path: Path to the registry file.
+    :param offline: Whether to never go online, using whatever driver was cached last.
+    :param pinned_version: The pinned driver version, if any.
+    :param background_refresh: Whether to look for a newer driver in the background after a cache hit.
+    :return: The path to the driver.
+    """
+
+    entry: dict | None = load_registry(registry_path).get(browser)
+    browser_version: str | None = get_browser_version(manager)
+
+    if is_current(entry, browser_version, pinned_version):
+        print(f'Using cached {browser} driver for version {browser_version}')
+
+        if background_refresh and not offline and pinned_version is None:
+            refresh(browser, manager, registry_path, browser_version, pinned_version)
+
+        return entry['driver-path']
+
+    if offline:
+        if entry is not None and os.path.exists(str(entry.get('driver-path'))):
+            print(f'Offline, using cached {browser} driver resolved for version {entry.get("browser-version")} (installed: {browser_version})')
+            return entry['driver-path']
+
+        raise Exception(f'No cached {browser} driver, disable offline mode to download one')
+
+    if entry is not None:
+        print(f'{browser} changed from version {entry.get("browser-version")} to {browser_version}, resolving driver...')
+
+    return install(browser, manager, registry_path, browser_version, pinned_version)
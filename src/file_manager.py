@@ -1,7 +1,28 @@
 import os
 import json
+import time
+import atexit
+import hashlib
+import marshal
+import argparse
 import platform
+import threading
+import contextlib
 from pathlib import Path
+import importlib.util
+from typing import Callable, Iterator
+
+import lazy
+
+
+orjson: lazy.LazyModule = lazy.lazy_import('orjson')
+msgpack: lazy.LazyModule = lazy.lazy_import('msgpack')
+
+# Binary files start with the magic and their serializer's tag, JSON can never start with a null byte.
+MAGIC: bytes = b'\x00MNV'
+
+# Converted files may start with a header recording the hash of the JSON they were converted from, then the file.
+SOURCE_TAG: bytes = b's'
 
 
 def get_documents_folder() -> Path:
@@ -33,31 +54,568 @@ def get_documents_folder() -> Path:
     return documents_path
 
 
+class Serializer:
+    """
+    A file format for minerva data: how to encode it, and the tag binary formats are recognized by.
+    """
+
+    __slots__ = ('name', 'tag', 'dumps', 'loads', 'module')
+
+    def __init__(self, name: str, tag: bytes | None, dumps: Callable[[object], bytes], loads: Callable[[bytes], object], module: str | None = None) -> None:
+        """
+        Create a serializer.
+
+        :param name: The name it's chosen by in the config.
+        :param tag: The byte after the magic identifying the format, None for JSON.
+        :param dumps: Encodes data, without the magic.
+        :param loads: Decodes data, without the magic.
+        :param module: The optional module it needs, if any.
+        """
+
+        self.name: str = name
+        self.tag: bytes | None = tag
+        self.dumps: Callable[[object], bytes] = dumps
+        self.loads: Callable[[bytes], object] = loads
+        self.module: str | None = module
+
+    def available(self) -> bool:
+        """
+        Check if the module the serializer needs is installed.
+
+        :return: True if it can be used, otherwise False.
+        """
+
+        return self.module is None or importlib.util.find_spec(self.module) is not None
+
+
+def loads_json(content: bytes) -> object:
+    """
+    Decode JSON, with orjson if it's installed.
+
+    :param content: The JSON.
+    :return: The decoded data.
+    """
+
+    if SERIALIZERS['fast-json'].available():
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            pass # orjson is stricter than json (e.g. NaN), let json have a go
+
+    return json.loads(content)
+
+
+SERIALIZERS: dict[str, Serializer] = {
+    'json': Serializer('json', None, lambda data: json.dumps(data, indent=4).encode(), loads_json),
+    'fast-json': Serializer('fast-json', None, lambda data: orjson.dumps(data), loads_json, 'orjson'),
+    'compact-json': Serializer('compact-json', None, lambda data: json.dumps(data, separators=(',', ':')).encode(), loads_json),
+    'marshal': Serializer('marshal', b'm', lambda data: marshal.dumps(data, 4), marshal.loads),
+    'msgpack': Serializer('msgpack', b'p', lambda data: msgpack.packb(data), lambda content: msgpack.unpackb(content, strict_map_key=False), 'msgpack')
+}
+
+# Fallbacks are always JSON, marshal's format can change between Python versions so it's only used when chosen.
+FALLBACKS: dict[str, str] = {
+    'fast-json': 'compact-json',
+    'msgpack': 'compact-json'
+}
+
+_warned: set[str] = set()
+
+# Data family -> serializer name, set from the config's serializers block. Unlisted families are written as JSON.
+serializer_families: dict[str, str] = {}
+
+
+def configure_serializers(families: dict[str, str]) -> None:
+    """
+    Choose the serializer each data family is written with.
+
+    :param families: Dictionary mapping each data family (e.g. dictionary, cache) to a serializer name.
+    :return: None
+    """
+
+    serializer_families.clear()
+
+    for family, name in families.items():
+        if name not in SERIALIZERS:
+            print(f'Unknown serializer {name} for {family} data, using json')
+            continue
+
+        serializer_families[family] = name
+
+
+def get_serializer(family: str | None = None, name: str | None = None) -> Serializer:
+    """
+    Get the serializer of a data family, falling back when its module isn't installed.
+
+    :param family: The data family, JSON if None or unconfigured.
+    :param name: A serializer name to use instead of the family's.
+    :return: The serializer.
+    """
+
+    serializer: Serializer = SERIALIZERS[name or serializer_families.get(family, 'json')]
+
+    while not serializer.available():
+        fallback: Serializer = SERIALIZERS[FALLBACKS[serializer.name]]
+
+        if serializer.name not in _warned:
+            _warned.add(serializer.name)
+            print(f'{serializer.name} needs {serializer.module}, which isn\'t installed, writing {fallback.name} instead')
+
+        serializer = fallback
+
+    return serializer
+
+
+def dumps(data: object, family: str | None = None, name: str | None = None) -> bytes:
+    """
+    Encode data with its family's serializer.
+
+    :param data: The data.
+    :param family: The data family.
+    :param name: A serializer name to use instead of the family's.
+    :return: The file content.
+    """
+
+    serializer: Serializer = get_serializer(family, name)
+    content: bytes = serializer.dumps(data)
+
+    return content if serializer.tag is None else MAGIC + serializer.tag + content
+
+
+def split_source(content: bytes) -> tuple[str | None, bytes]:
+    """
+    Split the source header off a file's content.
+
+    :param content: The file content.
+    :return: Tuple of the recorded source ("algorithm:hash", None if there's no header) and the rest of the content.
+    """
+
+    if not content.startswith(MAGIC + SOURCE_TAG):
+        return None, content
+
+    start: int = len(MAGIC) + 2
+    end: int = start + content[len(MAGIC) + 1]
+
+    return content[start:end].decode('ascii'), content[end:]
+
+
+def read_source(file_path: Path) -> str | None:
+    """
+    Read the hash a converted file recorded of the JSON it was converted from, without reading the whole file.
+
+    :param file_path: Path to the data file.
+    :return: The recorded source as "algorithm:hash", None if the file has none.
+    """
+
+    with open(file_path, 'rb') as file:
+        header: bytes = file.read(len(MAGIC) + 2)
+
+        if not header.startswith(MAGIC + SOURCE_TAG) or len(header) < len(MAGIC) + 2:
+            return None
+
+        return file.read(header[-1]).decode('ascii')
+
+
+def loads(content: bytes) -> object:
+    """
+    Decode a file written by any serializer, the format is recognized from the content.
+
+    :param content: The file content.
+    :return: The decoded data.
+    """
+
+    content = split_source(content)[1]
+
+    if not content.startswith(MAGIC):
+        return loads_json(content)
+
+    tag: bytes = content[len(MAGIC):len(MAGIC) + 1]
+
+    for serializer in SERIALIZERS.values():
+        if serializer.tag == tag:
+            return serializer.loads(content[len(MAGIC) + 1:])
+
+    raise ValueError(f'Unknown serializer tag {tag!r}')
+
+
 def read_json(file_path: Path) -> dict | None:
     """
-    Reads a JSON file and returns its contents as a dictionary.
+    Reads a data file and returns its contents as a dictionary. Files may be JSON or any binary serializer's format.
 
-    :param file_path: Path to the JSON file.
-    :return: Dictionary containing the JSON file's contents.
+    :param file_path: Path to the data file.
+    :return: Dictionary containing the file's contents.
     """
 
     if os.path.exists(file_path):
-        with open(file_path, 'r') as file:
-            return json.load(file)
+        with open(file_path, 'rb') as file:
+            return loads(file.read())
     
     return None
 
 
-def save_json(file_path: Path, data: dict) -> None:
+def save_json(file_path: Path, data: dict, family: str | None = None) -> None:
     """
-    Saves a dictionary to a JSON file.
+    Saves a dictionary to a data file, atomically, with its family's serializer.
 
-    :param file_path: Path to the JSON file.
-    :param data: Dictionary to save to the JSON file.
+    :param file_path: Path to the data file.
+    :param data: Dictionary to save to the data file.
+    :param family: The data family, written as JSON if None.
     """
 
-    with open(file_path, 'w') as file:
-        json.dump(data, file, indent=4)
+    write_atomic(file_path, dumps(data, family))
+
+
+def write_temporary(file_path: Path, content: bytes) -> str:
+    """
+    Writes content next to a file and syncs it to disk, ready to be renamed over the file.
+
+    :param file_path: Path to the file.
+    :param content: The file's new content.
+    :return: Path to the temporary file.
+    """
+
+    directory: str = os.path.dirname(file_path)
+
+    if directory != '' and not os.path.exists(directory):
+        os.makedirs(directory, exist_ok=True)
+
+    temporary_path: str = f'{file_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+
+    with open(temporary_path, 'wb') as file:
+        file.write(content)
+        file.flush()
+        os.fsync(file.fileno())
+
+    return temporary_path
+
+
+def write_atomic(file_path: Path, content: bytes) -> int:
+    """
+    Writes a file through a synced temporary file and a rename, so it's never left half written.
+
+    :param file_path: Path to the file.
+    :param content: The file's new content.
+    :return: The number of bytes written.
+    """
+
+    os.replace(write_temporary(file_path, content), file_path)
+
+    return len(content)
+
+
+def convert(file_path: Path, family: str | None = None, name: str | None = None, algorithm: str = 'sha256') -> tuple[int, int, bool]:
+    """
+    Rewrite a data file with another serializer.
+
+    Converting JSON to a binary format records the JSON's hash in the file, and converting between binary formats
+    keeps it, so the file can still be matched to the JSON it came from (e.g. a library shard to the repo's checksum).
+    Saving the file again drops the record, its content may have changed. Converting back to JSON drops it too.
+
+    :param file_path: Path to the data file.
+    :param family: The data family to take the serializer of.
+    :param name: A serializer name to use instead of the family's.
+    :param algorithm: The hashlib algorithm the source JSON is hashed with.
+    :return: The file's size before and after, and whether it was rewritten.
+    """
+
+    with open(file_path, 'rb') as file:
+        content: bytes = file.read()
+
+    source, data_content = split_source(content)
+    serializer: Serializer = get_serializer(family, name)
+
+    # Binary formats aren't byte for byte reproducible (marshal's references), their tag is enough.
+    if serializer.tag is not None and data_content.startswith(MAGIC + serializer.tag):
+        return len(content), len(content), False
+
+    converted: bytes = dumps(loads(data_content), name=serializer.name)
+
+    if serializer.tag is not None:
+        if source is None and not data_content.startswith(MAGIC):
+            source = f'{algorithm}:{hashlib.new(algorithm, data_content).hexdigest()}'
+
+        if source is not None:
+            converted = MAGIC + SOURCE_TAG + bytes([len(source)]) + source.encode('ascii') + converted
+
+    if converted == content:
+        return len(content), len(content), False
+
+    write_atomic(file_path, converted)
+
+    return len(content), len(converted), True
+
+
+def migrate(folder_path: Path, name: str, pattern: str = '.json') -> dict[str, int]:
+    """
+    Convert every data file in a folder to a serializer, one file at a time so memory use stays flat.
+
+    Files keep their .json names whatever the format, reading recognizes the format from the content, so a folder can
+    be migrated in either direction (back to json too) and a half migrated folder still loads.
+
+    :param folder_path: The folder, searched recursively.
+    :param name: The serializer to convert to.
+    :param pattern: The file name ending of data files.
+    :return: Dictionary with the number of files converted, unchanged and failed, and the bytes before and after.
+    """
+
+    summary: dict[str, int] = {'converted': 0, 'unchanged': 0, 'failed': 0, 'bytes-before': 0, 'bytes-after': 0}
+
+    for directory, folders, files in os.walk(folder_path):
+        for file_name in files:
+            if not file_name.endswith(pattern):
+                continue
+
+            try:
+                before, after, converted = convert(os.path.join(directory, file_name), name=name)
+            except Exception as error:
+                print(f'Unable to convert {os.path.join(directory, file_name)}: {error}')
+                summary['failed'] += 1
+                continue
+
+            summary['converted' if converted else 'unchanged'] += 1
+            summary['bytes-before'] += before
+            summary['bytes-after'] += after
+
+    return summary
+
+
+class WriteCounter:
+    """
+    Bytes and files written by the storage while the counter is active, e.g. during one solve.
+    """
+
+    __slots__ = ('bytes', 'writes', 'requested')
+
+    def __init__(self) -> None:
+        self.bytes: int = 0
+        self.writes: int = 0
+        self.requested: int = 0
+
+
+class Storage:
+    """
+    Write path for data that's saved often, like solver caches and dictionary entries.
+
+    Every write is atomic (temporary file, fsync, rename). Writes to the same file within the coalescing window are
+    merged into one, reads see pending writes, and writes made inside a transaction are held until it ends and then
+    committed together: every file is written and synced before any of them is renamed into place, so a failure
+    leaves the old files. Pending writes are flushed at exit.
+
+    Commits run one at a time, in the order their writes were taken, so an older write is never renamed over a newer
+    one. A write stays readable from the in-flight map until its rename is done.
+    """
+
+    def __init__(self, coalesce_window: float = 0.5) -> None:
+        """
+        Create a storage.
+
+        :param coalesce_window: Seconds a write waits for more writes to the same file, written right away if 0.
+        """
+
+        self.coalesce_window: float = coalesce_window
+        self.pending: dict[str, tuple[bytes, tuple[WriteCounter, ...]]] = {}
+        self.in_flight: dict[str, bytes] = {}
+        self.total_bytes: int = 0
+        self.lock: threading.Lock = threading.Lock()
+        self.commit_lock: threading.RLock = threading.RLock()
+        self.timer: threading.Timer | None = None
+        self.local: threading.local = threading.local()
+
+    def counters(self) -> tuple[WriteCounter, ...]:
+        """
+        Get the counters active on this thread.
+
+        :return: The active counters.
+        """
+
+        return tuple(getattr(self.local, 'counters', ()))
+
+    def read_json(self, file_path: Path) -> dict | None:
+        """
+        Reads a JSON file, including writes to it that aren't on disk yet.
+
+        :param file_path: Path to the JSON file.
+        :return: Dictionary containing the JSON file's contents.
+        """
+
+        file_path = str(file_path)
+        transaction: dict | None = getattr(self.local, 'transaction', None)
+
+        with self.lock:
+            content: bytes | None = transaction.get(file_path, (None,))[0] if transaction is not None else None
+
+            if content is None and file_path in self.pending:
+                content = self.pending[file_path][0]
+
+            if content is None:
+                content = self.in_flight.get(file_path)
+
+        if content is not None:
+            return loads(content)
+
+        return read_json(file_path)
+
+    def write_json(self, file_path: Path, data: dict, family: str | None = None) -> None:
+        """
+        Saves a dictionary to a data file with its family's serializer, the content is taken now and written later.
+
+        :param file_path: Path to the data file.
+        :param data: Dictionary to save to the data file.
+        :param family: The data family, written as JSON if None.
+        :return: None
+        """
+
+        self.write(file_path, dumps(data, family))
+
+    def write(self, file_path: Path, content: bytes) -> None:
+        """
+        Write a file, within the transaction if one is open on this thread, otherwise once the coalescing window ends.
+
+        :param file_path: Path to the file.
+        :param content: The file's new content.
+        :return: None
+        """
+
+        file_path = str(file_path)
+        counters: tuple[WriteCounter, ...] = self.counters()
+
+        for counter in counters:
+            counter.requested += 1
+
+        transaction: dict | None = getattr(self.local, 'transaction', None)
+
+        if transaction is not None:
+            transaction[file_path] = (content, counters)
+            return None
+
+        if self.coalesce_window <= 0:
+            self.commit({file_path: (content, counters)})
+            return None
+
+        with self.lock:
+            self.pending[file_path] = (content, counters)
+
+            if self.timer is None:
+                self.timer = threading.Timer(self.coalesce_window, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def commit(self, writes: dict[str, tuple[bytes, tuple[WriteCounter, ...]]]) -> int:
+        """
+        Write files together, renaming them into place only once all of them are synced.
+
+        :param writes: Dictionary mapping each path to its content and the counters to add it to.
+        :return: The number of bytes written.
+        """
+
+        with self.commit_lock:
+            with self.lock:
+                self.in_flight.update({file_path: content for file_path, (content, counters) in writes.items()})
+
+            temporary_paths: dict[str, str] = {}
+
+            try:
+                try:
+                    for file_path, (content, counters) in writes.items():
+                        temporary_paths[file_path] = write_temporary(file_path, content)
+                except BaseException:
+                    for temporary_path in temporary_paths.values():
+                        os.remove(temporary_path)
+                    raise
+
+                for file_path, temporary_path in temporary_paths.items():
+                    os.replace(temporary_path, file_path)
+            finally:
+                with self.lock:
+                    for file_path, (content, counters) in writes.items():
+                        if self.in_flight.get(file_path) is content:
+                            del self.in_flight[file_path]
+
+        written: int = 0
+
+        with self.lock:
+            for file_path, (content, counters) in writes.items():
+                written += len(content)
+
+                for counter in counters:
+                    counter.bytes += len(content)
+                    counter.writes += 1
+
+            self.total_bytes += written
+
+        return written
+
+    def flush(self) -> int:
+        """
+        Write the pending writes now.
+
+        :return: The number of bytes written.
+        """
+
+        # Taking the writes under the commit lock keeps them ordered with other commits to the same files.
+        with self.commit_lock:
+            with self.lock:
+                writes: dict[str, tuple[bytes, tuple[WriteCounter, ...]]] = self.pending
+                self.pending = {}
+                self.in_flight.update({file_path: content for file_path, (content, counters) in writes.items()})
+
+                if self.timer is not None:
+                    self.timer.cancel()
+                    self.timer = None
+
+            if len(writes) == 0:
+                return 0
+
+            return self.commit(writes)
+
+    @contextlib.contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        Hold this thread's writes until the block ends, then commit them together. Nested blocks join the outer one,
+        and nothing is written if the block raises.
+
+        :return: Context manager.
+        """
+
+        if getattr(self.local, 'transaction', None) is not None:
+            yield None
+            return None
+
+        self.local.transaction = {}
+
+        try:
+            yield None
+            writes: dict = self.local.transaction
+        finally:
+            self.local.transaction = None
+
+        with self.commit_lock:
+            with self.lock:
+                for file_path in writes:
+                    self.pending.pop(file_path, None)
+
+            self.commit(writes)
+
+    @contextlib.contextmanager
+    def count(self) -> Iterator[WriteCounter]:
+        """
+        Count what this thread writes until the block ends, flushing its pending writes at the end.
+
+        :return: Context manager giving the counter.
+        """
+
+        counter: WriteCounter = WriteCounter()
+        self.local.counters = self.counters() + (counter,)
+
+        try:
+            yield counter
+        finally:
+            self.local.counters = tuple(active for active in self.counters() if active is not counter)
+            self.flush()
+
+
+storage: Storage = Storage()
+atexit.register(storage.flush)
 
 
 def clean_path(file_path: str, data_path: str) -> str:
@@ -87,4 +645,22 @@ def check_file_exists(file_path: Path) -> bool:
     :return: True if the file exists, False otherwise.
     """
 
-    return os.path.exists(file_path)
\ No newline at end of file
+    return os.path.exists(file_path)
+
+
+if __name__ == '__main__':
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description='Converts a minerva data folder to another serializer, or back to JSON')
+
+    parser.add_argument('path', help='The data folder (e.g. the dictionary folder)', type=str)
+    parser.add_argument('-s', '--serializer', help='The serializer to convert to', type=str, choices=list(SERIALIZERS), default='json')
+
+    args: argparse.Namespace = parser.parse_args()
+
+    if not SERIALIZERS[args.serializer].available():
+        print(f'{args.serializer} needs {SERIALIZERS[args.serializer].module}, which isn\'t installed')
+        exit(1)
+
+    start_time: float = time.perf_counter()
+    summary: dict[str, int] = migrate(args.path, args.serializer)
+
+    print(f'Converted {summary["converted"]} files to {args.serializer} in {time.perf_counter() - start_time:.2f} seconds ({summary["unchanged"]} unchanged, {summary["failed"]} failed), {summary["bytes-before"]} -> {summary["bytes-after"]} bytes')
@@ -1,16 +1,37 @@
 import time
+import threading
+import urllib.parse
+import concurrent.futures
 import PySimpleGUI as sg
 import selenium.webdriver
-from googletrans import Translator
 
+import lazy
+import steps
 import file_manager
+import mode_data
 import login_manager
+import page_watcher
+import instrumentation
+import tab_scheduler
+import solver_worker
+import translation_health
 import lthslatin_manager
 
-import assignments.synopsis
-import assignments.noun_adj
-import assignments.composition
-import assignments.timed_vocabulary
+
+# Solver modules and the NLP stack behind them load on the first solve of their mode.
+MODE_MODULES: dict[str, lazy.LazyModule] = {
+    'synopsis': lazy.lazy_import('assignments.synopsis'),
+    'noun-adj': lazy.lazy_import('assignments.noun_adj'),
+    'composition': lazy.lazy_import('assignments.composition'),
+    'timed vocabulary': lazy.lazy_import('assignments.timed_vocabulary')
+}
+
+MODE_IMPORTS: dict[str, tuple[str]] = {
+    'synopsis': ('assignments.synopsis', 'pyinflect'),
+    'noun-adj': ('assignments.noun_adj', 'assignments.noun_adj_learning'),
+    'composition': ('assignments.composition', 'nltk', 'nltk.corpus', 'inflect', 'pyinflect', 'googletrans'),
+    'timed vocabulary': ('assignments.timed_vocabulary', 'nltk', 'nltk.corpus', 'googletrans')
+}
 
 
 def generate_config_layout(config: dict) -> list[list]:
@@ -181,13 +202,13 @@ def initialization_window(config: dict = {}, credentials_path: str = None, icon_
     return config
 
 
-def login_window(config: dict = {}, credentials_path: str = None, icon_path: str | None = None) -> tuple[str, str]:
+def login_window(config: dict = {}, credentials_path: str = None, icon_path: str | None = None) -> tuple[str, str, bytes]:
     """
     Function to manage the login credentials
     
     :param config: Dictionary containing the configuration settings.
     :param credentials_path: Path to the credentials file.
-    :return: Tuple containing the username and password.
+    :return: Tuple containing the username, password and the key they were encrypted with.
     """
 
     app_name: str = config.get('app-name', 'minerva')
@@ -195,7 +216,7 @@ def login_window(config: dict = {}, credentials_path: str = None, icon_path: str
 
     if not login_manager.credentials_exist(credentials_path):
         sg.popup('No credentials found! Please run through setup again')
-        return None, None
+        return None, None, None
 
     if theme is not None:
         sg.theme(theme)
@@ -213,6 +234,7 @@ def login_window(config: dict = {}, credentials_path: str = None, icon_path: str
 
     username, password = None, None
     master_password = None
+    key: bytes | None = None
 
     while True:
         event, values = window.read()
@@ -240,10 +262,10 @@ def login_window(config: dict = {}, credentials_path: str = None, icon_path: str
 
     window.close()
     
-    return username, password
+    return username, password, key
 
 
-def control_window(webdriver: selenium.webdriver, config: dict, icon_path: str | None, available_modes: list[str], synopsis_conjugation_types: dict | None, synopsis_charts: dict | None, synopsis_blocks: tuple[str] | None, noun_adjective_chart: dict | None, composition_dictionary: dict | None, composition_cache_path: str | None, composition_use_synonyms: bool | None, nltk_working: bool | None, timed_vocab_dict_path: str | None) -> None:
+def control_window(webdriver: selenium.webdriver, config: dict, icon_path: str | None, available_modes: list[str], registry: mode_data.ModeData) -> None:
     """
     Function to manage the control window.
 
@@ -251,12 +273,7 @@ def control_window(webdriver: selenium.webdriver, config: dict, icon_path: str |
     :param config: Dictionary containing the configuration settings.
     :param icon_path: Path to the icon file.
     :param available_modes: List of available modes.
-    :param synopsis_conjugation_types: Dictionary containing the synopsis conjugation types.
-    :param synopsis_charts: Dictionary containing the synopsis charts.
-    :param synopsis_blocks: Tuple containing the synopsis blocks.
-    :param noun_adjective_chart: Dictionary containing the noun and adjective endings.
-    :param nltk_working: Boolean indicating if the NLTK dependencies are working.
-    :param timed_vocab_dict_path: Path to the cleaned timed vocabulary dictionary.
+    :param registry: The mode data registry, loading each mode's data on first use.
     :return: None
     """
 
@@ -273,78 +290,238 @@ def control_window(webdriver: selenium.webdriver, config: dict, icon_path: str |
     layout = [
         [sg.Text(f'{app_name}', font=('Helvetica', 16))],
         [sg.Text(f'User: {user}', key='-USER-'), sg.Text(f'Mode: {mode}', key='-MODE-')],
-        [sg.Button('Solve'), sg.Checkbox('Continuous', key='-CONTINUOUS-')],
+        [sg.Button('Solve'), sg.Button('Solve Tabs'), sg.Button('Stop'), sg.Checkbox('Continuous', key='-CONTINUOUS-', enable_events=True)],
+        [sg.Text('Status: Idle', key='-STATUS-', size=(40, 1))],
         [sg.Button('Exit')]
     ]
 
     if icon_path is None:
-        window = sg.Window(f'{app_name}', layout)
+        window = sg.Window(f'{app_name}', layout, finalize=True)
     else:
-        window = sg.Window(f'{app_name}', layout, icon=icon_path)
-
-    run_prediction: bool = True
-    translator: Translator | None = None
-    use_google_trans: bool = False
-
-    try:
-        translation_delay = lthslatin_manager.get_translation_delay()
-        max_timed_vocab_delay = config.get('assignment-configs').get('timed-vocabulary').get('max-googletrans-delay', 3)
-        use_google_trans = config.get('assignment-configs').get('timed-vocabulary').get('use-googletrans', False)
-
-        if translation_delay is None or translation_delay > max_timed_vocab_delay:
-            run_prediction = False
-            print('Translation service not working or too slow, disabling prediction...')
-        else:
-            translator = Translator()
-    except:
-        run_prediction = False
-    
-    if use_google_trans is False:
-        run_prediction = False
+        window = sg.Window(f'{app_name}', layout, icon=icon_path, finalize=True)
+
+    if str(config.get('startup', {}).get('prewarm-imports', True)).lower() == 'true':
+        lazy.prewarm(list(dict.fromkeys(name for available_mode in available_modes for name in MODE_IMPORTS.get(available_mode, ()))))
+
+    assignment_configs: dict = config.get('assignment-configs', {})
+    composition_prediction: bool = str(assignment_configs.get('composition', {}).get('use-googletrans', False)).lower() == 'true'
+    timed_vocabulary_prediction: bool = str(assignment_configs.get('timed-vocabulary', {}).get('use-googletrans', False)).lower() == 'true'
+    translator: translation_health.TranslationMonitor | None = None
+
+    # Prediction is switched on and off by the monitor's circuit breaker as the translation service comes and goes.
+    if composition_prediction or timed_vocabulary_prediction:
+        monitor_config: dict = config.get('translation-monitor', {})
+
+        translator = translation_health.TranslationMonitor(
+            float(assignment_configs.get('timed-vocabulary', {}).get('max-googletrans-delay', 3)),
+            float(monitor_config.get('interval', 60)),
+            int(monitor_config.get('failure-threshold', 2)),
+            float(monitor_config.get('cooldown', 30))
+        )
+        translator.start()
+
+    mode_matcher: lthslatin_manager.ModeMatcher = lthslatin_manager.ModeMatcher(available_modes)
+    page_fingerprint: int | None = None
+    continuous: bool = False
+
+    def load_job(mode: str | None, cancel_token: threading.Event, progress) -> None:
+        """
+        Wait for a mode's data before its solve takes the WebDriver, so a cold load can be stopped.
+
+        :param mode: The mode to load.
+        :param cancel_token: Event set when the solve should stop.
+        :param progress: Callback receiving progress messages.
+        :return: None
+        """
+
+        if mode not in MODE_MODULES or registry.loaded(mode):
+            return None
+
+        progress(f'Loading {mode} data...')
+        registry.wait(mode, cancel_token)
+
+    def solve_steps(mode: str | None, cancel_token: threading.Event, progress) -> steps.Steps | None:
+        """
+        Get the resumable steps solving a mode on the current page.
+
+        :param mode: The mode to solve.
+        :param cancel_token: Event set when the solve should stop.
+        :param progress: Callback receiving progress messages.
+        :return: The steps, or None if the mode can't be solved.
+        """
+
+        if mode not in MODE_MODULES:
+            return None
+
+        data: dict = registry.get(mode)
+
+        match mode:
+            case 'synopsis':
+                if data.get('conjugation-types') is None or data.get('charts') is None:
+                    raise Exception('Synopsis data not loaded!')
+                
+                return steps.from_call(MODE_MODULES['synopsis'].solve, webdriver, data['blocks'], data['charts'], data['conjugation-types'], cancel_token)
+            case 'noun-adj':
+                return MODE_MODULES['noun-adj'].solver_steps(webdriver, data['chart'], history_path=data['history-path'], overlay_path=data['overlay-path'], cancel_token=cancel_token)
+            case 'composition':
+                if data.get('cache-path') is None:
+                    raise Exception('Composition data not loaded!')
+                
+                return MODE_MODULES['composition'].solve_steps(webdriver, composition_prediction, translator, data['dictionary'], data['use-synonyms'], data['cache-path'], cancel_token, progress)
+            case 'timed vocabulary':
+                if not data.get('nltk-working') or data.get('dictionary-path') is None:
+                    raise Exception('Timed Vocabulary data not loaded!')
+                
+                return MODE_MODULES['timed vocabulary'].solver_steps(webdriver, data['dictionary-path'], timed_vocabulary_prediction, translator, cancel_token)
+
+        return None
+
+    def solve_job(mode: str | None, cancel_token: threading.Event, progress) -> None:
+        """
+        Run the solver for a mode on the solver worker.
+
+        :param mode: The mode to solve.
+        :param cancel_token: Event set when the solve should stop.
+        :param progress: Callback receiving progress messages.
+        :return: None
+        """
+
+        solving_steps: steps.Steps | None = solve_steps(mode, cancel_token, progress)
+
+        if solving_steps is None:
+            return None
+
+        solver: str = solver_names.get(mode, 'unknown')
+
+        try:
+            with instrumentation.tagged(webdriver, solver, mode), file_manager.storage.count() as written:
+                steps.run(webdriver, solving_steps, cancel_token=cancel_token)
+        finally:
+            instrumentation.report(webdriver, solver, mode)
+
+        print(f'{solver} wrote {written.bytes} bytes in {written.writes} writes ({written.requested} saves)')
+
+    def solve_tabs_job(repeat: bool, cancel_token: threading.Event, progress) -> None:
+        """
+        Open the configured assignments in tabs and solve every open tab at once, switching to whichever tab the site
+        has finished grading.
+
+        :param repeat: Whether to keep solving each tab until its page can't be solved.
+        :param cancel_token: Event set when the solve should stop.
+        :param progress: Callback receiving progress messages.
+        :return: None
+        """
+
+        def loading_steps(tab_mode: str) -> steps.Steps:
+            # The data loads as a condition, so the scheduler keeps working the other tabs and Stop isn't held up.
+            future: concurrent.futures.Future = registry.request(tab_mode)
+
+            while not future.done():
+                yield lambda driver: future.done()
+
+            tab_solve_steps: steps.Steps | None = solve_steps(tab_mode, cancel_token, progress)
+
+            if tab_solve_steps is None:
+                return None
+
+            return (yield from tab_solve_steps)
+
+        def tab_steps(driver: selenium.webdriver) -> steps.Steps | None:
+            tab_mode, tab_assignment = lthslatin_manager.detect_mode(lthslatin_manager.probe_page(driver), None, mode_matcher, config.get('user', None))
+
+            if tab_mode not in solvable_modes:
+                return None
+
+            if not registry.loaded(tab_mode):
+                return loading_steps(tab_mode)
+
+            return solve_steps(tab_mode, cancel_token, progress)
+
+        # Assignments listed in the config are opened in tabs of their own, paths are relative to the site.
+        assignment_urls: list[str] = [urllib.parse.urljoin(config.get('latin-url', ''), url) for url in config.get('tabs', {}).get('assignment-urls', [])]
+        scheduler: tab_scheduler.TabScheduler = tab_scheduler.TabScheduler(webdriver, tab_steps)
+
+        try:
+            with instrumentation.tagged(webdriver, 'tab_scheduler.run', 'tabs'), file_manager.storage.count() as written:
+                scheduler.open_all(assignment_urls)
+                scheduler.adopt_all()
+                scheduler.run(cancel_token, repeat, progress)
+        finally:
+            instrumentation.report(webdriver, 'tab_scheduler.run', 'tabs')
+
+        print(f'tab_scheduler.run wrote {written.bytes} bytes in {written.writes} writes ({written.requested} saves)')
+
+    solvable_modes: tuple[str] = ('synopsis', 'noun-adj', 'composition', 'timed vocabulary')
+    solver_names: dict = {
+        'synopsis': 'synopsis.solve',
+        'noun-adj': 'noun_adj.solver',
+        'composition': 'composition.solve',
+        'timed vocabulary': 'timed_vocabulary.solver'
+    }
+
+    driver_lock: threading.Lock = threading.Lock()
+    watcher: page_watcher.PageWatcher = page_watcher.PageWatcher(webdriver, window, driver_lock, float(config.get('page-watch-timeout', 2)))
+    worker: solver_worker.SolverWorker = solver_worker.SolverWorker(window, driver_lock)
+
+    watcher.start()
+    worker.start()
 
     while True:
-        event, values = window.read(timeout=100)
+        event, values = window.read()
         
         if event == sg.WINDOW_CLOSED or event == 'Exit':
+            worker.stop()
+            watcher.stop()
+
+            if translator is not None:
+                translator.stop()
+
             window.close()
             break
 
-        mode, assignment = lthslatin_manager.find_mode(webdriver, mode, available_modes, config.get('user', None))
+        continuous = values.get('-CONTINUOUS-', False)
+
+        if event == '-PAGE-':
+            probe: dict | None = values.get('-PAGE-')
 
-        window['-MODE-'].update(f'Mode: {mode}')
+            # A solver holding the driver means the page is mid-solve, the watcher will report it again afterwards.
+            if probe is None and driver_lock.acquire(blocking=False):
+                try:
+                    probe = lthslatin_manager.probe_page(webdriver)
+                finally:
+                    driver_lock.release()
+
+            if probe is not None and probe.get('fingerprint') != page_fingerprint:
+                page_fingerprint = probe.get('fingerprint')
+                mode, assignment = lthslatin_manager.detect_mode(probe, mode, mode_matcher, config.get('user', None))
+
+                window['-MODE-'].update(f'Mode: {mode}')
+
+                # Start loading the mode's data while the user gets ready to solve.
+                if mode in solvable_modes:
+                    registry.prefetch([mode])
+
+        elif event == 'Stop':
+            worker.cancel()
+            window['-STATUS-'].update('Status: Stopping...')
+
+        elif event == '-SOLVE-START-':
+            window['-STATUS-'].update(f'Status: Solving {values[event][0]}...')
+
+        elif event == '-SOLVE-PROGRESS-':
+            window['-STATUS-'].update(f'Status: {values[event][1]}')
+
+        elif event == '-SOLVE-DONE-':
+            window['-STATUS-'].update('Status: Idle')
+
+        elif event == '-SOLVE-ERROR-':
+            print(f'Error: {values[event][1]}')
+            window['-STATUS-'].update(f'Status: Error in {values[event][0][0]}')
         
-        if event == 'Solve' or values['-CONTINUOUS-']:
-            try:
-                match mode:
-                    case 'synopsis':
-                        if synopsis_conjugation_types is None or synopsis_charts is None or synopsis_blocks is None:
-                            raise Exception('Synopsis data not loaded!')
-                        
-                        assignments.synopsis.solve(webdriver, synopsis_blocks, synopsis_charts, synopsis_conjugation_types)
-                    case 'noun-adj':
-                        if noun_adjective_chart is None:
-                            raise Exception('Noun-Adj data not loaded!')
-                        
-                        assignments.noun_adj.solver(webdriver, noun_adjective_chart)
-                    case 'composition':
-                        if composition_dictionary is None or composition_cache_path is None or composition_use_synonyms is None:
-                            raise Exception('Composition data not loaded!')
-                        
-                        use_google_trans = config.get('assignment-configs').get('composition').get('use-googletrans', False)
-                        if use_google_trans is False:
-                            run_prediction = False
-                        
-                        assignments.composition.solve(webdriver, run_prediction, translator, composition_dictionary, composition_use_synonyms, composition_cache_path)
-                    case 'timed vocabulary':
-                        if nltk_working is None or nltk_working is False or timed_vocab_dict_path is None:
-                            raise Exception('Timed Vocabulary data not loaded!')
-                        
-                        use_google_trans = config.get('assignment-configs').get('timed-vocabulary').get('use-googletrans', False)
-                        if use_google_trans is False:
-                            run_prediction = False
-                        
-                        assignments.timed_vocabulary.solver(webdriver, timed_vocab_dict_path, run_prediction, translator)
-            except Exception as error:
-                print(f'Error: {error}')
-
-    return None
\ No newline at end of file
+        if event == 'Solve Tabs':
+            worker.submit(('tabs', None), lambda cancel_token, progress, repeat=continuous: solve_tabs_job(repeat, cancel_token, progress))
+
+        elif mode in solvable_modes and (event == 'Solve' or (continuous and event != '-SOLVE-ERROR-' and not worker.busy())):
+            worker.submit((mode, assignment), lambda cancel_token, progress, solving_mode=mode: solve_job(solving_mode, cancel_token, progress), lambda cancel_token, progress, solving_mode=mode: load_job(solving_mode, cancel_token, progress))
+
+    return None
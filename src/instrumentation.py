@@ -0,0 +1,241 @@
+import os
+import sys
+import math
+import time
+import threading
+import contextlib
+import collections
+import selenium.webdriver
+
+import file_manager
+
+
+IGNORED_PATHS: tuple[str] = (os.path.dirname(selenium.webdriver.__file__).rsplit('webdriver', 1)[0], os.path.abspath(__file__))
+
+
+def percentile(durations: list[float], fraction: float) -> float:
+    """
+    Get a percentile of a list of durations.
+
+    :param durations: The durations.
+    :param fraction: The percentile as a fraction (e.g. 0.95).
+    :return: The percentile, 0 if there are no durations.
+    """
+
+    if len(durations) == 0:
+        return 0
+
+    ordered: list[float] = sorted(durations)
+
+    return ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)]
+
+
+def call_site() -> str:
+    """
+    Find the first frame outside Selenium and this module that led to a command.
+
+    :return: The call site as "file:line function".
+    """
+
+    frame = sys._getframe(2)
+
+    while frame is not None:
+        filename: str = os.path.abspath(frame.f_code.co_filename)
+
+        if not filename.startswith(IGNORED_PATHS):
+            return f'{os.path.basename(filename)}:{frame.f_lineno} {frame.f_code.co_name}'
+
+        frame = frame.f_back
+
+    return 'unknown'
+
+
+class DriverInstrumentation:
+    """
+    Counts and times every WebDriver command sent by a driver.
+
+    Every Selenium call (find_element(s), .text, get_attribute, execute_script, send_keys, click, ...) ends up in the
+    driver's execute method, which is wrapped here. Commands are filed under the tag of the thread sending them, so a
+    solve can be tagged with its solver and mode while the page watcher's polls stay separate.
+    """
+
+    def __init__(self, webdriver: selenium.webdriver, export_path: str | None = None, top_sites: int = 5, max_records: int = 100000) -> None:
+        """
+        Start instrumenting a driver.
+
+        :param webdriver: The Selenium WebDriver object.
+        :param export_path: JSON file summaries are appended to, if any.
+        :param top_sites: The number of call sites included in summaries.
+        :param max_records: The most commands kept per tag, untagged commands (e.g. the page watcher's) are never drained.
+        """
+
+        self.webdriver: selenium.webdriver = webdriver
+        self.export_path: str | None = export_path
+        self.top_sites: int = top_sites
+        self.max_records: int = max_records
+        self.records: dict = {}
+        self.records_lock: threading.Lock = threading.Lock()
+        self.local: threading.local = threading.local()
+        self.execute = webdriver.execute
+
+        webdriver.execute = self.timed_execute
+        webdriver.instrumentation = self
+
+    def current_tag(self) -> tuple:
+        """
+        Get the tag of the current thread.
+
+        :return: Tuple of the solver and mode, ('idle', None) outside a solve.
+        """
+
+        return getattr(self.local, 'tag', ('idle', None))
+
+    def timed_execute(self, driver_command: str, params: dict | None = None) -> dict:
+        """
+        Run a WebDriver command, recording its duration and call site.
+
+        :param driver_command: The command name.
+        :param params: The command's parameters.
+        :return: The command's response.
+        """
+
+        start_time: float = time.perf_counter()
+
+        try:
+            return self.execute(driver_command, params)
+        finally:
+            elapsed: float = time.perf_counter() - start_time
+            site: str = call_site()
+
+            with self.records_lock:
+                self.records.setdefault(self.current_tag(), collections.deque(maxlen=self.max_records)).append((driver_command, elapsed, site))
+
+    @contextlib.contextmanager
+    def tagged(self, solver: str, mode: str | None):
+        """
+        Tag the commands sent by the current thread.
+
+        :param solver: The solver running.
+        :param mode: The mode being solved.
+        """
+
+        previous_tag: tuple = self.current_tag()
+        self.local.tag = (solver, mode)
+
+        try:
+            yield self
+        finally:
+            self.local.tag = previous_tag
+
+    def summary(self, solver: str, mode: str | None, clear: bool = True) -> dict:
+        """
+        Summarize the commands of a tag.
+
+        :param solver: The solver to summarize.
+        :param mode: The mode to summarize.
+        :param clear: Whether to forget the summarized commands.
+        :return: Dictionary with the totals, a breakdown per command and the slowest call sites.
+        """
+
+        with self.records_lock:
+            records: list[tuple] = list(self.records.pop((solver, mode), []) if clear else self.records.get((solver, mode), []))
+
+        durations: list[float] = [elapsed for command, elapsed, site in records]
+        commands: dict = {}
+        sites: dict = {}
+
+        for command, elapsed, site in records:
+            commands.setdefault(command, []).append(elapsed)
+            sites.setdefault(site, []).append(elapsed)
+
+        return {
+            'solver': solver,
+            'mode': mode,
+            'time': int(time.time()),
+            'calls': len(records),
+            'total': sum(durations),
+            'p95': percentile(durations, 0.95),
+            'commands': {command: {'calls': len(times), 'total': sum(times), 'p95': percentile(times, 0.95)} for command, times in sorted(commands.items(), key=lambda item: -sum(item[1]))},
+            'sites': [{'site': site, 'calls': len(times), 'total': sum(times)} for site, times in sorted(sites.items(), key=lambda item: -sum(item[1]))[:self.top_sites]]
+        }
+
+
+def instrument(webdriver: selenium.webdriver, export_path: str | None = None, top_sites: int = 5) -> DriverInstrumentation:
+    """
+    Start instrumenting a driver, once.
+
+    :param webdriver: The Selenium WebDriver object.
+    :param export_path: JSON file summaries are appended to, if any.
+    :param top_sites: The number of call sites included in summaries.
+    :return: The driver's instrumentation.
+    """
+
+    if getattr(webdriver, 'instrumentation', None) is not None:
+        return webdriver.instrumentation
+
+    return DriverInstrumentation(webdriver, export_path, top_sites)
+
+
+def tagged(webdriver: selenium.webdriver, solver: str, mode: str | None):
+    """
+    Tag the current thread's commands if the driver is instrumented.
+
+    :param webdriver: The Selenium WebDriver object.
+    :param solver: The solver running.
+    :param mode: The mode being solved.
+    :return: A context manager, doing nothing for drivers without instrumentation.
+    """
+
+    instrumentation: DriverInstrumentation | None = getattr(webdriver, 'instrumentation', None)
+
+    if instrumentation is None:
+        return contextlib.nullcontext()
+
+    return instrumentation.tagged(solver, mode)
+
+
+def print_summary(summary: dict) -> None:
+    """
+    Print a solve summary.
+
+    :param summary: The summary from DriverInstrumentation.summary.
+    :return: None
+    """
+
+    print(f'{summary["solver"]} ({summary["mode"]}): {summary["calls"]} WebDriver calls, {summary["total"] * 1000:.0f} ms total, p95 {summary["p95"] * 1000:.1f} ms')
+
+    for command, stats in summary['commands'].items():
+        print(f'    {command}: {stats["calls"]} calls, {stats["total"] * 1000:.0f} ms total, p95 {stats["p95"] * 1000:.1f} ms')
+
+    for site in summary['sites']:
+        print(f'    at {site["site"]}: {site["calls"]} calls, {site["total"] * 1000:.0f} ms')
+
+
+def report(webdriver: selenium.webdriver, solver: str, mode: str | None) -> dict | None:
+    """
+    Print the summary of a solve and append it to the export file, if the driver is instrumented.
+
+    :param webdriver: The Selenium WebDriver object.
+    :param solver: The solver that ran.
+    :param mode: The mode that was solved.
+    :return: The summary, or None if the driver isn't instrumented.
+    """
+
+    instrumentation: DriverInstrumentation | None = getattr(webdriver, 'instrumentation', None)
+
+    if instrumentation is None:
+        return None
+
+    summary: dict = instrumentation.summary(solver, mode)
+
+    if summary['calls'] == 0:
+        return summary
+
+    print_summary(summary)
+
+    if instrumentation.export_path is not None:
+        exported: dict = file_manager.read_json(instrumentation.export_path) or {'solves': []}
+        exported['solves'].append(summary)
+        file_manager.save_json(instrumentation.export_path, exported)
+
+    return summary
@@ -0,0 +1,90 @@
+import time
+import threading
+import importlib
+
+
+class LazyModule:
+    """
+    Stands in for a module, importing it on first attribute access.
+
+    Heavy dependencies (nltk, inflect, pyinflect, googletrans) are bound to LazyModule objects at module level so a
+    session only pays for the NLP stack of the modes it actually uses.
+    """
+
+    __slots__ = ('_name', '_attribute', '_module', '_lock')
+
+    def __init__(self, name: str, attribute: str | None = None) -> None:
+        """
+        Create a lazy module.
+
+        :param name: The module to import.
+        :param attribute: An attribute of the module to stand in for instead (e.g. wordnet of nltk.corpus).
+        """
+
+        self._name: str = name
+        self._attribute: str | None = attribute
+        self._module: object | None = None
+        self._lock: threading.Lock = threading.Lock()
+
+    def load(self) -> object:
+        """
+        Import the module if it isn't yet.
+
+        :return: The module, or its attribute.
+        """
+
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    module: object = importlib.import_module(self._name)
+                    self._module = module if self._attribute is None else getattr(module, self._attribute)
+
+        return self._module
+
+    def __getattr__(self, name: str) -> object:
+        return getattr(self.load(), name)
+
+    def __repr__(self) -> str:
+        return f'<lazy {self._name}{"." + self._attribute if self._attribute is not None else ""}{" (loaded)" if self._module is not None else ""}>'
+
+
+def lazy_import(name: str, attribute: str | None = None) -> LazyModule:
+    """
+    Get a module that is imported on first use.
+
+    :param name: The module to import.
+    :param attribute: An attribute of the module to stand in for instead.
+    :return: The lazy module.
+    """
+
+    return LazyModule(name, attribute)
+
+
+def prewarm(names: list[str], background: bool = True) -> threading.Thread | None:
+    """
+    Import modules ahead of their first use.
+
+    :param names: The modules to import, in order.
+    :param background: Whether to import them on a daemon thread.
+    :return: The thread importing the modules, or None if they were imported in the foreground.
+    """
+
+    def run() -> None:
+        start_time: float = time.perf_counter()
+
+        for name in names:
+            try:
+                importlib.import_module(name)
+            except Exception as error:
+                print(f'Unable to pre-warm {name}: {error}')
+
+        print(f'Pre-warmed {len(names)} modules in {time.perf_counter() - start_time:.2f} seconds')
+
+    if not background:
+        run()
+        return None
+
+    thread: threading.Thread = threading.Thread(target=run, name='prewarm', daemon=True)
+    thread.start()
+
+    return thread
@@ -0,0 +1,362 @@
+import os
+import time
+import hashlib
+import argparse
+import threading
+import concurrent.futures
+
+import requests
+
+import asset_cache
+import file_manager
+import schoology_manager
+
+
+_state_lock: threading.Lock = threading.Lock()
+
+
+def hash_file(path: str, algorithm: str = 'sha256') -> str:
+    """
+    Hash a file in chunks. Files converted to a binary serializer are hashed as the JSON they were converted from,
+    which they record, so a converted shard still matches the repo's checksum.
+
+    :param path: Path to the file.
+    :param algorithm: The hashlib algorithm.
+    :return: The hex digest.
+    """
+
+    source: str | None = file_manager.read_source(path)
+
+    if source is not None and source.startswith(f'{algorithm}:'):
+        return source[len(algorithm) + 1:]
+
+    digest = hashlib.new(algorithm)
+
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 16), b''):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def read_manifest(manifest_path: str) -> tuple[dict[str, str], str]:
+    """
+    Read a checksum manifest, either {shard: hash} or {"algorithm": ..., "files": {shard: hash}}.
+
+    :param manifest_path: Path to the manifest.
+    :return: The shard hashes and the hash algorithm.
+    """
+
+    manifest: dict = file_manager.read_json(manifest_path) or {}
+
+    if isinstance(manifest.get('files'), dict):
+        return manifest['files'], manifest.get('algorithm', 'sha256')
+
+    return {name: checksum for name, checksum in manifest.items() if isinstance(checksum, str)}, 'sha256'
+
+
+def update_state(state_path: str, algorithm: str, hashes: dict[str, list], synced: dict[str, str] | None = None) -> None:
+    """
+    Merge shard hashes into the state file.
+
+    :param state_path: Path to the state file.
+    :param algorithm: The hashlib algorithm, the state is reset if it changed.
+    :param hashes: Dictionary mapping each shard to its [size, modification time, hash].
+    :param synced: Dictionary mapping each shard to the hash it was last synced at, if any changed.
+    :return: None
+    """
+
+    with _state_lock:
+        state: dict = file_manager.read_json(state_path) or {}
+
+        if state.get('algorithm') != algorithm:
+            state = {'algorithm': algorithm, 'hashes': {}, 'synced': {}}
+
+        state.setdefault('hashes', {}).update(hashes)
+        state.setdefault('synced', {}).update(synced or {})
+
+        file_manager.save_json(state_path, state)
+
+
+def synced_hashes(state_path: str, algorithm: str) -> dict[str, str]:
+    """
+    Get the hash each shard had when it was last synced.
+
+    :param state_path: Path to the state file.
+    :param algorithm: The hashlib algorithm.
+    :return: Dictionary mapping each synced shard to its hash.
+    """
+
+    state: dict = file_manager.read_json(state_path) or {}
+
+    return state.get('synced', {}) if state.get('algorithm') == algorithm else {}
+
+
+def local_hashes(library_path: str, names: list[str], algorithm: str = 'sha256', state_path: str | None = None, workers: int = 8) -> dict[str, str]:
+    """
+    Hash the local shards in parallel, reusing the hashes of shards whose size and modification time haven't changed.
+
+    :param library_path: The folder the shards are in.
+    :param names: The shards to hash, missing ones are left out.
+    :param algorithm: The hashlib algorithm.
+    :param state_path: Path to the file the previous hashes are kept in, every shard is hashed if None.
+    :param workers: The number of hashing threads.
+    :return: Dictionary mapping each local shard to its hash.
+    """
+
+    state: dict = (file_manager.read_json(state_path) or {}) if state_path is not None else {}
+    cached: dict = state.get('hashes', {}) if state.get('algorithm') == algorithm else {}
+
+    hashes: dict[str, str] = {}
+    stats: dict[str, list[int]] = {}
+    to_hash: list[str] = []
+
+    for name in names:
+        try:
+            stat: os.stat_result = os.stat(os.path.join(library_path, name))
+        except FileNotFoundError:
+            continue
+
+        stats[name] = [stat.st_size, stat.st_mtime_ns]
+        entry: list | None = cached.get(name)
+
+        if entry is not None and entry[:2] == stats[name]:
+            hashes[name] = entry[2]
+        else:
+            to_hash.append(name)
+
+    if len(to_hash) != 0:
+        with concurrent.futures.ThreadPoolExecutor(workers, thread_name_prefix='library-hash') as pool:
+            for name, checksum in zip(to_hash, pool.map(lambda name: hash_file(os.path.join(library_path, name), algorithm), to_hash)):
+                hashes[name] = checksum
+
+    if state_path is not None and len(to_hash) != 0:
+        update_state(state_path, algorithm, {name: stats[name] + [hashes[name]] for name in to_hash})
+
+    return hashes
+
+
+def record_hashes(library_path: str, hashes: dict[str, str], algorithm: str = 'sha256', state_path: str | None = None) -> None:
+    """
+    Record the hashes of shards as they are on disk now and as synced, e.g. verified shards that were just swapped in.
+
+    :param library_path: The folder the shards are in.
+    :param hashes: Dictionary mapping each shard to its hash.
+    :param algorithm: The hashlib algorithm.
+    :param state_path: Path to the file the hashes are kept in, nothing is recorded if None.
+    :return: None
+    """
+
+    if state_path is None:
+        return None
+
+    stats: dict[str, list] = {}
+
+    for name, checksum in hashes.items():
+        stat: os.stat_result = os.stat(os.path.join(library_path, name))
+        stats[name] = [stat.st_size, stat.st_mtime_ns, checksum]
+
+    update_state(state_path, algorithm, stats, hashes)
+
+
+def download_shard(session: requests.Session, url: str, part_path: str, checksum: str, algorithm: str = 'sha256', timeout: tuple[float, float] = (3, 30)) -> bool:
+    """
+    Download a shard to its part file, resuming a previous partial download, and verify it.
+
+    :param session: The pooled session to download with.
+    :param url: The shard's URL.
+    :param part_path: Path to the part file.
+    :param checksum: The shard's expected hash.
+    :param algorithm: The hashlib algorithm.
+    :param timeout: The connect and read timeouts in seconds.
+    :return: True if the part file is complete and verified, otherwise False.
+    """
+
+    for attempt in range(2):
+        offset: int = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers: dict[str, str] = {'Range': f'bytes={offset}-'} if offset > 0 else {}
+
+        try:
+            with session.get(url, headers=headers, timeout=timeout, stream=True) as response:
+                match response.status_code:
+                    case 206:
+                        mode: str = 'ab'
+                    case 200:
+                        mode = 'wb'
+                    case 416:
+                        # The part file is already complete (or longer than the shard), verify it below.
+                        mode = ''
+                    case _:
+                        print(f'Unable to download {url}: HTTP {response.status_code}')
+                        return False
+
+                if mode != '':
+                    with open(part_path, mode) as file:
+                        for chunk in response.iter_content(1 << 16):
+                            file.write(chunk)
+        except requests.exceptions.RequestException as error:
+            # The part file is kept so the next sync resumes from where this one stopped.
+            print(f'Unable to download {url}: {error.__class__.__name__}')
+            return False
+
+        if hash_file(part_path, algorithm) == checksum:
+            return True
+
+        # A corrupt part file can't be resumed, start over once.
+        os.remove(part_path)
+
+    print(f'Checksum mismatch for {url}')
+    return False
+
+
+def sync(base_url: str, library_path: str, checksum_file: str = 'checksum.json', data_path: str = '', workers: int = 8, connect_timeout: float = 3, read_timeout: float = 30, prune: bool = False, session: requests.Session | None = None) -> list[str]:
+    """
+    Bring the local library up to date with the library repo, downloading only the shards that changed.
+
+    The checksum manifest is fetched through the asset cache and diffed against the local shard hashes. Changed and
+    missing shards download concurrently into a staging folder next to the library, resuming earlier partial
+    downloads, and are swapped in only after every one of them is verified, so the library is never left half synced.
+
+    The library is also where timed vocabulary saves what it learns, so a shard is only replaced while it's still
+    exactly as it was last synced. Shards edited since (or never synced) are kept, and checked again right before the
+    swap in case a solve saved them during the download.
+
+    :param base_url: The library repo URL, shards are downloaded from base_url + shard name.
+    :param library_path: The folder the shards are kept in.
+    :param checksum_file: The manifest's name in the repo.
+    :param data_path: Path to the data folder, where the manifest and the hash state are kept.
+    :param workers: The number of concurrent downloads and hashing threads.
+    :param connect_timeout: Seconds to wait for a connection.
+    :param read_timeout: Seconds to wait for a response.
+    :param prune: Whether to delete local shards that are no longer in the manifest.
+    :param session: The session to download with, a new pooled session if None.
+    :return: The shards that were updated or removed, empty if nothing changed or the sync failed.
+    """
+
+    session = session or schoology_manager.create_session(pool_size=workers)
+    manifest_path: str = os.path.join(data_path, f'library-{checksum_file}')
+    state_path: str = os.path.join(data_path, 'library-hashes.json')
+
+    if not asset_cache.fetch(f'{base_url}{checksum_file}', manifest_path, os.path.join(data_path, 'assets.json'), connect_timeout, read_timeout, session=session):
+        print('Unable to get the library checksums, skipping sync...')
+        return []
+
+    remote: dict[str, str]
+    algorithm: str
+    remote, algorithm = read_manifest(manifest_path)
+
+    # Shards are plain file names, anything else could write outside the library.
+    remote = {name: checksum for name, checksum in remote.items() if os.path.basename(name) == name and name not in ('', '.', '..')}
+
+    if not os.path.exists(library_path):
+        os.makedirs(library_path)
+
+    local: dict[str, str] = local_hashes(library_path, list(remote), algorithm, state_path, workers)
+    synced: dict[str, str] = synced_hashes(state_path, algorithm)
+
+    def untouched(name: str, hashes: dict[str, str]) -> bool:
+        return name not in hashes or hashes[name] == synced.get(name)
+
+    # Shards that already match the repo count as synced, e.g. a library downloaded before syncs were recorded.
+    matching: dict[str, str] = {name: checksum for name, checksum in remote.items() if local.get(name) == checksum and synced.get(name) != checksum}
+
+    if len(matching) != 0:
+        update_state(state_path, algorithm, {}, matching)
+        synced.update(matching)
+
+    outdated: list[str] = [name for name, checksum in remote.items() if local.get(name) != checksum]
+    changed: list[str] = [name for name in outdated if untouched(name, local)]
+
+    print(f'Library: {len(remote)} shards, {len(changed)} to download, {len(outdated) - len(changed)} edited locally and kept')
+
+    staging_path: str = f'{library_path.rstrip(os.sep)}.partial'
+
+    if len(changed) != 0:
+        if not os.path.exists(staging_path):
+            os.makedirs(staging_path)
+
+        with concurrent.futures.ThreadPoolExecutor(workers, thread_name_prefix='library-sync') as pool:
+            results: list[bool] = list(pool.map(lambda name: download_shard(session, f'{base_url}{name}', os.path.join(staging_path, name), remote[name], algorithm, (connect_timeout, read_timeout)), changed))
+
+        if not all(results):
+            print(f'{results.count(False)} shards failed, keeping the current library')
+            return []
+
+        # A solve may have saved a shard during the download, those are kept and their download dropped.
+        file_manager.storage.flush()
+        current: dict[str, str] = local_hashes(library_path, changed, algorithm, state_path, workers)
+        edited: list[str] = [name for name in changed if not untouched(name, current)]
+
+        for name in edited:
+            os.remove(os.path.join(staging_path, name))
+            changed.remove(name)
+
+        for name in changed:
+            os.replace(os.path.join(staging_path, name), os.path.join(library_path, name))
+
+            # Shards are verified as published (JSON), then stored in a binary dictionary serializer's format.
+            if file_manager.get_serializer('dictionary').tag is not None:
+                file_manager.convert(os.path.join(library_path, name), 'dictionary', algorithm=algorithm)
+
+        os.rmdir(staging_path)
+
+    removed: list[str] = []
+
+    if prune:
+        # Only shards that came from the repo and weren't edited since, learned entries are never pruned.
+        stale: list[str] = [name for name in synced if name not in remote]
+        stale_hashes: dict[str, str] = local_hashes(library_path, stale, algorithm, state_path, workers)
+
+        for name in stale:
+            if name in stale_hashes and stale_hashes[name] == synced[name]:
+                os.remove(os.path.join(library_path, name))
+                removed.append(name)
+
+    if len(changed) != 0:
+        # Swapped in shards have new modification times, record their verified hashes for the next sync.
+        record_hashes(library_path, {name: remote[name] for name in changed}, algorithm, state_path)
+
+    return changed + removed
+
+
+def sync_from_config(config: dict, data_path: str) -> list[str]:
+    """
+    Sync the library configured under library-repo.
+
+    :param config: Dictionary containing the configuration settings.
+    :param data_path: Path to the data folder.
+    :return: The shards that were updated or removed.
+    """
+
+    library_config: dict = config.get('library-repo', {})
+
+    if library_config.get('url') is None:
+        return []
+
+    return sync(
+        library_config['url'],
+        file_manager.clean_path(library_config.get('path', '[MINERVA-FOLDER]data(SUB)timed_vocabulary_dictionary(SUB)'), data_path),
+        library_config.get('checksum-file', 'checksum.json'),
+        data_path,
+        int(library_config.get('workers', 8)),
+        float(library_config.get('connect-timeout', 3)),
+        float(library_config.get('read-timeout', 30)),
+        str(library_config.get('prune', False)).lower() == 'true'
+    )
+
+
+if __name__ == '__main__':
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description='Syncs the dictionary library with the library repo')
+
+    parser.add_argument('-c', '--config', help='Path to the configuration file', type=str, default=f'.{os.sep}default{os.sep}config.json')
+    parser.add_argument('-d', '--data', help='Path to the data folder', type=str, default=f'{file_manager.get_documents_folder()}{os.sep}minerva{os.sep}')
+
+    args: argparse.Namespace = parser.parse_args()
+
+    config: dict = file_manager.read_json(args.config) or {}
+    file_manager.configure_serializers(config.get('serializers', {}))
+
+    start_time: float = time.perf_counter()
+    updated: list[str] = sync_from_config(config, args.data)
+
+    print(f'Synced in {time.perf_counter() - start_time:.2f} seconds, {len(updated)} shards updated')
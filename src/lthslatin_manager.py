@@ -1,18 +1,184 @@
+import os
+import re
+import json
 import time
+import requests
+import cryptography.fernet
 import selenium.webdriver
-from googletrans import Translator
 from selenium.webdriver.common.by import By
 
+import lazy
+import readiness
+import login_manager
 
-def check_translation_delay() -> int | None:
+
+googletrans: lazy.LazyModule = lazy.lazy_import('googletrans')
+
+PROBE_FUNCTION: str = """
+function minervaProbe() {
+    const titles = Array.from(document.getElementsByClassName('ui-title'), element => element.getClientRects().length > 0 ? element.innerText.trim() : '');
+    const page = document.querySelector('.ui-page-active');
+    const pageId = page ? page.id : '';
+    const state = [location.href, pageId].concat(titles).join('\\u0000');
+
+    let fingerprint = 5381;
+
+    for (let i = 0; i < state.length; i++) {
+        fingerprint = ((fingerprint << 5) + fingerprint + state.charCodeAt(i)) | 0;
+    }
+
+    return {titles: titles, page: pageId, fingerprint: fingerprint};
+}
+"""
+
+PROBE_SCRIPT: str = f"""
+{PROBE_FUNCTION}
+return minervaProbe();
+"""
+
+# Installed on every navigation, queues a probe whenever the page id or mode titles change.
+AGENT_SCRIPT: str = f"""
+(function () {{
+    if (window.__minervaAgent) {{
+        return;
+    }}
+
+    {PROBE_FUNCTION}
+
+    const agent = {{queue: [], waiter: null, fingerprint: null, scheduled: false}};
+    window.__minervaAgent = agent;
+
+    const check = (type) => {{
+        agent.scheduled = false;
+
+        const state = minervaProbe();
+
+        if (state.fingerprint === agent.fingerprint) {{
+            return;
+        }}
+
+        agent.fingerprint = state.fingerprint;
+        state.type = type;
+        state.time = Date.now();
+
+        agent.queue.push(state);
+
+        if (agent.queue.length > 50) {{
+            agent.queue.shift();
+        }}
+
+        if (agent.waiter) {{
+            agent.waiter();
+        }}
+    }};
+
+    const schedule = () => {{
+        if (!agent.scheduled) {{
+            agent.scheduled = true;
+            setTimeout(() => check('change'), 50);
+        }}
+    }};
+
+    const start = () => {{
+        new MutationObserver(schedule).observe(document.body, {{childList: true, subtree: true, characterData: true, attributes: true, attributeFilter: ['class', 'style']}});
+        window.addEventListener('hashchange', () => check('navigation'));
+        window.addEventListener('popstate', () => check('navigation'));
+        check('load');
+    }};
+
+    if (document.readyState === 'loading') {{
+        document.addEventListener('DOMContentLoaded', start);
+    }} else {{
+        start();
+    }}
+}})();
+"""
+
+WAIT_SCRIPT: str = f"""
+const timeout = arguments[0];
+const done = arguments[arguments.length - 1];
+
+{AGENT_SCRIPT}
+
+const agent = window.__minervaAgent;
+
+if (agent.queue.length !== 0) {{
+    done(agent.queue.splice(0));
+}} else {{
+    const timer = setTimeout(() => {{
+        agent.waiter = null;
+        done([]);
+    }}, timeout);
+
+    agent.waiter = () => {{
+        clearTimeout(timer);
+        agent.waiter = null;
+        done(agent.queue.splice(0));
+    }};
+}}
+"""
+
+
+class ModeMatcher:
+    """
+    Matches ui-title texts against the configured modes.
+
+    Modes earlier in the config win when a title contains several of them, so order modes correctly if they're name
+    dependent. Results are cached per title since the same few titles are seen over and over.
+    """
+
+    __slots__ = ('modes', 'pattern', 'cache')
+
+    def __init__(self, available_modes: list[str]) -> None:
+        """
+        Compile the matcher.
+
+        :param available_modes: The available modes to search for, in priority order.
+        """
+
+        self.modes: dict = {mode: index for index, mode in enumerate(available_modes)}
+        self.pattern: re.Pattern | None = None
+        self.cache: dict = {}
+
+        if len(available_modes) != 0:
+            self.pattern = re.compile(f"(?=({'|'.join(re.escape(mode) for mode in available_modes)}))")
+
+    def match(self, title: str) -> str | None:
+        """
+        Find the mode a title belongs to.
+
+        :param title: The lowercase title text.
+        :return: The matching mode, or None if no mode matches.
+        """
+
+        if title in self.cache:
+            return self.cache[title]
+
+        mode: str | None = None
+
+        if self.pattern is not None:
+            candidates: list[str] = [match.group(1) for match in self.pattern.finditer(title)]
+
+            if len(candidates) != 0:
+                mode = min(candidates, key=self.modes.get)
+
+        self.cache[title] = mode
+
+        return mode
+
+
+def check_translation_delay(translator: object | None = None) -> float | None:
     """
     Check the delay for the translation service.
 
+    :param translator: The googletrans Translator to check with, a new one if None.
     :return: The delay for the translation service. None if broken.
     """
 
     try:
-        translator = Translator()
+        if translator is None:
+            translator = googletrans.Translator()
+
         translater_delay = time.time()
         translator.translate('le tit', src='fr', dest='en')
         
@@ -40,43 +206,242 @@ def get_user(webdriver: selenium.webdriver) -> str | None:
     return user
 
 
-def find_mode(webdriver: selenium.webdriver, mode: str | None, available_modes: list[str], user: str | None) -> None:
+def open_site(webdriver: selenium.webdriver, config: dict, session: requests.Session) -> None:
     """
-    Find the mode in the Latin site.
+    Move a logged in Schoology session into the browser and follow the LTI launch to the Latin site.
 
     :param webdriver: The Selenium WebDriver object.
-    :param mode: The mode to find.
-    :param available_modes: The available modes to search for.
-    :param user: The user to search for.
+    :param config: Dictionary containing the configuration settings.
+    :param session: The logged in Schoology session, closed once its cookies are in the browser.
     :return: None
     """
 
-    title_elements = webdriver.find_elements(By.CLASS_NAME, 'ui-title')
-    assignment: str | None = None
+    webdriver.get(config.get('schoology-url', None))
 
-    for element in title_elements:
-        for available_mode in available_modes:
-            try:
-                if available_mode in str(element.text).lower():
-                    if user is not None:
-                        assignment = str(element.text).lower().replace(f"{user.lower()}'s ", "")
-                    else:
-                        assignment = str(element.text).lower().split("'s ")
-
-                        if len(assignment) > 1:
-                            assignment = assignment[1]
-                        else:
-                            assignment = None
-
-                    if available_mode != mode:
-                        mode = available_mode
-
-                    break #once it's found the mode it immediately stops to continue with the rest of the while loop, make sure to order modes correctly if they're name dependent
-            except:
-                pass
+    for cookie in session.cookies:
+        webdriver.add_cookie({
+            'name': cookie.name,
+            'value': cookie.value,
+            'path': cookie.path,
+            'domain': cookie.domain
+        })
     
+    print('Clear old sessions...')
+    session.close()
+
+    webdriver.get(config.get('LTHSLatin-schoology-url', None))
+
+    readiness.wait(webdriver, readiness.lti_handoff_complete(config.get('latin-url', None)))
+
+    webdriver.get(config.get('latin-url', None))
+    readiness.wait(webdriver, readiness.page_active())
+
+
+def save_site_session(webdriver: selenium.webdriver, key: bytes, file_path: str) -> None:
+    """
+    Save the Latin site's cookies from the browser, encrypted, so the next start can skip the Schoology LTI launch.
+
+    :param webdriver: The Selenium WebDriver object, on the Latin site.
+    :param key: Key to use for encryption.
+    :param file_path: Path to save the cookies to.
+    :return: None
+    """
+
+    cookies: list[dict] = webdriver.get_cookies()
+
+    if os.path.dirname(file_path) != '' and not os.path.exists(os.path.dirname(file_path)):
+        os.makedirs(os.path.dirname(file_path))
+
+    with open(file_path, 'wb') as file:
+        file.write(login_manager.encrypt_data(json.dumps({'cookies': cookies, 'saved': time.time()}), key))
+
+
+def restore_site_session(webdriver: selenium.webdriver, config: dict, key: bytes, file_path: str) -> bool:
+    """
+    Open the Latin site with the browser's own session or the saved cookies, without going through Schoology.
+
+    :param webdriver: The Selenium WebDriver object.
+    :param config: Dictionary containing the configuration settings.
+    :param key: Key the cookies were encrypted with.
+    :param file_path: Path the cookies were saved to.
+    :return: True if the Latin site accepted the session, otherwise False.
+    """
+
+    latin_url: str | None = config.get('latin-url', None)
+
+    if latin_url is None:
+        return False
+
+    webdriver.get(latin_url)
+    readiness.wait(webdriver, readiness.page_active(10))
+
+    # A persistent browser profile may still be logged in.
+    if on_site(webdriver, latin_url):
+        return True
+
+    if not os.path.exists(file_path):
+        return False
+
+    try:
+        with open(file_path, 'rb') as file:
+            cookies: list[dict] = json.loads(login_manager.decrypt_data(file.read(), key)).get('cookies', [])
+    except (cryptography.fernet.InvalidToken, ValueError):
+        return False
+
+    for cookie in cookies:
+        if cookie.get('sameSite') not in ('Strict', 'Lax', 'None'):
+            cookie.pop('sameSite', None)
+
+        try:
+            webdriver.add_cookie(cookie)
+        except Exception as error:
+            print(f'Unable to restore cookie {cookie.get("name")}: {error}')
+
+    webdriver.get(latin_url)
+    readiness.wait(webdriver, readiness.page_active(10))
+
+    return on_site(webdriver, latin_url)
+
+
+def on_site(webdriver: selenium.webdriver, latin_url: str | None) -> bool:
+    """
+    Check if a browser is already logged in to the Latin site.
+
+    :param webdriver: The Selenium WebDriver object.
+    :param latin_url: The Latin site's URL.
+    :return: True if the browser shows a user's page of the Latin site, otherwise False.
+    """
+
+    if latin_url is None:
+        return False
+
+    try:
+        if not str(webdriver.current_url).startswith(latin_url):
+            return False
+    except:
+        return False
+
+    probe: dict | None = probe_page(webdriver)
+
+    if probe is None or probe.get('page', '') == '':
+        return False
+
+    return any("'s " in str(title) for title in probe.get('titles', []))
+
+
+def probe_page(webdriver: selenium.webdriver) -> dict | None:
+    """
+    Get the title texts, active page id and a fingerprint of the page state in one call.
+
+    :param webdriver: The Selenium WebDriver object.
+    :return: Dictionary with titles, page and fingerprint keys, or None if the page couldn't be read.
+    """
+
+    try:
+        return webdriver.execute_script(PROBE_SCRIPT)
+    except:
+        return None
+
+
+def install_agent(webdriver: selenium.webdriver, timeout: float) -> None:
+    """
+    Install the page-change agent in the browser.
+
+    Chromium based browsers re-run the agent on every new document through CDP. Other browsers get it re-installed
+    by wait_for_page_events whenever a navigation has wiped it.
+
+    :param webdriver: The Selenium WebDriver object.
+    :param timeout: The longest wait_for_page_events will be called with, in seconds.
+    :return: None
+    """
+
+    webdriver.set_script_timeout(timeout + 5)
+
+    try:
+        webdriver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': AGENT_SCRIPT})
+    except:
+        pass
+
+    try:
+        webdriver.execute_script(AGENT_SCRIPT)
+    except:
+        print('Unable to install page agent, it will be installed on the next wait.')
+
+
+def wait_for_page_events(webdriver: selenium.webdriver, timeout: float) -> list[dict] | None:
+    """
+    Wait until the page id or mode titles change, or the timeout runs out.
+
+    :param webdriver: The Selenium WebDriver object.
+    :param timeout: Seconds to wait for a change.
+    :return: The queued page probes (oldest first, empty on timeout), or None if a navigation interrupted the wait.
+    """
+
+    try:
+        return webdriver.execute_async_script(WAIT_SCRIPT, int(timeout * 1000))
+    except:
+        return None
+
+
+def detect_mode(probe: dict | None, mode: str | None, matcher: ModeMatcher, user: str | None) -> tuple[str | None, str | None]:
+    """
+    Find the mode and assignment from a page probe.
+
+    :param probe: The page probe from probe_page.
+    :param mode: The current mode.
+    :param matcher: The matcher for the available modes.
+    :param user: The user to search for.
+    :return: Tuple of the mode and the assignment.
+    """
+
+    assignment: str | None = None
+
+    if probe is None:
+        return mode, assignment
+
+    for title in probe.get('titles', []):
+        title = str(title).lower()
+        available_mode: str | None = matcher.match(title)
+
+        if available_mode is None:
+            continue
+
+        if user is not None:
+            assignment = title.replace(f"{user.lower()}'s ", "")
+        else:
+            assignment = title.split("'s ")
+
+            if len(assignment) > 1:
+                assignment = assignment[1]
+            else:
+                assignment = None
+
+        mode = available_mode
+
     if (assignment is not None) and ('launchpad' in assignment or assignment == ""):
         assignment = None
-    
+
     return mode, assignment
 
+
+_matchers: dict = {}
+
+
+def find_mode(webdriver: selenium.webdriver, mode: str | None, available_modes: list[str], user: str | None) -> tuple[str | None, str | None]:
+    """
+    Find the mode in the Latin site.
+
+    :param webdriver: The Selenium WebDriver object.
+    :param mode: The mode to find.
+    :param available_modes: The available modes to search for.
+    :param user: The user to search for.
+    :return: Tuple of the mode and the assignment.
+    """
+
+    matcher: ModeMatcher | None = _matchers.get(tuple(available_modes))
+
+    if matcher is None:
+        matcher = ModeMatcher(available_modes)
+        _matchers[tuple(available_modes)] = matcher
+
+    return detect_mode(probe_page(webdriver), mode, matcher, user)
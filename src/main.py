@@ -1,31 +1,41 @@
 import os
-import json
 import time
-import nltk
 import glob
 import shutil
+import functools
 import requests
 import argparse
 import selenium.webdriver
 
 import gui
 import driver
+import browser_profiles
+import browser_daemon
 import file_manager
 import login_manager
+import startup
+import asset_cache
+import nltk_resources
+import mode_data
+import library_sync
+import instrumentation
 import schoology_manager
+import lthslatin_manager
 
-import assignments.synopsis
 import assignments.composition
+import assignments.synopsis_engine
+import assignments.noun_adj_engine
 
 
-def main(config: dict, data_path: str, credentials_path: str, icon_path: str, master_password: str) -> None:
+def unlock(config: dict, credentials_path: str, icon_path: str, master_password: str | None) -> tuple[str, str, bytes] | None:
     """
-    Main function for the application.
+    Unlock the saved credentials, showing the setup and login windows when needed.
 
     :param config: Dictionary containing the configuration settings.
-    :param data_path: Path to the data folder.
     :param credentials_path: Path to the credentials file.
-    :return: None
+    :param icon_path: Path to the icon file.
+    :param master_password: The master password, the login window is shown if None.
+    :return: Tuple of the username, password and the key they were encrypted with, or None if none were provided.
     """
 
     if not login_manager.credentials_exist(credentials_path):
@@ -35,61 +45,125 @@ def main(config: dict, data_path: str, credentials_path: str, icon_path: str, ma
         key: bytes = login_manager.generate_key(master_password)
         username, password = login_manager.load_credentials(key, credentials_path)
     else:
-        username, password = gui.login_window(config, credentials_path, icon_path)
+        username, password, key = gui.login_window(config, credentials_path, icon_path)
 
     if username is None or password is None:
         print('No credentials provided, exiting...')
-        return
+        return None
+
+    return username, password, key
+
+
+def log_in(config: dict, data_path: str, key: bytes, username: str, password: str) -> requests.Session | None:
+    """
+    Log in to Schoology with the saved session or credentials and check for a Latin course.
+
+    :param config: Dictionary containing the configuration settings.
+    :param data_path: Path to the data folder.
+    :param key: Key the saved session is encrypted with.
+    :param username: The username for login.
+    :param password: The password for login.
+    :return: The logged in session, or None if there is no Latin course.
+    """
     
     if config.get('schoology-url', None) is not None and not config.get('schoology-url', None).endswith('/'):
         config['schoology-url'] = f"{config.get('schoology-url', None)}/"
     
     #This does all the work behind the scenes.
 
-    print('Logging in...')
-    session: requests.Session = schoology_manager.login(config.get('schoology-url', None), username, password.strip())
-
-    username, password = None, None # Clear the username and password from memory
-
-    print('Checking for Latin courses...')
-    courses: list[dict] = schoology_manager.get_courses(session, config.get('schoology-url', None))
-    sections: list[dict] = schoology_manager.find_latin_courses(courses)
+    session_path: str = file_manager.clean_path(config.get('schoology-session', {}).get('path', '[MINERVA-FOLDER]session.enc'), data_path)
+    session, sections = schoology_manager.open_session(config, key, username, password.strip(), session_path)
 
     if len(sections) == 0:
         print('No Latin courses found, exiting...')
-        return
+        return None
 
-    print('Injecting cookies...')
-    webdriver: selenium.webdriver = driver.get_driver(config.get('browser', 'Chrome').title())
+    return session
 
-    webdriver.get(config.get('schoology-url', None))
 
-    for cookie in session.cookies:
-        webdriver.add_cookie({
-            'name': cookie.name,
-            'value': cookie.value,
-            'path': cookie.path,
-            'domain': cookie.domain
-        })
-    
-    print('Clear old sessions...')
-    session.close()
+def start_browser(config: dict, data_path: str) -> selenium.webdriver.Remote:
+    """
+    Launch the configured browser.
 
-    webdriver.get(config.get('LTHSLatin-schoology-url', None))
+    :param config: Dictionary containing the configuration settings.
+    :param data_path: Path to the data folder.
+    :return: The Selenium WebDriver object.
+    """
 
-    time.sleep(5) #Implement proper load detection later
+    driver_registry_config: dict = config.get('driver-registry', {})
+    driver_registry_path: str = file_manager.clean_path(driver_registry_config.get('path', '[MINERVA-FOLDER]drivers.json'), data_path)
 
-    webdriver.get(config.get('latin-url', None))
+    browser_profile: dict = browser_profiles.get_profile(config, data_path)
 
-    modes: list[str] = config.get('modes', [])
-    print(f'Loading available modes... {modes}')
+    return driver.get_driver(config.get('browser', 'Chrome').title(), driver_registry_path, driver_registry_config, browser_profile)
 
-    assignment_configs: dict = config.get('assignment-configs', {})
-    nltk_downloaded_dependencies: list[str] = []
-    nltk_working: bool = True
 
-    #synopsis setup
-    synopsis_config: dict = assignment_configs.get('synopsis', {})
+def open_latin_site(config: dict, data_path: str, key: bytes, username: str, password: str, site_session_path: str, webdriver: selenium.webdriver.Remote, session: requests.Session | None = None) -> str | None:
+    """
+    Open the Latin site in the browser, restoring its saved session or going through Schoology.
+
+    :param config: Dictionary containing the configuration settings.
+    :param data_path: Path to the data folder.
+    :param key: Key the saved sessions are encrypted with.
+    :param username: The username for login.
+    :param password: The password for login.
+    :param site_session_path: Path of the saved Latin site session.
+    :param webdriver: The Selenium WebDriver object.
+    :param session: A Schoology session logged in ahead of time, logged in here when needed if None.
+    :return: The start-up path taken, or None if there is no Latin course.
+    """
+
+    if lthslatin_manager.restore_site_session(webdriver, config, key, site_session_path):
+        print('Latin site session restored, skipping Schoology...')
+        startup_path: str = 'restored Latin site session'
+    else:
+        if session is None:
+            session = log_in(config, data_path, key, username, password)
+
+        if session is None:
+            return None
+
+        print('Injecting cookies...')
+        lthslatin_manager.open_site(webdriver, config, session)
+        startup_path = 'full Schoology login'
+
+    lthslatin_manager.save_site_session(webdriver, key, site_session_path)
+
+    return startup_path
+
+
+def download_icon(config: dict, data_path: str, icon_path: str) -> bool:
+    """
+    Download the icon through the asset cache, only if it changed since the last launch.
+
+    :param config: Dictionary containing the configuration settings.
+    :param data_path: Path to the data folder.
+    :param icon_path: Path to save the icon to.
+    :return: True if the icon is saved and up to date, otherwise False.
+    """
+
+    icon_url: str | None = config.get('icon-url', None)
+
+    if icon_url is None:
+        print('No icon URL provided, defaulting to preprogrammed icon.')
+        icon_url = 'https://lthslatin.org/favicon.ico'
+
+    if not asset_cache.fetch(icon_url, icon_path, **asset_cache.fetch_options(config, data_path)):
+        print('Unable to download icon, continuing...')
+        return False
+
+    return True
+
+
+def load_synopsis_data(parse: mode_data.Parse, synopsis_config: dict, data_path: str) -> dict:
+    """
+    Load the synopsis conjugation types and charts.
+
+    :param parse: Runs CPU bound parsing, see mode_data.ModeData.parse.
+    :param synopsis_config: The synopsis assignment config.
+    :param data_path: Path to the data folder.
+    :return: Dictionary with the conjugation types, charts and blocks.
+    """
 
     cleaned_conjugation_charts_path: str = file_manager.clean_path(synopsis_config.get('conjugation-charts-path', None), data_path)
     cleaned_conjugation_types_path: str = file_manager.clean_path(synopsis_config.get('conjugation-chart-types-path', None), data_path)
@@ -97,59 +171,259 @@ def main(config: dict, data_path: str, credentials_path: str, icon_path: str, ma
     if not cleaned_conjugation_charts_path.endswith(os.sep):
         cleaned_conjugation_charts_path += os.sep
 
-    synopsis_conjugation_types: dict = json.load(open(cleaned_conjugation_types_path, 'r'))
-    synopsis_charts: dict = assignments.synopsis.generate_charts(cleaned_conjugation_charts_path)
-    synopsis_blocks: tuple[str] = tuple(synopsis_config.get('blocks', []))
+    return {
+        'conjugation-types': file_manager.read_json(cleaned_conjugation_types_path),
+        'charts': parse(assignments.synopsis_engine.generate_charts, cleaned_conjugation_charts_path),
+        'blocks': tuple(synopsis_config.get('blocks', []))
+    }
 
-    #noun-adj setup
-    noun_adj_config: dict = assignment_configs.get('noun-adj', {})
+
+def load_noun_adj_data(parse: mode_data.Parse, noun_adj_config: dict, data_path: str) -> dict:
+    """
+    Load and compile the noun-adj chart with its learned overlay.
+
+    :param parse: Runs CPU bound parsing, see mode_data.ModeData.parse.
+    :param noun_adj_config: The noun-adj assignment config.
+    :param data_path: Path to the data folder.
+    :return: Dictionary with the compiled chart and the history and overlay paths.
+    """
 
     cleaned_noun_adj_chart_path: str = file_manager.clean_path(noun_adj_config.get('chart-path', None), data_path)
     noun_adj_chart_name: str = noun_adj_config.get('chart', 'noun_adj')
 
-    if not cleaned_conjugation_charts_path.endswith(os.sep):
-        cleaned_conjugation_charts_path += os.sep
-
     if not noun_adj_chart_name.endswith('.json'):
         noun_adj_chart_name = f'{noun_adj_chart_name}.json'
     
-    noun_adj_chart: dict = json.load(open(f'{cleaned_noun_adj_chart_path}{noun_adj_chart_name}', 'r'))
+    noun_adj_overlay_path: str = f"{cleaned_noun_adj_chart_path}{noun_adj_config.get('learned-chart', 'learned.json')}"
+    noun_adj_history_path: str = f"{cleaned_noun_adj_chart_path}{noun_adj_config.get('history', 'history.json')}"
+
+    return {
+        'chart': parse(assignments.noun_adj_engine.load_chart, f'{cleaned_noun_adj_chart_path}{noun_adj_chart_name}', noun_adj_overlay_path),
+        'history-path': noun_adj_history_path,
+        'overlay-path': noun_adj_overlay_path
+    }
+
+
+def resolve_nltk_dependencies(packages: list[str], nltk_config: dict, data_path: str) -> None:
+    """
+    Make sure the NLTK packages a mode depends on are there.
+
+    :param packages: The NLTK packages.
+    :param nltk_config: The NLTK resource config.
+    :param data_path: Path to the data folder.
+    :return: None
+    """
+
+    manifest_path: str | None = nltk_config.get('manifest-path', None)
+    download_dir: str | None = nltk_config.get('download-dir', None)
+
+    missing: list[str] = nltk_resources.resolve(
+        packages,
+        file_manager.clean_path(manifest_path, data_path) if manifest_path is not None else None,
+        str(nltk_config.get('offline', False)).lower() == 'true',
+        file_manager.clean_path(download_dir, data_path) if download_dir is not None else None
+    )
+
+    # Raising lets the next request retry instead of disabling the mode for the session.
+    if len(missing) != 0:
+        raise Exception(f'NLTK packages missing: {", ".join(missing)}')
+
+
+def load_composition_data(parse: mode_data.Parse, composition_config: dict, nltk_config: dict, data_path: str) -> dict:
+    """
+    Build the composition dictionary, and make sure the NLTK packages synonyms come from are there.
+
+    :param parse: Runs CPU bound parsing, see mode_data.ModeData.parse.
+    :param composition_config: The composition assignment config.
+    :param nltk_config: The NLTK resource config.
+    :param data_path: Path to the data folder.
+    :return: Dictionary with the Latin-English dictionary, the cache path and whether to use synonyms.
+    """
+
+    use_synonyms: bool = str(composition_config.get('use-synonyms', True)).lower() == 'true'
 
-    #composition setup
-    composition_config: dict = assignment_configs.get('composition', {})
+    if use_synonyms:
+        resolve_nltk_dependencies(composition_config.get('nltk-dependencies', ['wordnet', 'omw-1.4']), nltk_config, data_path)
 
-    composition_dict_paths: list[str] = composition_config.get('dictionary-paths', [])
-    cleaned_composition_dict_paths: list[str] = []
     composition_dict_files: list[str] = []
-    cleaned_composition_cache_path: str = file_manager.clean_path(composition_config.get('cache-path', None), data_path)
 
-    composition_use_synonyms: bool = composition_config.get('use-synonyms', True)
+    for path in composition_config.get('dictionary-paths', []):
+        composition_dict_files.extend(glob.glob(f'{file_manager.clean_path(path, data_path)}*.json'))
+
+    return {
+        'dictionary': parse(assignments.composition.generate_dictionary, composition_dict_files, str(composition_config.get('compact-lexicon', True)).lower() == 'true'),
+        'cache-path': file_manager.clean_path(composition_config.get('cache-path', None), data_path),
+        'use-synonyms': use_synonyms
+    }
+
+
+def load_timed_vocabulary_data(parse: mode_data.Parse, timed_vocabulary_config: dict, nltk_config: dict, data_path: str) -> dict:
+    """
+    Make sure the NLTK packages timed vocabulary depends on are there.
+
+    :param parse: Runs CPU bound parsing, see mode_data.ModeData.parse.
+    :param timed_vocabulary_config: The timed vocabulary assignment config.
+    :param nltk_config: The NLTK resource config.
+    :param data_path: Path to the data folder.
+    :return: Dictionary with whether NLTK works and the dictionary path.
+    """
+
+    resolve_nltk_dependencies(timed_vocabulary_config.get('nltk-dependencies', []), nltk_config, data_path)
+
+    return {
+        'nltk-working': True,
+        'dictionary-path': file_manager.clean_path(timed_vocabulary_config.get('dictionary-path', None), data_path)
+    }
 
-    for path in composition_dict_paths:
-        cleaned_composition_dict_paths.append(file_manager.clean_path(path, data_path))
-    
-    for path in cleaned_composition_dict_paths:
-        composition_dict_files.extend(glob.glob(f'{path}*.json'))
 
-    composition_dictionary: dict = assignments.composition.generate_dictionary(composition_dict_files)
+def sync_library(config: dict, data_path: str, registry: mode_data.ModeData) -> list[str]:
+    """
+    Sync the dictionary library with the library repo, then invalidate the mode data built from changed shards.
+
+    :param config: Dictionary containing the configuration settings.
+    :param data_path: Path to the data folder.
+    :param registry: The mode data registry.
+    :return: The shards that were updated or removed.
+    """
 
-    #timed-vocabulary setup
-    timed_vocabulary_config: dict = assignment_configs.get('timed-vocabulary', {})
+    updated: list[str] = library_sync.sync_from_config(config, data_path)
 
-    cleaned_timed_vocab_dict_path: str = file_manager.clean_path(timed_vocabulary_config.get('dictionary-path', None), data_path)
+    if len(updated) == 0:
+        return updated
 
-    nltk_dependencies: list[str] = timed_vocabulary_config.get('nltk-dependencies', [])
+    library_path: str = os.path.normpath(file_manager.clean_path(config.get('library-repo', {}).get('path', '[MINERVA-FOLDER]data(SUB)timed_vocabulary_dictionary(SUB)'), data_path))
+    composition_paths: list[str] = [os.path.normpath(file_manager.clean_path(path, data_path)) for path in config.get('assignment-configs', {}).get('composition', {}).get('dictionary-paths', [])]
 
-    for dependency in nltk_dependencies:
-        if dependency not in nltk_downloaded_dependencies:
-            try:
-                nltk.download(dependency)
-                nltk_downloaded_dependencies.append(dependency)
-            except:
-                nltk_working = False
-                print(f'Unable to download {dependency}, continuing...')
+    # Timed vocabulary reads shards as it goes, only the composition dictionary is an index built from them.
+    if library_path in composition_paths:
+        registry.invalidate(['composition'])
 
-    gui.control_window(webdriver, config, icon_path, modes, synopsis_conjugation_types, synopsis_charts, synopsis_blocks, noun_adj_chart, composition_dictionary, cleaned_composition_cache_path, composition_use_synonyms, nltk_working, cleaned_timed_vocab_dict_path)
+    return updated
+
+
+def create_mode_data(config: dict, data_path: str) -> mode_data.ModeData:
+    """
+    Create the registry loading each mode's data on demand.
+
+    :param config: Dictionary containing the configuration settings.
+    :param data_path: Path to the data folder.
+    :return: The mode data registry.
+    """
+
+    assignment_configs: dict = config.get('assignment-configs', {})
+    mode_data_config: dict = config.get('mode-data', {})
+
+    loaders: dict[str, mode_data.Loader] = {
+        'synopsis': functools.partial(load_synopsis_data, synopsis_config=assignment_configs.get('synopsis', {}), data_path=data_path),
+        'noun-adj': functools.partial(load_noun_adj_data, noun_adj_config=assignment_configs.get('noun-adj', {}), data_path=data_path),
+        'composition': functools.partial(load_composition_data, composition_config=assignment_configs.get('composition', {}), nltk_config=config.get('nltk', {}), data_path=data_path),
+        'timed vocabulary': functools.partial(load_timed_vocabulary_data, timed_vocabulary_config=assignment_configs.get('timed-vocabulary', {}), nltk_config=config.get('nltk', {}), data_path=data_path)
+    }
+
+    usage_path: str | None = mode_data_config.get('usage-path', '[MINERVA-FOLDER]mode-usage.json')
+
+    if usage_path is not None:
+        usage_path = file_manager.clean_path(usage_path, data_path)
+
+    return mode_data.ModeData(loaders, usage_path, int(mode_data_config.get('prefetch', 2)), float(mode_data_config.get('idle-timeout', 1800)), str(mode_data_config.get('process-pool', True)).lower() == 'true')
+
+
+def main(config: dict, data_path: str, credentials_path: str, icon_path: str, master_password: str) -> None:
+    """
+    Main function for the application.
+
+    Start-up runs as a graph (see startup): the browser launches on a thread while the login window is up, and the
+    control window opens as soon as the Latin site is. Mode data loads on first use (see mode_data), with the most
+    recently used modes prefetched in the background from the start.
+
+    :param config: Dictionary containing the configuration settings.
+    :param data_path: Path to the data folder.
+    :param credentials_path: Path to the credentials file.
+    :return: None
+    """
+
+    start_time: float = time.perf_counter()
+
+    file_manager.storage.coalesce_window = float(config.get('storage', {}).get('coalesce-window', 0.5))
+    file_manager.configure_serializers(config.get('serializers', {}))
+
+    graph: startup.StartupGraph = startup.StartupGraph(int(config.get('startup', {}).get('threads', 8)))
+    graph.start()
+
+    modes: list[str] = config.get('modes', [])
+    print(f'Available modes... {modes}')
+
+    registry: mode_data.ModeData = create_mode_data(config, data_path)
+    registry.start()
+
+    try:
+        # Nothing waits on the icon, a saved one is used while it's checked for updates.
+        graph.add('icon', download_icon, config, data_path, icon_path)
+
+        if str(config.get('library-repo', {}).get('sync-on-start', False)).lower() == 'true':
+            graph.add('library', sync_library, config, data_path, registry)
+
+        #browser setup
+        webdriver: selenium.webdriver.Remote | None = browser_daemon.attach(config, data_path)
+
+        startup_path: str | None = 'attached to a logged in browser'
+
+        if webdriver is not None and lthslatin_manager.on_site(webdriver, config.get('latin-url', None)):
+            print('Browser is already logged in, skipping login...')
+        else:
+            if webdriver is None:
+                graph.add('browser', start_browser, config, data_path)
+            else:
+                graph.add('browser', lambda: webdriver)
+
+            credentials: tuple[str, str, bytes] | None = unlock(config, credentials_path, icon_path if os.path.exists(icon_path) else None, master_password)
+
+            if credentials is None:
+                registry.stop()
+                graph.result('browser').quit()
+                return
+
+            username, password, key = credentials
+            site_session_path: str = file_manager.clean_path(config.get('lthslatin-session', {}).get('path', '[MINERVA-FOLDER]lthslatin.enc'), data_path)
+            site_dependencies: tuple[str] = ('browser',)
+
+            # Without a saved Latin site session Schoology is needed anyway, so log in while the browser launches.
+            if not os.path.exists(site_session_path):
+                graph.add('schoology', log_in, config, data_path, key, username, password)
+                site_dependencies = ('browser', 'schoology')
+
+            graph.add('site', open_latin_site, config, data_path, key, username, password, site_session_path, dependencies=site_dependencies)
+            username, password = None, None # Clear the username and password from memory
+
+            webdriver = graph.result('browser')
+            startup_path = graph.result('site')
+
+            if startup_path is None:
+                registry.stop()
+                webdriver.quit()
+                return
+
+        instrumentation_config: dict = config.get('driver-instrumentation', {})
+
+        if str(instrumentation_config.get('enabled', False)).lower() == 'true':
+            export_path: str | None = instrumentation_config.get('export-path', None)
+
+            if export_path is not None:
+                export_path = file_manager.clean_path(export_path, data_path)
+
+            instrumentation.instrument(webdriver, export_path, int(instrumentation_config.get('top-call-sites', 5)))
+            print('Instrumenting WebDriver commands...')
+
+        graph.report()
+    finally:
+        graph.shutdown()
+
+    print(f'Ready to solve in {time.perf_counter() - start_time:.2f} seconds ({startup_path})')
+
+    try:
+        gui.control_window(webdriver, config, icon_path if os.path.exists(icon_path) else None, modes, registry)
+    finally:
+        registry.stop()
 
 
 if __name__ == '__main__':
@@ -194,33 +468,11 @@ if __name__ == '__main__':
 
         shutil.copytree(default_path, data_path)
 
-        file_manager.save_json(config_path, new_config)
+        file_manager.save_json(config_path, new_config, 'config')
         config.update(new_config)
 
     if config is None:
         print('No default configuration file found, continuing with no configuration.')
         config = {}
 
-    if not os.path.exists(icon_path):
-        print('Downloading icon...')
-    else:
-        print('Checking for icon updates...')
-
-    icon_url: str | None = config.get('icon-url', None)
-
-    try:
-        if icon_url is None:
-            print('No icon URL provided, defaulting to preprogrammed icon.')
-            icon = requests.get(f'https://lthslatin.org/favicon.ico')
-        else:
-            icon = requests.get(icon_url)
-
-        with open(icon_path, 'wb') as file:
-            file.write(icon.content)
-        
-        print('Icon downloaded successfully!')
-    except requests.exceptions.ConnectionError:
-        print('Unable to download icon, continuing...')
-        
-
     main(config, data_path, credentials_path, icon_path, args.master_password)
\ No newline at end of file
@@ -0,0 +1,280 @@
+import time
+import threading
+import concurrent.futures
+from typing import Callable
+
+import startup
+import file_manager
+
+
+Parse = Callable[..., object]
+Loader = Callable[[Parse], dict]
+
+
+class ModeData:
+    """
+    Loads each mode's solver data on first request and frees it again once the mode goes unused.
+
+    Loaders are called with a parse function, which runs CPU bound parsing in a separate process so loading in the
+    background doesn't hold the GIL the GUI and the solver need. The parsing processes are started on first use, in
+    the same context as the start-up graph's, and reused until the registry stops. The most recently used modes are remembered between
+    sessions and prefetched on start, and data of modes unused for longer than the idle timeout is evicted.
+    """
+
+    def __init__(self, loaders: dict[str, Loader], usage_path: str | None = None, prefetch_count: int = 2, idle_timeout: float = 1800, use_processes: bool = True) -> None:
+        """
+        Create a mode data registry.
+
+        :param loaders: Dictionary mapping each mode to the function loading its data.
+        :param usage_path: JSON file the most recently used modes are kept in, if any.
+        :param prefetch_count: The number of recently used modes to prefetch on start.
+        :param idle_timeout: Seconds a mode can go unused before its data is evicted, never evicted if 0.
+        :param use_processes: Whether parse runs in a separate process, on the loading thread otherwise.
+        """
+
+        self.loaders: dict[str, Loader] = loaders
+        self.usage_path: str | None = usage_path
+        self.prefetch_count: int = prefetch_count
+        self.idle_timeout: float = idle_timeout
+        self.use_processes: bool = use_processes
+
+        self.entries: dict[str, concurrent.futures.Future] = {}
+        self.last_used: dict[str, float] = {}
+        self.lock: threading.Lock = threading.Lock()
+        self.executor: concurrent.futures.ThreadPoolExecutor = concurrent.futures.ThreadPoolExecutor(2, thread_name_prefix='mode-data')
+        self.process_pool: concurrent.futures.ProcessPoolExecutor | None = None
+        self.stop_event: threading.Event = threading.Event()
+        self.thread: threading.Thread | None = None
+
+        usage: dict | None = file_manager.read_json(usage_path) if usage_path is not None else None
+        self.recent: list[str] = [mode for mode in (usage or {}).get('recent', []) if mode in loaders]
+
+    def parse(self, function: Callable, *args) -> object:
+        """
+        Run CPU bound parsing, in a separate process if enabled.
+
+        :param function: The parsing function, it has to be importable for the process to run it.
+        :param args: The arguments to call it with.
+        :return: The function's result.
+        """
+
+        if not self.use_processes:
+            return function(*args)
+
+        with self.lock:
+            # One process per loading thread, so two modes still parse side by side.
+            if self.process_pool is None:
+                self.process_pool = concurrent.futures.ProcessPoolExecutor(2, mp_context=startup.process_context())
+
+            pool: concurrent.futures.ProcessPoolExecutor = self.process_pool
+
+        try:
+            return pool.submit(function, *args).result()
+        except concurrent.futures.BrokenExecutor as error:
+            print(f'Parsing process failed, parsing on this thread: {error}')
+
+            # A broken pool takes no more work, the next parse starts a new one.
+            with self.lock:
+                if self.process_pool is pool:
+                    self.process_pool = None
+
+            return function(*args)
+
+    def load(self, mode: str) -> dict:
+        """
+        Run a mode's loader.
+
+        :param mode: The mode to load.
+        :return: The mode's data.
+        """
+
+        start_time: float = time.perf_counter()
+        data: dict = self.loaders[mode](self.parse)
+
+        print(f'Loaded {mode} data in {time.perf_counter() - start_time:.2f} seconds')
+
+        return data
+
+    def request(self, mode: str) -> concurrent.futures.Future:
+        """
+        Start loading a mode's data if it isn't loaded or loading yet.
+
+        :param mode: The mode to load.
+        :return: The future of the mode's data.
+        """
+
+        if mode not in self.loaders:
+            raise KeyError(f'No data loader for {mode}')
+
+        with self.lock:
+            future: concurrent.futures.Future | None = self.entries.get(mode)
+
+            # Failed loads are retried on the next request.
+            if future is None or (future.done() and future.exception() is not None):
+                future = self.executor.submit(self.load, mode)
+                self.entries[mode] = future
+
+            self.last_used[mode] = time.time()
+
+        return future
+
+    def get(self, mode: str) -> dict:
+        """
+        Get a mode's data, waiting for it to load, and mark the mode as used.
+
+        :param mode: The mode to get the data of.
+        :return: The mode's data.
+        """
+
+        return self.wait(mode)
+
+    def wait(self, mode: str, cancel_token: threading.Event | None = None, poll_interval: float = 0.1) -> dict | None:
+        """
+        Wait for a mode's data to load, giving up once the cancellation token is set, and mark the mode as used.
+
+        :param mode: The mode to get the data of.
+        :param cancel_token: Event set when the wait should stop.
+        :param poll_interval: Seconds between checks of the cancellation token.
+        :return: The mode's data, or None if the wait was cancelled.
+        """
+
+        future: concurrent.futures.Future = self.request(mode)
+
+        while True:
+            try:
+                data: dict = future.result(timeout=poll_interval)
+                break
+            except concurrent.futures.TimeoutError:
+                if cancel_token is not None and cancel_token.is_set():
+                    return None
+
+        self.touch(mode)
+
+        return data
+
+    def prefetch(self, modes: list[str]) -> None:
+        """
+        Start loading data in the background.
+
+        :param modes: The modes to load.
+        :return: None
+        """
+
+        for mode in modes:
+            if mode in self.loaders:
+                self.request(mode)
+
+    def loaded(self, mode: str) -> bool:
+        """
+        Check if a mode's data is loaded.
+
+        :param mode: The mode to check.
+        :return: True if the data is ready, otherwise False.
+        """
+
+        future: concurrent.futures.Future | None = self.entries.get(mode)
+
+        return future is not None and future.done() and future.exception() is None
+
+    def invalidate(self, modes: list[str]) -> list[str]:
+        """
+        Drop modes' data so the next request loads it again, e.g. after the files it was built from changed.
+
+        :param modes: The modes to invalidate.
+        :return: The modes that had data loaded or loading.
+        """
+
+        invalidated: list[str] = []
+
+        with self.lock:
+            for mode in modes:
+                if self.entries.pop(mode, None) is not None:
+                    invalidated.append(mode)
+
+        for mode in invalidated:
+            print(f'Invalidated {mode} data')
+
+        return invalidated
+
+    def touch(self, mode: str) -> None:
+        """
+        Move a mode to the front of the recently used modes, saving them if they changed.
+
+        :param mode: The mode used.
+        :return: None
+        """
+
+        with self.lock:
+            self.last_used[mode] = time.time()
+
+            if len(self.recent) > 0 and self.recent[0] == mode:
+                return
+
+            self.recent = [mode] + [recent_mode for recent_mode in self.recent if recent_mode != mode]
+            recent: list[str] = list(self.recent)
+
+        if self.usage_path is not None:
+            file_manager.save_json(self.usage_path, {'recent': recent})
+
+    def evict_idle(self) -> list[str]:
+        """
+        Free the data of modes unused for longer than the idle timeout.
+
+        :return: The evicted modes.
+        """
+
+        if self.idle_timeout <= 0:
+            return []
+
+        evicted: list[str] = []
+        now: float = time.time()
+
+        with self.lock:
+            for mode, future in list(self.entries.items()):
+                if future.done() and now - self.last_used.get(mode, now) > self.idle_timeout:
+                    del self.entries[mode]
+                    evicted.append(mode)
+
+        for mode in evicted:
+            print(f'Evicted {mode} data after {self.idle_timeout:.0f} seconds unused')
+
+        return evicted
+
+    def maintain(self) -> None:
+        """
+        Prefetch the recently used modes, then evict idle data until stopped.
+
+        :return: None
+        """
+
+        self.prefetch(self.recent[:self.prefetch_count])
+
+        interval: float = min(max(self.idle_timeout / 4, 1), 60) if self.idle_timeout > 0 else 60
+
+        while not self.stop_event.wait(interval):
+            self.evict_idle()
+
+    def start(self) -> None:
+        """
+        Start prefetching and evicting in the background.
+
+        :return: None
+        """
+
+        self.thread = threading.Thread(target=self.maintain, name='mode-data', daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop the background thread, any loading that hasn't started and the parsing processes.
+
+        :return: None
+        """
+
+        self.stop_event.set()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+        with self.lock:
+            if self.process_pool is not None:
+                self.process_pool.shutdown(wait=False, cancel_futures=True)
+                self.process_pool = None
@@ -0,0 +1,158 @@
+import os
+import time
+import threading
+import argparse
+
+import lazy
+import file_manager
+
+
+nltk: lazy.LazyModule = lazy.lazy_import('nltk')
+
+# NLTK packages outside corpora, everything else is looked up as corpora/<package>.
+PACKAGE_CATEGORIES: dict[str, str] = {
+    'punkt': 'tokenizers',
+    'punkt_tab': 'tokenizers',
+    'averaged_perceptron_tagger': 'taggers',
+    'averaged_perceptron_tagger_eng': 'taggers',
+    'maxent_ne_chunker': 'chunkers',
+    'vader_lexicon': 'sentiment'
+}
+
+_manifest_lock: threading.Lock = threading.Lock()
+
+
+def resource_name(package: str) -> str:
+    """
+    Get the nltk.data resource name of a package.
+
+    :param package: The NLTK package (e.g. wordnet).
+    :return: The resource name (e.g. corpora/wordnet).
+    """
+
+    return f'{PACKAGE_CATEGORIES.get(package, "corpora")}/{package}'
+
+
+def find(package: str, download_dir: str | None = None) -> str | None:
+    """
+    Find an installed package in the nltk.data paths, unzipped or zipped, without touching the network.
+
+    :param package: The NLTK package.
+    :param download_dir: An extra folder packages are downloaded to.
+    :return: The package's path, or None if it isn't installed.
+    """
+
+    if download_dir is not None and download_dir not in nltk.data.path:
+        nltk.data.path.append(download_dir)
+
+    for name in (resource_name(package), f'{resource_name(package)}.zip'):
+        try:
+            return str(nltk.data.find(name))
+        except LookupError:
+            continue
+
+    return None
+
+
+def record(manifest_path: str | None, package: str, entry: dict) -> None:
+    """
+    Record a package's state in the manifest.
+
+    :param manifest_path: Path to the manifest, nothing is recorded if None.
+    :param package: The NLTK package.
+    :param entry: The package's state.
+    :return: None
+    """
+
+    if manifest_path is None:
+        return None
+
+    with _manifest_lock:
+        manifest: dict = file_manager.read_json(manifest_path) or {}
+
+        if manifest.get(package, {}).get('status') == entry.get('status') and manifest.get(package, {}).get('path') == entry.get('path'):
+            return None
+
+        manifest[package] = entry
+        file_manager.save_json(manifest_path, manifest)
+
+
+def download(package: str, download_dir: str | None = None) -> str | None:
+    """
+    Download a package.
+
+    :param package: The NLTK package.
+    :param download_dir: The folder to download to, NLTK's default if None.
+    :return: The package's path, or None if the download failed.
+    """
+
+    try:
+        if not nltk.download(package, download_dir=download_dir, quiet=True, raise_on_error=True):
+            return None
+    except Exception as error:
+        print(f'Unable to download {package}: {error}')
+        return None
+
+    return find(package, download_dir)
+
+
+def resolve(packages: list[str], manifest_path: str | None = None, offline: bool = False, download_dir: str | None = None) -> list[str]:
+    """
+    Make sure NLTK packages are installed, downloading only the missing ones.
+
+    Installed packages are found on disk without any network access, so this returns right away when nothing is
+    missing. Mode data loading calls it off the GUI thread, when timed vocabulary is first needed.
+
+    :param packages: The NLTK packages.
+    :param manifest_path: Path to the manifest recording where each package was found or why it's missing.
+    :param offline: Whether to never download, missing packages stay missing.
+    :param download_dir: The folder to download to, NLTK's default if None.
+    :return: The packages that are still missing.
+    """
+
+    missing: list[str] = []
+
+    for package in dict.fromkeys(packages):
+        path: str | None = find(package, download_dir)
+
+        if path is not None:
+            record(manifest_path, package, {'status': 'installed', 'path': path})
+            continue
+
+        if offline:
+            print(f'NLTK package {package} is missing, not downloading it offline')
+            record(manifest_path, package, {'status': 'missing', 'path': None, 'checked': int(time.time())})
+            missing.append(package)
+            continue
+
+        print(f'Downloading NLTK package {package}...')
+        path = download(package, download_dir)
+
+        if path is None:
+            record(manifest_path, package, {'status': 'failed', 'path': None, 'checked': int(time.time())})
+            missing.append(package)
+        else:
+            record(manifest_path, package, {'status': 'downloaded', 'path': path, 'downloaded': int(time.time())})
+
+    return missing
+
+
+if __name__ == '__main__':
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description='Checks for the NLTK packages minerva needs, downloading the missing ones')
+
+    parser.add_argument('packages', help='The NLTK packages, the timed vocabulary ones from the config by default', type=str, nargs='*')
+    parser.add_argument('-o', '--offline', help='Only check, never download', action='store_true')
+    parser.add_argument('-m', '--manifest', help='Path to the manifest', type=str)
+
+    args: argparse.Namespace = parser.parse_args()
+
+    packages: list[str] = args.packages
+
+    if len(packages) == 0:
+        config: dict = file_manager.read_json(f'.{os.sep}default{os.sep}config.json') or {}
+        packages = config.get('assignment-configs', {}).get('timed-vocabulary', {}).get('nltk-dependencies', [])
+
+    start_time: float = time.perf_counter()
+    missing: list[str] = resolve(packages, args.manifest, args.offline)
+
+    print(f'Resolved {len(packages) - len(missing)} of {len(packages)} packages in {(time.perf_counter() - start_time) * 1000:.0f} ms, missing: {missing}')
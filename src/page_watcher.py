@@ -0,0 +1,68 @@
+import threading
+import PySimpleGUI as sg
+import selenium.webdriver
+
+import lthslatin_manager
+
+
+class PageWatcher(threading.Thread):
+    """
+    Long-polls the browser's page-change agent and forwards changes to the control window.
+
+    Each poll holds the driver lock, since the browser won't run other commands while the async script is pending.
+    Anything else using the driver should take the same lock, waiting at most one poll timeout.
+    """
+
+    def __init__(self, webdriver: selenium.webdriver, window: sg.Window, driver_lock: threading.Lock, timeout: float = 2) -> None:
+        """
+        Create the watcher.
+
+        :param webdriver: The Selenium WebDriver object.
+        :param window: The window to send '-PAGE-' events to.
+        :param driver_lock: Lock guarding the WebDriver.
+        :param timeout: Seconds each long-poll waits before returning empty.
+        """
+
+        super().__init__(name='minerva-page-watcher', daemon=True)
+
+        self.webdriver: selenium.webdriver = webdriver
+        self.window: sg.Window = window
+        self.driver_lock: threading.Lock = driver_lock
+        self.timeout: float = timeout
+        self.stopped: threading.Event = threading.Event()
+        self.polls: int = 0
+
+    def run(self) -> None:
+        """
+        Poll until stopped, sending the newest probe (or None after an interrupted wait) to the window.
+
+        :return: None
+        """
+
+        with self.driver_lock:
+            lthslatin_manager.install_agent(self.webdriver, self.timeout)
+
+        while not self.stopped.is_set():
+            with self.driver_lock:
+                events: list[dict] | None = lthslatin_manager.wait_for_page_events(self.webdriver, self.timeout)
+                self.polls += 1
+
+            if self.stopped.is_set():
+                break
+
+            if events is None:
+                self.window.write_event_value('-PAGE-', None)
+                self.stopped.wait(0.5)
+            elif len(events) != 0:
+                self.window.write_event_value('-PAGE-', events[-1])
+
+            self.stopped.wait(0.01) # let waiting solvers take the driver lock
+
+    def stop(self) -> None:
+        """
+        Ask the watcher to stop after its current poll.
+
+        :return: None
+        """
+
+        self.stopped.set()
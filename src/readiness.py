@@ -0,0 +1,219 @@
+import time
+import threading
+import selenium.webdriver
+from typing import Callable
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webelement import WebElement
+from selenium.webdriver.support import expected_conditions as EC
+
+import driver
+
+
+PAGE_ACTIVE_SCRIPT: str = """
+const page = document.querySelector('.ui-page-active');
+return page !== null && document.readyState !== 'loading' && !document.documentElement.classList.contains('ui-mobile-viewport-transitioning');
+"""
+
+FRAME_LOCATION_SCRIPT: str = """
+return document.readyState === 'complete' ? location.href : '';
+"""
+
+TEXT_SCRIPT: str = """
+const element = document.querySelector(arguments[0]);
+return element ? element.innerText.split('\\n')[0].trim() : '';
+"""
+
+
+class Condition:
+    """
+    A named page condition with its own timeout and polling interval.
+
+    Conditions are called with the driver like Selenium's expected conditions and are met once they return something
+    truthy. They can be waited on directly with wait, or yielded from resumable solvers (see steps).
+    """
+
+    __slots__ = ('name', 'check', 'timeout', 'poll_frequency', 'log')
+
+    def __init__(self, name: str, check: Callable[[selenium.webdriver], object], timeout: float = 30, poll_frequency: float = 0.1, log: bool = True) -> None:
+        """
+        Create a condition.
+
+        :param name: The name used when logging waits.
+        :param check: Callable taking the driver, met once it returns something truthy.
+        :param timeout: Seconds to wait before giving up.
+        :param poll_frequency: Seconds between checks.
+        :param log: Whether to print every wait, frequent conditions are only counted (see report).
+        """
+
+        self.name: str = name
+        self.check: Callable[[selenium.webdriver], object] = check
+        self.timeout: float = timeout
+        self.poll_frequency: float = poll_frequency
+        self.log: bool = log
+
+    def __call__(self, webdriver: selenium.webdriver) -> object:
+        return self.check(webdriver)
+
+
+stats: dict = {}
+_stats_lock: threading.Lock = threading.Lock()
+
+
+def record(condition: Condition, elapsed: float, ready: bool) -> None:
+    """
+    Record how long a wait took.
+
+    :param condition: The condition waited on.
+    :param elapsed: Seconds the wait took.
+    :param ready: Whether the condition was met, False if it timed out.
+    :return: None
+    """
+
+    with _stats_lock:
+        count, total, longest, timeouts = stats.get(condition.name, (0, 0.0, 0.0, 0))
+        stats[condition.name] = (count + 1, total + elapsed, max(longest, elapsed), timeouts + int(not ready))
+
+    if condition.log:
+        if ready:
+            print(f'{condition.name} after {elapsed * 1000:.0f} ms')
+        else:
+            print(f'{condition.name} timed out after {elapsed * 1000:.0f} ms')
+
+
+def report(name: str | None = None) -> None:
+    """
+    Print the recorded waits.
+
+    :param name: The condition to report, every condition if None.
+    :return: None
+    """
+
+    with _stats_lock:
+        items: list[tuple[str, tuple]] = sorted(stats.items()) if name is None else [(name, stats[name])] if name in stats else []
+
+    for condition_name, (count, total, longest, timeouts) in items:
+        print(f'{condition_name}: {count} waits, {total / count * 1000:.0f} ms average, {longest * 1000:.0f} ms longest, {timeouts} timed out')
+
+
+def wait(webdriver: selenium.webdriver, condition: Condition) -> object | None:
+    """
+    Wait for a condition, logging how long it took.
+
+    :param webdriver: The Selenium WebDriver object.
+    :param condition: The condition to wait for.
+    :return: The condition's result, or None if it timed out.
+    """
+
+    start_time: float = time.perf_counter()
+    result: object | None = driver.wait_until(webdriver, condition, condition.timeout, condition.poll_frequency)
+
+    record(condition, time.perf_counter() - start_time, result is not None)
+
+    return result
+
+
+def lti_handoff_complete(latin_url: str, timeout: float = 15) -> Condition:
+    """
+    Met once the Schoology LTI launch has reached the Latin site, either in the page itself or in one of its frames.
+
+    :param latin_url: The Latin site's URL.
+    :param timeout: Seconds to wait before giving up.
+    :return: The condition.
+    """
+
+    def check(webdriver: selenium.webdriver) -> bool:
+        if str(webdriver.current_url).startswith(latin_url):
+            return True
+
+        if webdriver.execute_script('return document.readyState;') != 'complete':
+            return False
+
+        for frame in webdriver.find_elements(By.TAG_NAME, 'iframe'):
+            try:
+                webdriver.switch_to.frame(frame)
+                location: str = str(webdriver.execute_script(FRAME_LOCATION_SCRIPT))
+            finally:
+                webdriver.switch_to.default_content()
+
+            if location.startswith(latin_url):
+                return True
+
+        return False
+
+    return Condition('LTI handoff complete', check, timeout, 0.25)
+
+
+def page_active(timeout: float = 30) -> Condition:
+    """
+    Met once a jQuery Mobile page of the Latin site is active and not mid-transition.
+
+    :param timeout: Seconds to wait before giving up.
+    :return: The condition.
+    """
+
+    return Condition('lthslatin page active', lambda webdriver: webdriver.execute_script(PAGE_ACTIVE_SCRIPT), timeout, 0.1)
+
+
+def element_clickable(by: str, value: str, timeout: float = 30, log: bool = True) -> Condition:
+    """
+    Met once an element is visible and enabled, returning the element.
+
+    :param by: The type of locator (e.g., By.XPATH, By.ID).
+    :param value: The value of the locator.
+    :param timeout: Seconds to wait before giving up.
+    :param log: Whether to print every wait.
+    :return: The condition.
+    """
+
+    return Condition(f'{value} clickable', EC.element_to_be_clickable((by, value)), timeout, 0.1, log)
+
+
+def score_rendered(selector: str, previous_score: str | None = None, contains: tuple[str] = (), timeout: float = 30, log: bool = True) -> Condition:
+    """
+    Met once a score line shows a new score, returning its first line.
+
+    :param selector: CSS selector of the score element.
+    :param previous_score: The score line shown before submitting, ignored if None.
+    :param contains: Texts the new score line has to contain.
+    :param timeout: Seconds to wait before giving up.
+    :param log: Whether to print every wait.
+    :return: The condition.
+    """
+
+    def check(webdriver: selenium.webdriver) -> str | bool:
+        score: str = str(webdriver.execute_script(TEXT_SCRIPT, selector) or '')
+
+        if score == '' or score == previous_score:
+            return False
+
+        if not all(text in score for text in contains):
+            return False
+
+        return score
+
+    return Condition('score rendered', check, timeout, 0.1, log)
+
+
+def input_regraded(element: WebElement, timeout: float = 30) -> Condition:
+    """
+    Met once an answer input has been graded: a single line of text that stayed the same between two checks.
+
+    :param element: The input element.
+    :param timeout: Seconds to wait before giving up.
+    :return: The condition.
+    """
+
+    last_html: list[str | None] = [None]
+
+    def check(webdriver: selenium.webdriver) -> bool:
+        if len(str(element.text).split('\n')) != 1:
+            last_html[0] = None
+            return False
+
+        html: str = str(element.get_attribute('innerHTML'))
+        stable: bool = html == last_html[0]
+        last_html[0] = html
+
+        return stable
+
+    return Condition('input re-graded', check, timeout, 0.025, False)
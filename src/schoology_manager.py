@@ -1,21 +1,51 @@
+import os
+import json
+import time
 import requests
+import cryptography.fernet
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+import login_manager
 
-def login(url: str, username: str, password: str) -> requests.Session:
+
+def create_session(retries: int = 3, backoff: float = 0.5, pool_size: int = 10) -> requests.Session:
+    """
+    Create a session with pooled connections that retries transient errors with backoff.
+
+    :param retries: The number of retries for failed connections and 429/5xx responses.
+    :param backoff: The backoff factor between retries in seconds.
+    :param pool_size: The number of connections kept per host.
+    :return: The session.
+    """
+
+    retry: Retry = Retry(total=retries, backoff_factor=backoff, status_forcelist=(429, 500, 502, 503, 504), allowed_methods=frozenset({'GET', 'HEAD'}), raise_on_status=False)
+    adapter: HTTPAdapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+    session: requests.Session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+    return session
+
+
+def login(url: str, username: str, password: str, session: requests.Session | None = None) -> requests.Session:
     """
     Log in to Schoology using requests.
 
     :param url: The login page URL.
     :param username: The username for login.
     :param password: The password for login.
+    :param session: The session to log in with, a new pooled session if None.
     :return: A requests.Session object that is logged in.
     """
 
     if url is None:
         url = 'https://laketravis.schoology.com/'
 
-    session: requests.Session = requests.Session()
+    if session is None:
+        session = create_session()
     
     response: requests.Response = session.get(url)
     redirect_url: str = response.url
@@ -72,4 +102,126 @@ def find_latin_courses(courses: list[dict]) -> list[dict]:
         if 'latin' in course.get('section_title').lower():
             latin_courses.append(course)
     
-    return latin_courses
\ No newline at end of file
+    return latin_courses
+
+
+def validate_session(session: requests.Session, url: str, timeout: float = 5) -> bool:
+    """
+    Check if a session is still logged in with one cheap request, logged out sessions get redirected to the login page.
+
+    :param session: The session to check.
+    :param url: The base URL for Schoology.
+    :param timeout: Seconds to wait for Schoology to answer.
+    :return: True if the session is logged in, otherwise False.
+    """
+
+    try:
+        response: requests.Response = session.get(f'{url}home', allow_redirects=False, timeout=timeout)
+    except requests.exceptions.RequestException:
+        return False
+
+    return response.status_code == 200
+
+
+def save_session(session: requests.Session, key: bytes, file_path: str, sections: list[dict] | None = None, sections_time: float | None = None) -> None:
+    """
+    Save a session's cookies and the Latin course sections, encrypted.
+
+    :param session: The logged in session.
+    :param key: Key to use for encryption.
+    :param file_path: Path to save the session to.
+    :param sections: The Latin course sections.
+    :param sections_time: When the sections were fetched, now if None.
+    :return: None
+    """
+
+    cookies: list[dict] = [{
+        'name': cookie.name,
+        'value': cookie.value,
+        'domain': cookie.domain,
+        'path': cookie.path,
+        'expires': cookie.expires,
+        'secure': cookie.secure
+    } for cookie in session.cookies]
+
+    data: dict = {
+        'cookies': cookies,
+        'sections': sections,
+        'sections-time': sections_time if sections_time is not None else time.time()
+    }
+
+    if os.path.dirname(file_path) != '' and not os.path.exists(os.path.dirname(file_path)):
+        os.makedirs(os.path.dirname(file_path))
+
+    with open(file_path, 'wb') as file:
+        file.write(login_manager.encrypt_data(json.dumps(data), key))
+
+
+def load_session(key: bytes, file_path: str, session: requests.Session | None = None) -> tuple[requests.Session, dict] | None:
+    """
+    Load a saved session.
+
+    :param key: Key to use for decryption.
+    :param file_path: Path the session was saved to.
+    :param session: The session to load the cookies into, a new pooled session if None.
+    :return: Tuple of the session and the saved data, or None if there is no readable saved session.
+    """
+
+    if not os.path.exists(file_path):
+        return None
+
+    try:
+        with open(file_path, 'rb') as file:
+            data: dict = json.loads(login_manager.decrypt_data(file.read(), key))
+    except (cryptography.fernet.InvalidToken, ValueError):
+        return None
+
+    if session is None:
+        session = create_session()
+
+    for cookie in data.get('cookies', []):
+        session.cookies.set(cookie['name'], cookie['value'], domain=cookie.get('domain'), path=cookie.get('path', '/'), expires=cookie.get('expires'), secure=cookie.get('secure', False))
+
+    return session, data
+
+
+def open_session(config: dict, key: bytes, username: str, password: str, session_path: str) -> tuple[requests.Session, list[dict]]:
+    """
+    Reuse the saved Schoology session if it's still logged in, otherwise log in again, and get the Latin course sections.
+
+    :param config: Dictionary containing the configuration settings.
+    :param key: Key the saved session is encrypted with.
+    :param username: The username for login.
+    :param password: The password for login.
+    :param session_path: Path of the saved session.
+    :return: Tuple of the logged in session and the Latin course sections.
+    """
+
+    url: str = config.get('schoology-url', None)
+    session_config: dict = config.get('schoology-session', {})
+    course_ttl: float = float(session_config.get('course-ttl', 86400))
+    timeout: float = float(session_config.get('validation-timeout', 5))
+    session: requests.Session = create_session(int(session_config.get('retries', 3)), float(session_config.get('backoff', 0.5)))
+
+    saved: tuple[requests.Session, dict] | None = load_session(key, session_path, session)
+    sections: list[dict] | None = None
+    sections_time: float | None = None
+
+    if saved is not None and validate_session(session, url, timeout):
+        print('Reusing saved Schoology session...')
+        data: dict = saved[1]
+
+        if data.get('sections') is not None and time.time() - data.get('sections-time', 0) < course_ttl:
+            sections, sections_time = data['sections'], data['sections-time']
+    else:
+        print('Logging in...')
+        session.cookies.clear()
+        login(url, username, password, session)
+
+    if sections is None:
+        print('Checking for Latin courses...')
+        sections = find_latin_courses(get_courses(session, url))
+
+    save_session(session, key, session_path, sections if len(sections) > 0 else None, sections_time)
+
+    return session, sections
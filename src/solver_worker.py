@@ -0,0 +1,153 @@
+import queue
+import threading
+import PySimpleGUI as sg
+from typing import Callable
+
+
+class SolverWorker(threading.Thread):
+    """
+    Runs solvers off the GUI thread, one job at a time.
+
+    Jobs are keyed (usually by mode and assignment) and a key that is already queued or running is not queued again,
+    so continuous mode can queue the next detected assignment without re-entering a solver. A job's preparation (e.g.
+    loading its mode data) runs before the WebDriver lock is taken, so the page watcher keeps going and Stop can cancel
+    it. Events sent to the window:
+    '-SOLVE-START-' (key), '-SOLVE-PROGRESS-' ((key, message)), '-SOLVE-DONE-' (key) and '-SOLVE-ERROR-' ((key, error)).
+    """
+
+    def __init__(self, window: sg.Window, driver_lock: threading.Lock) -> None:
+        """
+        Create the worker.
+
+        :param window: The window to send solver events to.
+        :param driver_lock: Lock held while a solver uses the WebDriver.
+        """
+
+        super().__init__(name='minerva-solver', daemon=True)
+
+        self.window: sg.Window = window
+        self.driver_lock: threading.Lock = driver_lock
+        self.jobs: queue.Queue = queue.Queue()
+        self.pending: set = set()
+        self.pending_lock: threading.Lock = threading.Lock()
+        self.cancel_token: threading.Event = threading.Event()
+        self.generation: int = 0
+        self.stopped: threading.Event = threading.Event()
+
+    def submit(self, key: tuple, job: Callable[[threading.Event, Callable[[str], None]], None], prepare: Callable[[threading.Event, Callable[[str], None]], None] | None = None) -> bool:
+        """
+        Queue a job unless one with the same key is already queued or running.
+
+        :param key: The job key.
+        :param job: Callable taking a cancellation token and a progress callback, run holding the WebDriver lock.
+        :param prepare: Callable taking the same, run before the job without the WebDriver lock.
+        :return: True if the job was queued, otherwise False.
+        """
+
+        with self.pending_lock:
+            if key in self.pending:
+                return False
+
+            self.pending.add(key)
+            self.jobs.put((key, job, prepare, self.generation))
+
+        return True
+
+    def busy(self) -> bool:
+        """
+        Check if any job is queued or running.
+
+        :return: True if the worker has work, otherwise False.
+        """
+
+        with self.pending_lock:
+            return len(self.pending) != 0
+
+    def cancel(self) -> None:
+        """
+        Cancel the running job and drop every queued one.
+
+        Queued jobs are dropped by bumping the generation, so a job taken off the queue at the same moment is skipped
+        rather than started with a fresh token.
+
+        :return: None
+        """
+
+        with self.pending_lock:
+            self.generation += 1
+            self.cancel_token.set()
+
+    def stop(self) -> None:
+        """
+        Cancel everything and stop the worker.
+
+        :return: None
+        """
+
+        self.stopped.set()
+        self.cancel()
+        self.jobs.put(None)
+
+    def send(self, event: str, value: object) -> None:
+        """
+        Send an event to the window, ignoring windows that have already closed.
+
+        :param event: The event key.
+        :param value: The event value.
+        :return: None
+        """
+
+        if self.stopped.is_set():
+            return None
+
+        try:
+            self.window.write_event_value(event, value)
+        except Exception:
+            pass
+
+    def run(self) -> None:
+        """
+        Run jobs until stopped.
+
+        :return: None
+        """
+
+        while not self.stopped.is_set():
+            job: tuple | None = self.jobs.get()
+
+            if job is None:
+                break
+
+            key, function, prepare, generation = job
+
+            with self.pending_lock:
+                if generation != self.generation:
+                    self.pending.discard(key)
+                    continue
+
+                cancel_token: threading.Event = threading.Event()
+                self.cancel_token = cancel_token
+
+            error: Exception | None = None
+
+            self.send('-SOLVE-START-', key)
+
+            progress: Callable[[str], None] = lambda message: self.send('-SOLVE-PROGRESS-', (key, message))
+
+            try:
+                if prepare is not None:
+                    prepare(cancel_token, progress)
+
+                if not cancel_token.is_set():
+                    with self.driver_lock:
+                        function(cancel_token, progress)
+            except Exception as exception:
+                error = exception
+            finally:
+                with self.pending_lock:
+                    self.pending.discard(key)
+
+            if error is None:
+                self.send('-SOLVE-DONE-', key)
+            else:
+                self.send('-SOLVE-ERROR-', (key, str(error)))
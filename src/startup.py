@@ -0,0 +1,220 @@
+import time
+import threading
+import multiprocessing
+import concurrent.futures
+import multiprocessing.context
+from typing import Callable
+
+
+def process_context() -> multiprocessing.context.BaseContext:
+    """
+    Get the context parsing processes start in.
+
+    Forking copies a process that's already running threads (Tk, the page watcher, the pools), and a lock held by one
+    of them stays held in the child. A forkserver forks from its own clean single threaded process, spawn starts a
+    fresh interpreter where there's no forkserver (Windows, macOS).
+
+    :return: The forkserver context if available, otherwise the spawn context.
+    """
+
+    return multiprocessing.get_context('forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn')
+
+
+class Task:
+    """
+    A start-up step, run once all of its dependencies have finished.
+    """
+
+    __slots__ = ('name', 'function', 'args', 'dependencies', 'future', 'start', 'end')
+
+    def __init__(self, name: str, function: Callable, args: tuple, dependencies: tuple[str]) -> None:
+        """
+        Create a task.
+
+        :param name: The task's name.
+        :param function: The function to run, called with args followed by the results of its dependencies.
+        :param args: The arguments to call the function with.
+        :param dependencies: The names of the tasks that have to finish first.
+        """
+
+        self.name: str = name
+        self.function: Callable = function
+        self.args: tuple = args
+        self.dependencies: tuple[str] = dependencies
+        self.future: concurrent.futures.Future = concurrent.futures.Future()
+        self.start: float | None = None
+        self.end: float | None = None
+
+
+def timed_call(function: Callable, args: tuple) -> tuple[object, float, float]:
+    """
+    Call a function, timing it where it runs.
+
+    :param function: The function to call.
+    :param args: The arguments to call it with.
+    :return: Tuple of the result and the start and end times.
+    """
+
+    start_time: float = time.time()
+    result: object = function(*args)
+
+    return result, start_time, time.time()
+
+
+class StartupGraph:
+    """
+    Runs start-up steps as a dependency graph.
+
+    The steps are I/O bound (HTTP, launching the driver, NLTK checks) and run on a thread pool, each starting as soon as
+    the steps it depends on have finished. Results are joined only where they are needed, through result. CPU bound
+    parsing isn't a step, it runs in the mode data's parsing processes when a mode is loaded.
+    """
+
+    def __init__(self, threads: int = 8) -> None:
+        """
+        Create a start-up graph.
+
+        :param threads: The number of threads for the steps.
+        """
+
+        self.tasks: dict[str, Task] = {}
+        self.lock: threading.Lock = threading.Lock()
+        self.started: float | None = None
+        self.thread_pool: concurrent.futures.ThreadPoolExecutor = concurrent.futures.ThreadPoolExecutor(threads, thread_name_prefix='startup')
+
+    def add(self, name: str, function: Callable, *args, dependencies: tuple[str] = ()) -> concurrent.futures.Future:
+        """
+        Add a step to the graph.
+
+        :param name: The step's name.
+        :param function: The function to run, called with args followed by the results of its dependencies.
+        :param args: The arguments to call the function with.
+        :param dependencies: The names of the steps that have to finish first, they have to be added before.
+        :return: The step's future.
+        """
+
+        for dependency in dependencies:
+            if dependency not in self.tasks:
+                raise ValueError(f'Unknown dependency {dependency} of {name}')
+
+        task: Task = Task(name, function, args, tuple(dependencies))
+        self.tasks[name] = task
+
+        if self.started is not None:
+            self.schedule(task)
+
+        return task.future
+
+    def start(self) -> None:
+        """
+        Start every step whose dependencies are met.
+
+        :return: None
+        """
+
+        self.started = time.time()
+
+        for task in list(self.tasks.values()):
+            self.schedule(task)
+
+    def schedule(self, task: Task) -> None:
+        """
+        Submit a step once its dependencies have finished, failing it if one of them failed.
+
+        :param task: The step to submit.
+        :return: None
+        """
+
+        with self.lock:
+            if task.start is not None or task.future.done():
+                return
+
+            dependencies: list[Task] = [self.tasks[dependency] for dependency in task.dependencies]
+
+            if not all(dependency.future.done() for dependency in dependencies):
+                return
+
+            task.start = time.time()
+
+        for dependency in dependencies:
+            if dependency.future.exception() is not None:
+                task.end = time.time()
+                task.future.set_exception(dependency.future.exception())
+                self.finished(task)
+                return
+
+        args: tuple = task.args + tuple(dependency.future.result() for dependency in dependencies)
+
+        try:
+            future: concurrent.futures.Future = self.thread_pool.submit(timed_call, task.function, args)
+        except Exception as error:
+            task.end = time.time()
+            task.future.set_exception(error)
+            self.finished(task)
+            return
+
+        future.add_done_callback(lambda done, task=task: self.complete(task, done))
+
+    def complete(self, task: Task, future: concurrent.futures.Future) -> None:
+        """
+        Pass a finished step's result on to its future and start the steps waiting on it.
+
+        :param task: The finished step.
+        :param future: The executor's future for the step.
+        :return: None
+        """
+
+        if future.exception() is not None:
+            task.end = time.time()
+            task.future.set_exception(future.exception())
+        else:
+            result, task.start, task.end = future.result()
+            task.future.set_result(result)
+
+        self.finished(task)
+
+    def finished(self, task: Task) -> None:
+        """
+        Start the steps depending on a finished step.
+
+        :param task: The finished step.
+        :return: None
+        """
+
+        for waiting in list(self.tasks.values()):
+            if task.name in waiting.dependencies:
+                self.schedule(waiting)
+
+    def result(self, name: str) -> object:
+        """
+        Wait for a step and get its result.
+
+        :param name: The step's name.
+        :return: The step's result, raising its exception if it failed.
+        """
+
+        return self.tasks[name].future.result()
+
+    def report(self) -> None:
+        """
+        Print when each finished step ran relative to the start of the graph.
+
+        :return: None
+        """
+
+        finished: list[Task] = sorted((task for task in self.tasks.values() if task.end is not None), key=lambda task: task.start)
+
+        print('Start-up breakdown:')
+
+        for task in finished:
+            status: str = 'failed' if task.future.exception() is not None else 'ok'
+            print(f'    {task.name:<24} {(task.start - self.started) * 1000:>7.0f} ms -> {(task.end - self.started) * 1000:>7.0f} ms ({(task.end - task.start) * 1000:.0f} ms, {status})')
+
+    def shutdown(self) -> None:
+        """
+        Let running steps finish in the background.
+
+        :return: None
+        """
+
+        self.thread_pool.shutdown(wait=False)
@@ -0,0 +1,81 @@
+import time
+import threading
+import selenium.webdriver
+from typing import Callable, Generator
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
+
+import readiness
+
+
+# A resumable solver is a generator yielding conditions. Each condition is called with the driver (while its tab is
+# active) until it returns something truthy, which is sent back into the generator, or None if it timed out.
+# readiness.Condition objects bring their own timeout and polling interval and have their waits recorded.
+Condition = Callable[[selenium.webdriver], object]
+Steps = Generator[Condition, object, object]
+
+IGNORED_EXCEPTIONS: tuple = (NoSuchElementException, StaleElementReferenceException)
+
+
+def check(driver: selenium.webdriver, condition: Condition) -> object:
+    """
+    Check a condition once, treating missing or stale elements as not ready yet.
+
+    :param driver: The Selenium WebDriver object.
+    :param condition: The condition to check.
+    :return: The condition's result, or False if an element wasn't there.
+    """
+
+    try:
+        return condition(driver)
+    except IGNORED_EXCEPTIONS:
+        return False
+
+
+def from_call(function: Callable, *args, **kwargs) -> Steps:
+    """
+    Wrap a solver that never waits on the site as a single step.
+
+    :param function: The solver to call.
+    :return: Steps returning the solver's result.
+    """
+
+    return function(*args, **kwargs)
+    yield
+
+
+def run(driver: selenium.webdriver, solver_steps: Steps, timeout: float = 30, poll_frequency: float = 0.05, cancel_token: threading.Event | None = None) -> object:
+    """
+    Run steps to completion in the current tab, blocking on each condition.
+
+    :param driver: The Selenium WebDriver object.
+    :param solver_steps: The steps to run.
+    :param timeout: Seconds to wait for conditions without their own timeout.
+    :param poll_frequency: Seconds between checks of conditions without their own polling interval.
+    :param cancel_token: Event that stops the steps at their next wait once it's set.
+    :return: The value returned by the steps, or None if they were cancelled.
+    """
+
+    def cancelled() -> bool:
+        return cancel_token is not None and cancel_token.is_set()
+
+    result: object = None
+
+    try:
+        while True:
+            condition: Condition = solver_steps.send(result)
+            start_time: float = time.perf_counter()
+
+            try:
+                result = WebDriverWait(driver, getattr(condition, 'timeout', timeout), poll_frequency=getattr(condition, 'poll_frequency', poll_frequency), ignored_exceptions=IGNORED_EXCEPTIONS).until(lambda driver: cancelled() or condition(driver))
+            except TimeoutException:
+                result = None
+
+            if cancelled():
+                solver_steps.close()
+                return None
+
+            if isinstance(condition, readiness.Condition):
+                readiness.record(condition, time.perf_counter() - start_time, result is not None)
+    except StopIteration as stop:
+        return stop.value
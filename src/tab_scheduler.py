@@ -0,0 +1,230 @@
+import time
+import threading
+import selenium.webdriver
+from typing import Callable
+from selenium.common.exceptions import NoSuchWindowException
+
+import steps
+import readiness
+
+
+class TabTask:
+    """
+    The solver state of one browser tab.
+    """
+
+    def __init__(self, handle: str) -> None:
+        """
+        Create a task for a tab.
+
+        :param handle: The tab's window handle.
+        """
+
+        self.handle: str = handle
+        self.steps: steps.Steps | None = None
+        self.condition: steps.Condition | None = None
+        self.waiting_since: float = 0
+        self.deadline: float = 0
+        self.results: list = []
+
+
+class TabScheduler:
+    """
+    Interleaves resumable solvers across the tabs of one WebDriver.
+
+    Every tab runs its own steps. Whenever a tab is waiting on the site (a grade, a reload, a score page) the scheduler
+    moves on and checks the other tabs, so the time spent waiting on one assignment is used to work on the others.
+    """
+
+    def __init__(self, webdriver: selenium.webdriver, factory: Callable[[selenium.webdriver], steps.Steps | None], timeout: float = 30, poll_interval: float = 0.05) -> None:
+        """
+        Create the scheduler.
+
+        :param webdriver: The Selenium WebDriver object.
+        :param factory: Called with the driver while a tab is active, returns the steps to solve it or None if it can't.
+        :param timeout: Seconds a tab may wait on a condition without its own timeout before it's resumed with None.
+        :param poll_interval: Seconds to sleep when no tab is ready.
+        """
+
+        self.webdriver: selenium.webdriver = webdriver
+        self.factory: Callable[[selenium.webdriver], steps.Steps | None] = factory
+        self.timeout: float = timeout
+        self.poll_interval: float = poll_interval
+        self.tasks: list[TabTask] = []
+        self.current_handle: str | None = None
+
+    def open(self, url: str) -> str:
+        """
+        Open a URL in a new tab and schedule it.
+
+        :param url: The URL to open.
+        :return: The new tab's window handle.
+        """
+
+        self.webdriver.switch_to.new_window('tab')
+        self.webdriver.get(url)
+
+        self.current_handle = self.webdriver.current_window_handle
+        self.tasks.append(TabTask(self.current_handle))
+
+        return self.current_handle
+
+    def open_all(self, urls: list[str]) -> int:
+        """
+        Open every URL that isn't open in a tab yet and schedule the new tabs, then return to the tab that was active.
+
+        :param urls: The assignment URLs to open.
+        :return: The number of tabs opened.
+        """
+
+        start_handle: str = self.webdriver.current_window_handle
+        self.current_handle = start_handle
+        open_urls: set[str] = set()
+
+        if len(urls) != 0:
+            for handle in self.webdriver.window_handles:
+                self.switch(handle)
+                open_urls.add(self.webdriver.current_url)
+
+        opened: int = 0
+
+        for url in urls:
+            if url not in open_urls:
+                self.open(url)
+                open_urls.add(url)
+                opened += 1
+
+        self.switch(start_handle)
+
+        return opened
+
+    def adopt_all(self) -> int:
+        """
+        Schedule every tab that is already open.
+
+        :return: The number of tabs added.
+        """
+
+        scheduled: set[str] = {task.handle for task in self.tasks}
+        added: int = 0
+
+        for handle in self.webdriver.window_handles:
+            if handle not in scheduled:
+                self.tasks.append(TabTask(handle))
+                added += 1
+
+        return added
+
+    def switch(self, handle: str) -> None:
+        """
+        Make a tab active, skipping the round trip if it already is.
+
+        :param handle: The tab's window handle.
+        :return: None
+        """
+
+        if handle != self.current_handle:
+            self.webdriver.switch_to.window(handle)
+            self.current_handle = handle
+
+    def advance(self, task: TabTask, result: object, repeat: bool) -> bool:
+        """
+        Resume a tab's steps until they wait on the site again.
+
+        :param task: The tab's task.
+        :param result: The value of the condition the steps were waiting on.
+        :param repeat: Whether to start new steps once these finish.
+        :return: False if the tab has nothing left to do, otherwise True.
+        """
+
+        if task.steps is None:
+            task.steps = self.factory(self.webdriver)
+
+            if task.steps is None:
+                return False
+
+            result = None
+
+        if isinstance(task.condition, readiness.Condition):
+            readiness.record(task.condition, time.monotonic() - task.waiting_since, result is not None)
+
+        try:
+            task.condition = task.steps.send(result)
+            task.waiting_since = time.monotonic()
+            task.deadline = task.waiting_since + getattr(task.condition, 'timeout', self.timeout)
+        except StopIteration as stop:
+            task.results.append(stop.value)
+            task.steps = None
+            task.condition = None
+
+            return repeat
+
+        return True
+
+    def run(self, cancel_token: threading.Event | None = None, repeat: bool = False, progress: Callable[[str], None] | None = None) -> dict:
+        """
+        Run every scheduled tab until all are done.
+
+        :param cancel_token: Event that stops every tab at its next step once it's set.
+        :param repeat: Whether to keep solving each tab (e.g. the next question) until it can't be solved.
+        :param progress: Callback receiving progress messages.
+        :return: A dictionary mapping each tab's handle to the results of its solves.
+        """
+
+        results: dict = {task.handle: task.results for task in self.tasks}
+        start_handle: str = self.webdriver.current_window_handle
+        self.current_handle = start_handle
+        start_time: float = time.perf_counter()
+
+        while len(self.tasks) != 0 and (cancel_token is None or not cancel_token.is_set()):
+            ready: bool = False
+
+            for task in list(self.tasks):
+                if cancel_token is not None and cancel_token.is_set():
+                    break
+
+                try:
+                    self.switch(task.handle)
+
+                    if task.condition is None:
+                        result: object = None
+                    else:
+                        result = steps.check(self.webdriver, task.condition)
+
+                        if not result:
+                            if time.monotonic() < task.deadline:
+                                continue
+
+                            result = None
+
+                    ready = True
+
+                    if not self.advance(task, result, repeat):
+                        self.tasks.remove(task)
+                except NoSuchWindowException:
+                    print(f'Tab {task.handle} was closed')
+                    self.tasks.remove(task)
+
+                    if self.current_handle == task.handle:
+                        self.current_handle = None
+                except Exception as error:
+                    print(f'Error in tab {task.handle}: {error}')
+                    self.tasks.remove(task)
+
+            if not ready:
+                time.sleep(self.poll_interval)
+            elif progress is not None:
+                progress(f'{len(self.tasks)} tabs solving, {sum(len(solves) for solves in results.values())} solves')
+
+        for task in self.tasks:
+            if task.steps is not None:
+                task.steps.close()
+
+        self.tasks.clear()
+
+        if start_handle in self.webdriver.window_handles:
+            self.switch(start_handle)
+
+        print(f'Solved {sum(len(solves) for solves in results.values())} times across {len(results)} tabs in {time.perf_counter() - start_time:.2f} seconds')
+
+        return results
@@ -0,0 +1,180 @@
+import time
+import threading
+
+import lazy
+import lthslatin_manager
+
+
+googletrans: lazy.LazyModule = lazy.lazy_import('googletrans')
+
+CLOSED: str = 'closed'
+OPEN: str = 'open'
+HALF_OPEN: str = 'half-open'
+
+
+class TranslationMonitor:
+    """
+    Circuit breaker around Google Translate, kept up to date by a background latency check.
+
+    While the circuit is closed translations go through. Too many failed or slow translations in a row open it and
+    solvers skip prediction, until the cooldown has passed and one trial call (or the background check) is let
+    through half-open. A fast answer closes the circuit again, so prediction comes back on its own once the service
+    recovers. Solvers call available before every translation and translate in its place.
+    """
+
+    def __init__(self, max_delay: float = 2, interval: float = 60, failure_threshold: int = 2, cooldown: float = 30) -> None:
+        """
+        Create a translation monitor.
+
+        :param max_delay: Seconds a translation may take before it counts as a failure.
+        :param interval: Seconds between background latency checks while the circuit is closed.
+        :param failure_threshold: Failures in a row that open the circuit.
+        :param cooldown: Seconds the circuit stays open before a trial call is let through.
+        """
+
+        self.max_delay: float = max_delay
+        self.interval: float = interval
+        self.failure_threshold: int = failure_threshold
+        self.cooldown: float = cooldown
+
+        self.state: str = HALF_OPEN
+        self.failures: int = 0
+        self.opened_at: float = 0
+        self.trial_running: bool = False
+        self.latency: float | None = None
+        self.translator: object | None = None
+        self.lock: threading.Lock = threading.Lock()
+        self.stop_event: threading.Event = threading.Event()
+        self.thread: threading.Thread | None = None
+
+    def get_translator(self) -> object:
+        """
+        Get the shared Google Translate client, creating it on first use.
+
+        :return: The googletrans Translator.
+        """
+
+        if self.translator is None:
+            self.translator = googletrans.Translator()
+
+        return self.translator
+
+    def available(self) -> bool:
+        """
+        Check if a translation may be made now.
+
+        :return: True if the circuit is closed, or half-open with no trial running, otherwise False.
+        """
+
+        with self.lock:
+            if self.state == OPEN and time.time() - self.opened_at >= self.cooldown:
+                self.state = HALF_OPEN
+
+            if self.state == CLOSED:
+                return True
+
+            if self.state == HALF_OPEN and not self.trial_running:
+                self.trial_running = True
+                return True
+
+            return False
+
+    def record(self, latency: float | None) -> None:
+        """
+        Record the outcome of a translation or latency check.
+
+        :param latency: Seconds the translation took, None if it failed.
+        :return: None
+        """
+
+        with self.lock:
+            previous_state: str = self.state
+            self.trial_running = False
+
+            if latency is not None and latency <= self.max_delay:
+                self.latency = latency
+                self.failures = 0
+                self.state = CLOSED
+            else:
+                self.failures += 1
+
+                if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                    self.state = OPEN
+                    self.opened_at = time.time()
+
+            state: str = self.state
+
+        if state != previous_state:
+            match state:
+                case 'closed':
+                    print(f'Translation service back ({latency * 1000:.0f} ms), enabling prediction...')
+                case 'open':
+                    print('Translation service not working or too slow, disabling prediction...')
+
+    def translate(self, text: str, src: str = 'auto', dest: str = 'en') -> object:
+        """
+        Translate text, recording how long it took. Call available first.
+
+        :param text: The text to translate.
+        :param src: The source language.
+        :param dest: The destination language.
+        :return: The googletrans translation, its text is in .text.
+        """
+
+        start_time: float = time.time()
+
+        try:
+            result: object = self.get_translator().translate(text, src=src, dest=dest)
+        except Exception:
+            self.record(None)
+            raise
+
+        self.record(time.time() - start_time)
+
+        return result
+
+    def check(self) -> float | None:
+        """
+        Measure the translation latency, recording the outcome.
+
+        :return: The latency in seconds, None if the service is broken.
+        """
+
+        latency: float | None = lthslatin_manager.check_translation_delay(self.get_translator())
+        self.record(latency)
+
+        return latency
+
+    def run(self) -> None:
+        """
+        Check the latency periodically until stopped, and once the cooldown has passed while the circuit is open.
+
+        :return: None
+        """
+
+        wait: float = 0
+
+        while not self.stop_event.wait(wait):
+            if self.available():
+                self.check()
+
+            wait = self.cooldown if self.state == OPEN else self.interval
+
+    def start(self) -> None:
+        """
+        Start checking the latency in the background.
+
+        :return: None
+        """
+
+        self.thread = threading.Thread(target=self.run, name='translation-monitor', daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop the background checks.
+
+        :return: None
+        """
+
+        self.stop_event.set()